@@ -0,0 +1,235 @@
+# benchmarks/run_benchmarks.py
+"""
+Times the event pipeline on synthetic events.
+
+For each size, generates events with benchmarks/synthetic.py and times
+parsing (Format-List text and JSON), formatting for the model, every
+export_to_* writer (Parquet and Arrow only when pyarrow is installed), and
+map-reduce summarization, plain and clustered, against a stub model that
+answers instantly (or after --stub-latency). Each step reports the median of
+several runs plus events per second. Results can be saved as JSON and
+compared to a saved baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 1000000 --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --max-regression 0.2
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+# repository root, where event_summarizer.py lives
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate_records, to_format_list, to_json  # noqa: E402
+from utils import exports, summarize_logs  # noqa: E402
+from utils.parse_logs import format_logs_for_gpt, parse_json_logs, parse_logs  # noqa: E402
+
+# export functions timed; columnar formats are skipped without pyarrow
+EXPORTERS = ("csv", "json", "jsonl", "txt", "md", "parquet", "arrow")
+
+
+class StubClient:
+    """
+    Stands in for the OpenAI client: replies with a short fixed summary.
+
+    Args:
+        latency (float): Seconds each request waits before replying, to model
+            network time and show how well requests overlap.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model: str, messages: list[dict], **kwargs):
+        with self._lock:
+            self.requests += 1
+            self.prompt_chars += sum(len(message["content"]) for message in messages)
+        if self.latency:
+            time.sleep(self.latency)
+        content = "Summary: services changed state, DCOM permission warnings, one unexpected reboot."
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def time_call(func: Callable, repeat: int) -> float:
+    """
+    Runs a function several times with its console output suppressed.
+
+    Args:
+        func (Callable): Takes no arguments.
+        repeat (int): Number of runs.
+
+    Returns:
+        float: Median seconds per run.
+    """
+    samples = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_size(count: int, repeat: int, message_length: Optional[int], skew: float,
+               stub_latency: float, formats: tuple[str, ...]) -> dict:
+    """
+    Times every step on one synthetic data set.
+
+    Args:
+        count (int): Number of events.
+        repeat (int): Runs per step.
+        message_length (Optional[int]): Characters per message, or None for natural lengths.
+        skew (float): Zipf skew of the provider/ID mix.
+        stub_latency (float): Seconds per stub model request.
+        formats (tuple[str, ...]): Export formats to time.
+
+    Returns:
+        dict: {step: {"seconds", "events_per_s", ...}} for this size.
+    """
+    records = list(generate_records(count, message_length=message_length, skew=skew))
+    list_text = to_format_list(records)
+    json_text = to_json(records)
+    results = {}
+
+    def record(step: str, seconds: float, **extra):
+        results[step] = {"seconds": seconds, "events_per_s": count / seconds if seconds else None, **extra}
+
+    record("parse_logs", time_call(lambda: parse_logs(list_text), repeat), input_mb=len(list_text) / 1e6)
+    record("parse_json_logs", time_call(lambda: parse_json_logs(json_text), repeat), input_mb=len(json_text) / 1e6)
+    record("format_logs_for_gpt", time_call(lambda: format_logs_for_gpt(records), repeat))
+
+    # exports write to a relative exports/ folder; keep them out of the repository
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for fmt in formats:
+                export = getattr(exports, f"export_to_{fmt}")
+                seconds = time_call(lambda: export(records, f"bench.{fmt}"), repeat)
+                path = os.path.join(exports.EXPORT_DIR, f"bench.{fmt}")
+                size = os.path.getsize(path) / 1e6 if os.path.exists(path) else None
+                record(f"export_to_{fmt}", seconds, output_mb=size)
+        finally:
+            os.chdir(cwd)
+
+    # summarization against the stub; no cache, so every run sends every request
+    previous = summarize_logs.client
+    for step, cluster in (("summarize_mapreduce", False), ("summarize_mapreduce_clustered", True)):
+        stub = StubClient(stub_latency)
+        summarize_logs.client = stub
+        try:
+            seconds = time_call(lambda: summarize_logs.summarize_logs_mapreduce(records, cluster=cluster), repeat)
+        finally:
+            summarize_logs.client = previous
+        record(step, seconds, requests=stub.requests // repeat, prompt_chars=stub.prompt_chars // repeat)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """
+    Finds steps that got slower than the baseline allows.
+
+    Args:
+        results (dict): Results of this run.
+        baseline (dict): Results saved by an earlier run.
+        max_regression (float): Allowed slowdown, as a fraction.
+
+    Returns:
+        list[str]: One line per regressed step; empty if none regressed.
+    """
+    regressions = []
+    for size, steps in results["sizes"].items():
+        for step, entry in steps.items():
+            before = baseline.get("sizes", {}).get(size, {}).get(step)
+            if not before or not before["seconds"]:
+                continue
+            change = entry["seconds"] / before["seconds"] - 1
+            print(f"  {size:>8} {step:<32} {change:+.0%}")
+            if change > max_regression:
+                regressions.append(f"{step} at {size} events: {change:+.0%}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time parsing, formatting, exports and summarization.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="event counts to test (default 1000 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per step (default 3)")
+    parser.add_argument("--message-length", type=int, help="characters per message (default natural)")
+    parser.add_argument("--skew", type=float, default=1.1,
+                        help="Zipf skew of the provider/ID mix; 0 is uniform (default 1.1)")
+    parser.add_argument("--stub-latency", type=float, default=0.0,
+                        help="seconds each stub model request takes (default 0)")
+    parser.add_argument("--formats", nargs="+", choices=EXPORTERS, default=list(EXPORTERS),
+                        help="export formats to time (default all)")
+    parser.add_argument("--output", help="save results to this JSON file")
+    parser.add_argument("--baseline", help="compare with results saved by --output")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed slowdown of any step against the baseline, as a fraction (default 0.25)")
+    args = parser.parse_args()
+
+    formats = tuple(fmt for fmt in args.formats if fmt not in ("parquet", "arrow") or has_pyarrow())
+    skipped = sorted(set(args.formats) - set(formats))
+    if skipped:
+        print(f"skipping {', '.join(skipped)} exports (pyarrow is not installed)")
+
+    results = {
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "message_length": args.message_length,
+        "skew": args.skew,
+        "stub_latency": args.stub_latency,
+        "sizes": {},
+    }
+    # a small untimed pass loads lazily imported modules (pyarrow, openai helpers) first
+    bench_size(100, 1, args.message_length, args.skew, 0.0, formats)
+    for count in args.sizes:
+        steps = bench_size(count, args.repeat, args.message_length, args.skew, args.stub_latency, formats)
+        results["sizes"][str(count)] = steps
+        print(f"{count} events:")
+        for step, entry in steps.items():
+            rate = f"{entry['events_per_s']:>12,.0f} events/s" if entry["events_per_s"] else ""
+            print(f"  {step:<32} {entry['seconds'] * 1000:10.1f} ms {rate}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("change from baseline:")
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print("regressed: " + "; ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
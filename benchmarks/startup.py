@@ -0,0 +1,120 @@
+# benchmarks/startup.py
+"""
+Measures how long it takes to import event_summarizer.
+
+Runs `python -X importtime -c "import event_summarizer"` several times in
+fresh interpreters from the repository root, reports the median total and
+the slowest modules, and can save the results as JSON or compare them to a
+saved baseline.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --output startup.json
+    python benchmarks/startup.py --baseline startup.json --max-regression 0.2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# repository root, where event_summarizer.py lives
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module: str = "event_summarizer") -> dict:
+    """
+    Imports a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        dict: {"wall": seconds, "total_us": cumulative import time of the module,
+            "modules": {name: cumulative microseconds}}
+    """
+    # a placeholder key keeps summarize_logs from prompting if it is imported eagerly
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "benchmark"))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        try:
+            modules[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # the header line
+
+    return {"wall": wall, "total_us": modules.get(module, 0), "modules": modules}
+
+
+def run(runs: int = 5, top: int = 10) -> dict:
+    """
+    Measures the import several times and summarizes the runs.
+
+    Args:
+        runs (int): Number of fresh interpreters to start.
+        top (int): Number of slowest modules to keep.
+
+    Returns:
+        dict: Median wall time and import time, plus the slowest modules of the median run.
+    """
+    samples = sorted((measure_import() for _ in range(runs)), key=lambda s: s["total_us"])
+    median = samples[len(samples) // 2]
+    slowest = sorted(((name, us) for name, us in median["modules"].items() if name != "event_summarizer"),
+                     key=lambda item: item[1], reverse=True)
+    return {
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "wall_s": statistics.median(s["wall"] for s in samples),
+        "import_ms": median["total_us"] / 1000,
+        "slowest": [{"module": name, "ms": us / 1000} for name, us in slowest[:top]],
+        "heavy_modules": {name: name in median["modules"] for name in ("openai", "pandas", "numpy", "dotenv")},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure event_summarizer import time.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start (default 5)")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list (default 10)")
+    parser.add_argument("--output", help="save results to this JSON file")
+    parser.add_argument("--baseline", help="compare with results saved by --output")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, as a fraction (default 0.25)")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.top)
+
+    print(f"import event_summarizer: {results['import_ms']:.1f} ms "
+          f"(process {results['wall_s'] * 1000:.0f} ms, median of {results['runs']})")
+    for entry in results["slowest"]:
+        print(f"  {entry['ms']:8.1f} ms  {entry['module']}")
+    loaded = [name for name, present in results["heavy_modules"].items() if present]
+    print(f"heavy modules loaded at startup: {', '.join(loaded) or 'none'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        change = results["import_ms"] / baseline["import_ms"] - 1
+        print(f"change from baseline: {change:+.0%}")
+        if change > args.max_regression:
+            print("startup time regressed")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
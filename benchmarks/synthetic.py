@@ -0,0 +1,232 @@
+# benchmarks/synthetic.py
+"""
+Generates synthetic Windows events for benchmarks.
+
+Records look like fetch_event_records output: common System/Application
+providers with their usual event IDs, levels and message shapes, newest
+first, with realistic variable parts (service names, GUIDs, paths, error
+codes). Provider popularity follows a Zipf-like skew, so a few providers
+dominate as they do on real machines. The same records can be rendered as
+Get-WinEvent | Format-List text or as the JSON that structured fetches return.
+
+Usage:
+    python benchmarks/synthetic.py --count 100000 --output events.jsonl
+    python benchmarks/synthetic.py --count 1000 --format list --output events.txt
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+# (provider, event ID, level, message template), most common first
+EVENT_TYPES = [
+    ("Service Control Manager", 7036, 4, "The {service} service entered the {state} state."),
+    ("Microsoft-Windows-Kernel-General", 16, 4,
+     "The access history in hive \\??\\C:\\Users\\{user}\\AppData\\Local\\Packages\\{package}\\"
+     "Settings\\settings.dat was cleared updating {count} keys and creating {small} modified pages."),
+    ("Microsoft-Windows-DistributedCOM", 10016, 3,
+     "The application-specific permission settings do not grant Local Activation permission for the "
+     "COM Server application with CLSID {{{guid}}} and APPID {{{guid2}}} to the user NT AUTHORITY\\"
+     "SYSTEM SID (S-1-5-18) from address LocalHost (Using LRPC) running in the application container "
+     "Unavailable SID (Unavailable)."),
+    ("Microsoft-Windows-Time-Service", 35, 4,
+     "The time service is now synchronizing the system time with the time source time.windows.com,"
+     "0x9 ({ip}:123->{ip2}:123)."),
+    ("Service Control Manager", 7040, 4,
+     "The start type of the {service} service was changed from {start} to {start2}."),
+    ("Microsoft-Windows-WindowsUpdateClient", 19, 4,
+     "Installation Successful: Windows successfully installed the following update: "
+     "Security Intelligence Update for Microsoft Defender Antivirus - KB{kb} (Version 1.{count}.{small}.0)"),
+    ("disk", 153, 3,
+     "The IO operation at logical block address 0x{hex} for Disk {small} (PDO name: \\Device\\{device}) "
+     "was retried."),
+    ("Microsoft-Windows-Kernel-Power", 41, 1,
+     "The system has rebooted without cleanly shutting down first. This error could be caused if the "
+     "system stopped responding, crashed, or lost power unexpectedly."),
+    ("Application Error", 1000, 2,
+     "Faulting application name: {exe}, version: 10.0.{count}.1, time stamp: 0x{hex}\n"
+     "Faulting module name: {dll}, version: 10.0.{count}.1, time stamp: 0x{hex2}\n"
+     "Exception code: 0xc0000005\nFault offset: 0x{hex3}"),
+    ("Microsoft-Windows-Winlogon", 7001, 4,
+     "User Logon Notification for Customer Experience Improvement Program"),
+    ("Service Control Manager", 7000, 2,
+     "The {service} service failed to start due to the following error: "
+     "The system cannot find the file specified."),
+    ("Microsoft-Windows-DNS-Client", 1014, 3,
+     "Name resolution for the name {host} timed out after none of the configured DNS servers responded."),
+    ("Microsoft-Windows-Security-SPP", 16384, 4,
+     "Successfully scheduled Software Protection service for re-start at {iso}. Reason: RulesEngine."),
+    ("Service Control Manager", 7031, 2,
+     "The {service} service terminated unexpectedly. It has done this {small} time(s). The following "
+     "corrective action will be taken in 60000 milliseconds: Restart the service."),
+    ("volmgr", 161, 2, "Dump file creation failed due to error during dump creation."),
+]
+
+LEVEL_NAMES = {1: "Critical", 2: "Error", 3: "Warning", 4: "Information", 5: "Verbose"}
+
+SERVICES = ["Windows Update", "Background Intelligent Transfer Service", "Print Spooler",
+            "WinHTTP Web Proxy Auto-Discovery Service", "Windows Defender Antivirus Network Inspection",
+            "Delivery Optimization", "Microsoft Store Install Service", "Windows Modules Installer",
+            "Connected Devices Platform User Service_4a1f2", "Sync Host_4a1f2", "Diagnostic Policy Service"]
+STATES = ["running", "stopped"]
+START_TYPES = ["auto start", "demand start", "disabled"]
+EXES = ["explorer.exe", "chrome.exe", "Teams.exe", "svchost.exe", "OneDrive.exe", "msedge.exe"]
+DLLS = ["ntdll.dll", "KERNELBASE.dll", "ucrtbase.dll", "combase.dll", "twinapi.appcore.dll"]
+
+# filler appended to reach a requested message length
+FILLER = ("Additional details: the operation will be retried; see the event data for the full "
+          "context of this failure and any related events recorded by the provider. ")
+
+
+def _values(rng: random.Random) -> dict:
+    return {
+        "service": rng.choice(SERVICES),
+        "state": rng.choice(STATES),
+        "start": rng.choice(START_TYPES),
+        "start2": rng.choice(START_TYPES),
+        "user": rng.choice(["alice", "bob", "svc_backup", "admin"]),
+        "package": f"Microsoft.Windows.{rng.choice(['Search', 'Photos', 'ShellExperienceHost'])}_cw5n1h2txyewy",
+        "count": rng.randint(100, 30000),
+        "small": rng.randint(0, 9),
+        "guid": "%08X-%04X-%04X-%04X-%012X" % (rng.getrandbits(32), rng.getrandbits(16), rng.getrandbits(16),
+                                              rng.getrandbits(16), rng.getrandbits(48)),
+        "guid2": "%08X-%04X-%04X-%04X-%012X" % (rng.getrandbits(32), rng.getrandbits(16), rng.getrandbits(16),
+                                               rng.getrandbits(16), rng.getrandbits(48)),
+        "ip": "10.0.%d.%d" % (rng.randint(0, 255), rng.randint(1, 254)),
+        "ip2": "20.101.57.%d" % rng.randint(1, 254),
+        "kb": rng.randint(2267602, 2267699),
+        "hex": "%x" % rng.getrandbits(32),
+        "hex2": "%x" % rng.getrandbits(32),
+        "hex3": "%016x" % rng.getrandbits(40),
+        "device": "%08x" % rng.getrandbits(32),
+        "exe": rng.choice(EXES),
+        "dll": rng.choice(DLLS),
+        "host": rng.choice(["fileserver01.corp.local", "wpad", "printsrv.corp.local", "login.live.com"]),
+        "iso": "2025-06-%02dT%02d:%02d:00Z" % (rng.randint(1, 28), rng.randint(0, 23), rng.randint(0, 59)),
+    }
+
+
+def generate_records(count: int,
+                     seed: int = 0,
+                     message_length: Optional[int] = None,
+                     skew: float = 1.1,
+                     event_types: Optional[list[tuple]] = None,
+                     end: Optional[datetime] = None,
+                     events_per_minute: float = 20.0) -> Iterator[dict]:
+    """
+    Yields synthetic event records, newest first.
+
+    Args:
+        count (int): Number of events.
+        seed (int): Random seed; the same arguments always give the same events.
+        message_length (Optional[int]): Pad or cut every message to about this
+            many characters; None keeps the natural lengths (70-400 characters).
+        skew (float): Zipf exponent for choosing event types; 0 picks them
+            uniformly, higher values let the first few dominate.
+        event_types (Optional[list[tuple]]): (provider, id, level, template)
+            entries to draw from; defaults to EVENT_TYPES.
+        end (Optional[datetime]): Time of the newest event; defaults to 06/25/2025 05:00:00 PM.
+        events_per_minute (float): Average event rate, which sets the time span.
+
+    Yields:
+        dict: Records with TimeCreated, Id, Level, LevelDisplayName,
+            ProviderName, RecordId and Message.
+    """
+    rng = random.Random(seed)
+    event_types = event_types or EVENT_TYPES
+    weights = [1 / (rank ** skew) for rank in range(1, len(event_types) + 1)]
+    moment = end or datetime(2025, 6, 25, 17, 0, 0)
+    mean_gap = 60.0 / events_per_minute
+
+    # draw types in blocks; random.choices is much faster than one call per event
+    types = []
+    for record_id in range(count, 0, -1):
+        if not types:
+            types = rng.choices(event_types, weights, k=min(4096, record_id))
+        provider, event_id, level, template = types.pop()
+        message = template.format(**_values(rng))
+        if message_length is not None:
+            message = (message + " " + FILLER * (message_length // len(FILLER) + 1))[:message_length]
+        yield {
+            "TimeCreated": moment.strftime("%m/%d/%Y %I:%M:%S %p"),
+            "Id": event_id,
+            "Level": level,
+            "LevelDisplayName": LEVEL_NAMES[level],
+            "ProviderName": provider,
+            "RecordId": record_id,
+            "Message": message,
+        }
+        moment -= timedelta(seconds=int(rng.expovariate(1 / mean_gap)))
+
+
+def to_format_list(records) -> str:
+    """
+    Renders records the way `Get-WinEvent | Select-Object ... | Format-List` prints them.
+
+    Args:
+        records: Records from generate_records.
+
+    Returns:
+        str: Format-List text, one blank-line-separated block per event.
+            Multi-line messages keep their continuation lines indented.
+    """
+    blocks = []
+    for record in records:
+        time_created = datetime.strptime(record["TimeCreated"], "%m/%d/%Y %I:%M:%S %p")
+        # Format-List shows the culture's short date, e.g. 6/25/2025 5:00:00 PM
+        shown = (f"{time_created.month}/{time_created.day}/{time_created.year} "
+                 f"{time_created.hour % 12 or 12}:{time_created:%M:%S %p}")
+        message = record["Message"].replace("\n", "\n                   ")
+        blocks.append(f"TimeCreated      : {shown}\n"
+                      f"Id               : {record['Id']}\n"
+                      f"LevelDisplayName : {record['LevelDisplayName']}\n"
+                      f"ProviderName     : {record['ProviderName']}\n"
+                      f"Message          : {message}")
+    return "\n\n" + "\n\n".join(blocks) + "\n\n"
+
+
+def to_json(records) -> str:
+    """
+    Renders records as the compressed JSON array of a structured fetch.
+
+    Args:
+        records: Records from generate_records.
+
+    Returns:
+        str: ConvertTo-Json -Compress style output.
+    """
+    return json.dumps(list(records), separators=(",", ":"), ensure_ascii=False)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic Windows events.")
+    parser.add_argument("--count", type=int, default=1000, help="number of events (default 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default 0)")
+    parser.add_argument("--message-length", type=int, help="characters per message (default natural)")
+    parser.add_argument("--skew", type=float, default=1.1,
+                        help="Zipf skew of the provider/ID mix; 0 is uniform (default 1.1)")
+    parser.add_argument("--format", choices=("jsonl", "json", "list"), default="jsonl",
+                        help="jsonl records, a JSON array, or Format-List text (default jsonl)")
+    parser.add_argument("--output", help="write to this file instead of stdout")
+    args = parser.parse_args()
+
+    records = generate_records(args.count, args.seed, args.message_length, args.skew)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.format == "jsonl":
+            for record in records:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif args.format == "json":
+            out.write(to_json(records))
+        else:
+            out.write(to_format_list(records))
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
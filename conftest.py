@@ -0,0 +1 @@
+# lets the tests import the utils modules from the repository root
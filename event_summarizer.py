@@ -1,37 +1,129 @@
+import argparse
+import re
 import time
 import os
+import sys
 from colorama import init, Fore, Style
 
 # util functions
-from utils.fetch_logs import fetch_event_logs
-from utils.parse_logs import parse_logs
-from utils.summarize_logs import summarize_logs
-from utils.exports import export_to_csv, export_to_json, export_to_txt, export_to_md
-from utils.log_prompts import (display_welcome,
+from utils.fetch_logs import auto_windows, fetch_event_records, fetch_event_records_sharded, iter_event_records
+from utils.powershell_session import get_default_session
+from utils.summary_cache import get_default_cache
+from utils.event_store import DEFAULT_STORE_PATH, get_event_store
+from utils.session_cache import QueryCache
+from utils.parse_logs import format_logs_for_gpt
+from utils.search_logs import search_logs
+from utils.columnar import columnar_unavailable
+from utils.exports import EXPORT_WORKERS, export_format, export_many
+from utils.metrics import STAGES, count, enable_metrics, get_metrics, metrics_file_format, stage
+from utils.profiling import DEFAULT_PROFILE_DIR, PipelineProfiler
+from utils.tail_logs import DEFAULT_STATE_FILE, follow_events
+from utils.log_prompts import (resolve_time,
+                               display_welcome,
                                prompt_log_type,
                                prompt_start_time,
                                prompt_end_time,
                                prompt_max_events,
                                prompt_event_level,
                                prompt_provider_name,
-                               prompt_event_ids)
+                               prompt_event_ids,
+                               prompt_search)
 
 # Initialize colorama for colored output
 init(autoreset=True)
 
+LOG_TYPES = ["System", "Application", "Security", "Setup", "ForwardedEvents"]
+LEVELS = {"critical": 1, "error": 2, "warning": 3, "information": 4, "verbose": 5}
+EXPORT_EXTENSIONS = ('.txt', '.md', '.json', '.jsonl', '.csv', '.parquet', '.arrow')
+
+# summary requests in flight at once
+SUMMARY_CONCURRENCY = 8
+
 
 def main():
+    """
+    Runs the interactive session: one query after another until the user quits.
+
+    Each query returns to this loop instead of calling main() again, so the
+    stack stays flat and earlier results are only kept by the session's
+    QueryCache, which holds the most recent few. Setting the EVENT_STORE
+    environment variable to a database path also keeps every fetched event
+    in a local event store, so repeat queries skip PowerShell across runs,
+    and setting EVENT_METRICS to a .json or .prom path records how long each
+    stage took, reported when the program exits (EVENT_TRACE_MEMORY=1 adds
+    peak memory).
+    """
 
     # welcome message
     display_welcome()
 
     time.sleep(1)  # pause for a moment to let the user read the welcome message
 
+    session = QueryCache(max_entries=5)
+    store = get_event_store(os.environ["EVENT_STORE"]) if os.environ.get("EVENT_STORE") else None
+    metrics_path = os.environ.get("EVENT_METRICS")
+    if metrics_path:
+        enable_metrics(trace_memory=os.environ.get("EVENT_TRACE_MEMORY") == "1")
+    action = "restart"
+    try:
+        while action == "restart":
+            action = run_query(session, store)
+    finally:
+        report_metrics(metrics_path)
+    print(Fore.LIGHTWHITE_EX + "👋 Exiting program. Goodbye!\n")
+
+
+def report_metrics(path=None):
+    """
+    Prints the stage timings and saves them, if metrics are on.
+
+    Args:
+        path (Optional[str]): Metrics file ending in .json or .prom.
+    """
+    metrics = get_metrics()
+    if metrics is None:
+        return
+    metrics.report()
+    if not path:
+        return
+    try:
+        metrics.write(path)
+        print(f"{Fore.LIGHTWHITE_EX}📈 Metrics saved to: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(path)}\n")
+    except (OSError, ValueError) as e:
+        print(Fore.RED + Style.BRIGHT + f"❌ Could not save metrics: {e}\n")
+
+
+def summarize_with_gpt(parsed_logs, stats: bool = True, max_concurrency: int = SUMMARY_CONCURRENCY) -> str:
+    """
+    Summarizes logs with the async engine.
+
+    Chunk summaries are sent concurrently within the API's rate limits, and
+    429 replies are retried with backoff.
+
+    Args:
+        parsed_logs: Logs to summarize.
+        stats (bool): Add event statistics to the prompt.
+        max_concurrency (int): Summary requests in flight at once.
+
+    Returns:
+        str: The summary, or an error message starting with 'Error summarizing logs'.
+    """
+    from utils.async_summarize import summarize_logs_async  # asyncio and the async client load only when summarizing
+    return summarize_logs_async(parsed_logs, cache=get_default_cache(), cluster=True, stats=stats,
+                                max_concurrency=max_concurrency)
+
+
+def prompt_filters() -> dict:
+    """
+    Prompts for every log filter.
+
+    Returns:
+        dict: Keyword arguments for fetch_event_records.
+    """
     print(Fore.CYAN + Style.BRIGHT +
           "Narrow down your Windows Event Logs with the following filters:\n")
     time.sleep(0.5)
 
-    # 1. prompt user for log filters
     log_type = prompt_log_type()
     time.sleep(1)
     start_time = prompt_start_time()
@@ -47,27 +139,126 @@ def main():
     event_ids = prompt_event_ids()
     time.sleep(1)
 
+    return dict(log_type=log_type, start_time=start_time, end_time=end_time,
+                max_events=max_events, level=level, provider_name=provider_name,
+                event_ids=event_ids)
+
+
+def prompt_recent_query(session: QueryCache):
+    """
+    Offers to reopen one of the session's recent queries.
+
+    Args:
+        session (QueryCache): The session's cached results.
+
+    Returns:
+        Optional[QueryResult]: The chosen result, or None for a new search.
+    """
+    recent = session.recent()
+    if not recent:
+        return None
+
+    print(f"{Style.BRIGHT + Fore.LIGHTBLUE_EX}🕘 Recent queries:\n")
+    for i, result in enumerate(recent, 1):
+        print(f"    {Fore.YELLOW}[{i}]{Style.RESET_ALL} {Fore.LIGHTWHITE_EX}{result.describe()}")
+
+    while True:
+        choice = input(
+            f"\n{Fore.LIGHTWHITE_EX}Enter a number to reopen a query, or press Enter for a new search: ").strip()
+
+        # print a separator for clarity
+        print(Fore.LIGHTWHITE_EX + "\n" + "=" * 55 + "\n")
+
+        if choice == "":
+            return None
+        if choice.isdigit() and 1 <= int(choice) <= len(recent):
+            result = recent[int(choice) - 1]
+            session.touch(result)
+            return result
+        print(Fore.RED + Style.BRIGHT +
+              f"❌ Invalid choice. Please enter 1-{len(recent)} or press Enter.")
+
+
+def run_query(session: QueryCache, store=None) -> str:
+    """
+    Runs one query: filters, fetch, display, summarization and export.
+
+    Args:
+        session (QueryCache): Recent results; reopened or identical queries
+            are served from here instead of fetching again.
+        store (Optional[EventStore]): Local event store for fetches, if enabled.
+
+    Returns:
+        str: "restart" for another query, "quit" to end the session.
+    """
+    # 1. reopen a recent query or prompt user for log filters
+    result = prompt_recent_query(session)
+    if result is None:
+        filters = prompt_filters()
+        result = session.get(filters)
+
     # 2. fetch logs from filters
-    logs = fetch_event_logs(
-        log_type=log_type,
-        start_time=start_time,
-        end_time=end_time,
-        max_events=max_events,
-        level=level,
-        provider_name=provider_name,
-        event_ids=event_ids
-    )
-
-    # ADD CHOSEN FILTERS BEFORE DISPLAYING LOGS
+    if result is None:
+        print(Fore.GREEN + "\nFetching logs...\n\n")
+        windows = auto_windows(filters["start_time"], filters["end_time"], filters["max_events"])
+        if windows > 1:
+            # a large pull over a long range: fetch its windows in parallel PowerShell processes
+            shard_filters = dict(filters)
+            fetched = fetch_event_records_sharded(shard_filters.pop("log_type"), **shard_filters,
+                                                  windows=windows, store=store)
+        else:
+            fetched = fetch_event_records(
+                **filters,
+                runner=get_default_session().run,  # reuse one PowerShell across restarts
+                store=store
+            )
+        count("fetch", "events", len(fetched))
+        result = session.put(filters, fetched)
+        del fetched  # the session holds the compact copy
+    else:
+        print(Fore.GREEN + "\nUsing logs from earlier in this session...\n\n")
+    parsed_logs = result.logs
 
     # 3. Display fetched raw logs
     print(Fore.LIGHTWHITE_EX + "📋 Raw Logs:\n")
-    print(logs)
+    if parsed_logs:
+        with stage("format"):
+            formatted = format_logs_for_gpt(parsed_logs)
+        print(formatted)
+    else:
+        print(Fore.RED + Style.BRIGHT + "No logs returned.")
     print(Fore.LIGHTWHITE_EX + "\n" + "=" * 55 + "\n")
 
-    # 4. prompt user if they want GPT summarization
-    summarize = None
-    while True:
+    # 4. optionally narrow the logs by searching their messages
+    narrowed = False
+    while parsed_logs:
+        query = prompt_search()
+        if query is None:
+            break
+        try:
+            with stage("search"):
+                matches = result.search(query)
+        except re.error as e:
+            print(Fore.RED + Style.BRIGHT + f"❌ Invalid regular expression: {e}\n")
+            continue
+        if not matches:
+            print(Fore.RED + Style.BRIGHT + "❌ No logs match that search. Try another or press Enter.\n")
+            continue
+        parsed_logs, narrowed = matches, True
+        print(Fore.LIGHTWHITE_EX + f"📋 {len(matches)} of {len(result.logs)} logs match:\n")
+        print(format_logs_for_gpt(matches))
+        print(Fore.LIGHTWHITE_EX + "\n" + "=" * 55 + "\n")
+        break
+
+    # 5. prompt user if they want GPT summarization
+    # the stored summary covers every log of the query, not a search
+    summarize = None if narrowed else result.summary
+    if summarize:
+        print(Fore.LIGHTWHITE_EX + "📄 GPT Summary (from earlier in this session):\n")
+        print(summarize)
+        print(Fore.LIGHTWHITE_EX + "\n" + "=" * 55 + "\n")
+
+    while summarize is None:
         print(f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}⚠️  Warning: {Style.RESET_ALL}{Fore.LIGHTWHITE_EX} An API key is required for GPT summarization.\n")
         print(f'{Fore.LIGHTWHITE_EX}Please navigate to {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}platform.openai.com{Style.RESET_ALL}{Fore.LIGHTWHITE_EX} to create you own API key.\n')
         print(f'{Fore.LIGHTWHITE_EX}Or if you have one already please create a .env file in the root folder and add: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}OPENAI_API_KEY=your-api-key-here\n')
@@ -78,14 +269,12 @@ def main():
         print(Fore.LIGHTWHITE_EX + "\n" + "=" * 55 + "\n")
 
         if choice in ['yes', 'y']:
-            # Parse logs
-            print(Fore.GREEN + 'Parsing logs...\n')
-            time.sleep(0.5)
-            parsed_logs = parse_logs(logs)
-
             print(Fore.GREEN + "Analyzing logs with GPT...\n")
             time.sleep(0.5)
-            summarize = summarize_logs(parsed_logs)
+            with stage("summarize"):
+                summarize = summarize_with_gpt(parsed_logs)
+            if not narrowed and not summarize.startswith("Error summarizing logs"):
+                result.summary = summarize
 
             print(Fore.LIGHTWHITE_EX + "\n📄 GPT Summary:\n")
             print(summarize)
@@ -101,7 +290,7 @@ def main():
             print(Fore.RED + Style.BRIGHT +
                   "❌ Invalid input. Please enter 'yes' or 'no'.")
 
-    # 5. prompt user if they want to export logs
+    # 6. prompt user if they want to export logs
     output_path = None
 
     while True:
@@ -113,14 +302,11 @@ def main():
 
         if export == 'yes' or export == 'y':
 
-            # parse logs
-            parsed_logs = parse_logs(logs)
-
             while not output_path:
 
                 # get file name from user
                 output_path = input(
-                    f'{Fore.LIGHTWHITE_EX}Enter the output filename ending in .txt, .md, .json, .csv (e.g., explained_logs.md): ').strip()
+                    f'{Fore.LIGHTWHITE_EX}Enter the output filename ending in .txt, .md, .json, .jsonl, .csv, optionally + .gz, or .parquet/.arrow (e.g., explained_logs.md): ').strip()
 
                 print(
                     f'\n{Fore.LIGHTWHITE_EX}Preparing to save explanations to {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{output_path}...')
@@ -129,43 +315,20 @@ def main():
                 print(Fore.LIGHTWHITE_EX + "\n" + "=" * 55 + "\n")
 
                 # validation
-                if not output_path.endswith(('.txt', '.md', '.json', '.csv')):
+                if export_format(output_path) is None:
                     print(Fore.RED + Style.BRIGHT +
-                          '❌ Unsupported file format. Please use .txt, .md, or .json.')
+                          '❌ Unsupported file format. Please use .txt, .md, .json, .jsonl, or .csv (add .gz or .zst to compress), or .parquet or .arrow.')
                     output_path = None  # resets output_path to prompt again
+                elif columnar_unavailable(output_path):
+                    print(Fore.RED + Style.BRIGHT + f"❌ {columnar_unavailable(output_path)}.")
+                    output_path = None
 
             # export logs to the specified file
-            if output_path.endswith('.csv'):
-                print(
-                    f"\n{Fore.LIGHTWHITE_EX}📁 Exporting logs to {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(output_path)}\n")
-                time.sleep(1)
-                export_path = export_to_csv(parsed_logs, filename=output_path)
-                post_export_menu(export_path, parsed_logs)
-
-            elif output_path.endswith('.json'):
-                print(
-                    f"\n{Fore.LIGHTWHITE_EX}📁 Exporting logs to {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(output_path)}\n")
-                time.sleep(1)
-                export_path = export_to_json(parsed_logs, filename=output_path)
-                post_export_menu(export_path, parsed_logs)
-
-            elif output_path.endswith('.txt'):
-                print(
-                    f"\n{Fore.LIGHTWHITE_EX}📁 Exporting logs to {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(output_path)}\n")
-                time.sleep(1)
-                export_path = export_to_txt(parsed_logs, filename=output_path)
-                post_export_menu(export_path, parsed_logs)
-
-            elif output_path.endswith('.md'):
-                print(
-                    f"\n{Fore.LIGHTWHITE_EX}📁 Exporting logs to {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(output_path)}\n")
-                time.sleep(1)
-                export_path = export_to_md(
-                    parsed_logs, filename=output_path, gpt_summary=summarize)
-                post_export_menu(export_path, parsed_logs,
-                                 gpt_summary=summarize)
-
-            break  # exit export question loop after completing
+            print(
+                f"\n{Fore.LIGHTWHITE_EX}📁 Exporting logs to {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(output_path)}\n")
+            time.sleep(1)
+            export_path = export_logs(parsed_logs, output_path, summarize)
+            return post_export_menu(export_path, parsed_logs, gpt_summary=summarize)
 
         elif export in ['no', 'n']:
             print(Fore.LIGHTWHITE_EX +
@@ -178,12 +341,10 @@ def main():
                 print(Fore.LIGHTWHITE_EX + "\n" + "=" * 55 + "\n")
 
                 if follow_up in ['q', 'quit']:
-                    print(Fore.LIGHTWHITE_EX + "👋 Exiting program. Goodbye!\n")
-                    exit()
+                    return "quit"
 
                 elif follow_up in ['r', 'restart']:
-                    main()
-                    return  # ensure this frame doesn't continue after main()
+                    return "restart"
 
                 else:
                     print(Fore.RED + Style.BRIGHT +
@@ -194,10 +355,39 @@ def main():
                   "❌ Invalid input. Please enter 'yes' or 'no'.")
 
 
-def post_export_menu(export_path, parsed_logs, gpt_summary=None):
+# exports logs in the format given by the filename's extension
+
+
+def export_logs(parsed_logs, filename: str, gpt_summary=None):
+    """
+    Exports logs with the exporter matching the filename's extension.
+
+    Args:
+        parsed_logs: Parsed logs to export.
+        filename (str): Output filename ending in .csv, .json, .jsonl, .txt or .md,
+            optionally followed by .gz or .zst, or in .parquet or .arrow.
+        gpt_summary (Optional[str]): Summary to include in Markdown reports.
+
+    Returns:
+        Optional[str]: The export path, or None if the export failed or the
+            extension isn't supported.
+    """
+    if export_format(filename) is None:
+        print(Fore.RED + Style.BRIGHT +
+              "❌ Invalid extension. Must end with .csv, .json, .jsonl, .txt, or .md (optionally + .gz or .zst), .parquet or .arrow")
+        return None
+    if columnar_unavailable(filename):
+        print(Fore.RED + Style.BRIGHT + f"❌ {columnar_unavailable(filename)}.")
+        return None
+    return export_many(parsed_logs, [filename], gpt_summary)[filename]
+
+
+def post_export_menu(export_path, parsed_logs, gpt_summary=None) -> str:
     '''
     Displays a menu after exporting logs, allowing the user to open the file, export in another
-    format, or return to the main menu.'''
+    format, search for new logs or quit.
+
+    Returns "restart" to search for new logs or "quit" to end the session.'''
 
     while True:
         print(
@@ -226,29 +416,427 @@ def post_export_menu(export_path, parsed_logs, gpt_summary=None):
                 print(Fore.RED + Style.BRIGHT + f"❌ Unable to open file: {e}")
 
         elif choice == "2":
-            filename = input("\nEnter a new file name: ").strip()
-            if filename.endswith('.csv'):
-                export_path = export_to_csv(parsed_logs, filename)
-            elif filename.endswith('.json'):
-                export_path = export_to_json(parsed_logs, filename)
-            elif filename.endswith('.txt'):
-                export_path = export_to_txt(parsed_logs, filename)
-            elif filename.endswith('.md'):
-                export_path = export_to_md(parsed_logs, filename, gpt_summary)
-            else:
-                print(Fore.RED + Style.BRIGHT +
-                      "❌ Invalid extension. Must end with .csv, .json, .txt, or .md")
+            names = input("\nEnter a new file name (or several, separated by commas): ").strip()
+            filenames = [name.strip() for name in names.split(",") if name.strip()]
+            if len(filenames) > 1:
+                # one pass over the logs for every format
+                results = export_many(parsed_logs, filenames, gpt_summary)
+                export_path = next((path for path in results.values() if path), export_path)
+            elif filenames:
+                export_path = export_logs(parsed_logs, filenames[0], gpt_summary) or export_path
 
         elif choice == "3":
-            main()
+            return "restart"
         elif choice == "q" or choice == "Q":
-            print(Fore.LIGHTWHITE_EX + "👋 Exiting program. Goodbye!\n")
-            exit(0)
+            return "quit"
 
         else:
             print(Fore.RED + Style.BRIGHT +
-                  "❌ Invalid choice. Please enter 1, 2, or 3.")
+                  "❌ Invalid choice. Please enter 1, 2, 3, or q.")
+
+
+# command-line argument parsing for batch mode
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses batch mode command-line flags. Each flag matches one interactive prompt.
+
+    Args:
+        argv (Optional[list[str]]): Arguments to parse; defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed flags.
+    """
+    parser = argparse.ArgumentParser(
+        description="Fetch, summarize and export Windows Event Logs without prompts. "
+                    "Run with no arguments for the interactive program.")
+    parser.add_argument("--log-type", nargs="+", default=["System"], type=_log_type,
+                        help=f"one or more logs to read: {', '.join(LOG_TYPES)} (default System); "
+                             "several logs are fetched concurrently and merged by time")
+    parser.add_argument("--windows", type=int, metavar="N",
+                        help="split the time range into N windows fetched concurrently "
+                             "(default: one per day for pulls of 1000+ events, up to 8)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--evtx", metavar="PATH",
+                        help="read an exported .evtx file instead of the live log")
+    source.add_argument("--input", metavar="PATH",
+                        help="load an earlier export (.jsonl, .json, .csv, optionally compressed, "
+                             ".parquet or .arrow) instead of the live log")
+    source.add_argument("--hosts", metavar="HOSTS",
+                        help="comma-separated computers to fetch from concurrently with "
+                             "Invoke-Command; events are tagged with their Host")
+    source.add_argument("--inventory", metavar="FILE",
+                        help="like --hosts, reading one host per line from FILE")
+    parser.add_argument("--follow", action="store_true",
+                        help="keep polling the live log and only fetch events added since the last poll; "
+                             f"bookmarks are saved in {DEFAULT_STATE_FILE}, so later runs resume where this one stopped")
+    parser.add_argument("--interval", type=float, default=60.0, metavar="SECONDS",
+                        help="seconds between polls with --follow (default 60)")
+    parser.add_argument("--polls", type=int, metavar="N",
+                        help="with --follow, stop after N polls (default: until Ctrl+C); "
+                             "--polls 1 fetches only what is new since the last run")
+    parser.add_argument("--host-timeout", type=float, default=60.0, metavar="SECONDS",
+                        help="seconds allowed per host with --hosts/--inventory (default 60)")
+    parser.add_argument("--max-hosts", type=int, default=16, metavar="N",
+                        help="hosts fetched at once with --hosts/--inventory (default 16)")
+    parser.add_argument("--start", type=_time,
+                        help="start time: now, today, yesterday or 'MM/DD/YYYY HH:MM:SS AM/PM' "
+                             "(live log default today)")
+    parser.add_argument("--end", type=_time,
+                        help="end time, same formats as --start (live log default now)")
+    parser.add_argument("--max-events", type=int,
+                        help="maximum number of events (live log default 100)")
+    parser.add_argument("--level", type=_level,
+                        help="event level 1-5 or critical/error/warning/information/verbose (default all)")
+    parser.add_argument("--provider", help="only events from this provider")
+    parser.add_argument("--event-ids", type=_event_ids,
+                        help="comma-separated event IDs, e.g. 1000,7001")
+    parser.add_argument("--search", metavar="QUERY",
+                        help="keep logs whose message has every word of QUERY; "
+                             "\"quoted phrases\", /regex/ and prefix* words also work")
+    parser.add_argument("--regex", metavar="PATTERN",
+                        help="keep logs whose message matches PATTERN (case-insensitive)")
+    parser.add_argument("--output", action="append", default=[], metavar="FILE",
+                        help=f"export to FILE ({', '.join(EXPORT_EXTENSIONS)}; add .gz or .zst to compress text formats); "
+                             "repeat for several formats")
+    parser.add_argument("--export-workers", type=int, default=EXPORT_WORKERS, metavar="N",
+                        help=f"threads writing the --output files when there are several (default "
+                             f"{EXPORT_WORKERS}); 0 writes them one after another")
+    parser.add_argument("--summarize", action=argparse.BooleanOptionalAction, default=False,
+                        help="summarize the logs with GPT (default off)")
+    parser.add_argument("--summary-concurrency", type=int, default=SUMMARY_CONCURRENCY, metavar="N",
+                        help=f"summary requests sent at once (default {SUMMARY_CONCURRENCY}); rate limits "
+                             "and 429 replies are handled by backing off")
+    parser.add_argument("--stats", action=argparse.BooleanOptionalAction, default=True,
+                        help="add event counts, the event rate and detected bursts to the GPT "
+                             "prompt and Markdown reports (default on)")
+    parser.add_argument("--show-logs", action="store_true",
+                        help="print the fetched logs")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_PATH, metavar="PATH",
+                        help="keep fetched events in a local SQLite store and answer repeat "
+                             f"queries from it (default path {DEFAULT_STORE_PATH})")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="print time, CPU and counts per stage and save them "
+                             "to FILE (.json, or .prom for Prometheus)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="with --metrics, also measure peak memory per stage; tracing slows "
+                             "the run, so timings are less exact")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_DIR, metavar="DIR",
+                        help="profile the run and save a cProfile .pstats file and flamegraph "
+                             f"stacks (.folded) to DIR (default {DEFAULT_PROFILE_DIR})")
+    parser.add_argument("--profile-stages", type=_stages, metavar="STAGES",
+                        help=f"with --profile, only profile these comma-separated stages: {', '.join(STAGES)}")
+    args = parser.parse_args(argv)
+
+    if args.max_events is not None and args.max_events < 1:
+        parser.error("--max-events must be greater than 0")
+    args.log_type = list(dict.fromkeys(args.log_type))
+    if args.windows is not None and args.windows < 1:
+        parser.error("--windows must be greater than 0")
+    if len(args.log_type) > 1 and (args.hosts or args.inventory):
+        parser.error("--hosts and --inventory take a single --log-type")
+    if args.summary_concurrency < 1:
+        parser.error("--summary-concurrency must be greater than 0")
+    if args.export_workers < 0:
+        parser.error("--export-workers can't be negative")
+    if args.host_timeout <= 0 or args.max_hosts < 1:
+        parser.error("--host-timeout and --max-hosts must be greater than 0")
+    if args.polls is not None:
+        args.follow = True
+    if args.follow:
+        if args.evtx or args.input or args.hosts or args.inventory or args.end or args.store:
+            parser.error("--follow reads the live local log; it can't be combined with "
+                         "--evtx, --input, --hosts, --inventory, --end or --store")
+        if args.interval <= 0 or (args.polls is not None and args.polls < 1):
+            parser.error("--interval and --polls must be greater than 0")
+    for output in args.output:
+        if export_format(output) is None:
+            parser.error(f"unsupported export format: {output}")
+        if columnar_unavailable(output):
+            parser.error(f"can't write {output}: {columnar_unavailable(output)}")
+    if args.input and columnar_unavailable(args.input):
+        parser.error(f"can't read {args.input}: {columnar_unavailable(args.input)}")
+    if args.metrics and metrics_file_format(args.metrics) is None:
+        parser.error("--metrics must end in .json or .prom")
+    if args.trace_memory and not args.metrics:
+        parser.error("--trace-memory needs --metrics")
+    if args.profile_stages and not args.profile:
+        args.profile = DEFAULT_PROFILE_DIR
+    try:
+        search_logs([], args.search or "", pattern=args.regex)
+    except re.error as e:
+        parser.error(f"invalid regular expression: {e}")
+    return args
+
+
+def _log_type(value: str) -> str:
+    for log_type in LOG_TYPES:
+        if log_type.lower() == value.lower():
+            return log_type
+    raise argparse.ArgumentTypeError(f"must be one of {', '.join(LOG_TYPES)}")
+
+
+def _time(value: str) -> str:
+    try:
+        return resolve_time(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("use now, today, yesterday or MM/DD/YYYY HH:MM:SS AM/PM")
+
+
+def _level(value: str) -> int:
+    level = LEVELS.get(value.lower()) or (int(value) if value.isdigit() else None)
+    if level is None or not 1 <= level <= 5:
+        raise argparse.ArgumentTypeError("must be 1-5 or a level name")
+    return level
+
+
+def _stages(value: str) -> list[str]:
+    stages = [part.strip().lower() for part in value.split(",") if part.strip()]
+    unknown = [name for name in stages if name not in STAGES]
+    if unknown or not stages:
+        raise argparse.ArgumentTypeError(f"must be stages from: {', '.join(STAGES)}")
+    return stages
+
+
+def _event_ids(value: str) -> list[int]:
+    try:
+        return [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be numbers separated by commas")
+
+
+# loads an earlier export for batch mode
+
+
+def load_export(path: str, max_events=None, **filters):
+    """
+    Loads an export file as an EventTable and applies the given filters.
+
+    Parquet and Arrow files load with their column types intact; other
+    formats are streamed through utils.readers.
+
+    Args:
+        path (str): Export file path.
+        max_events (Optional[int]): Keep only the first max_events rows.
+        **filters: level, provider_name, event_ids, start_time and end_time,
+            as for EventTable.filter.
+
+    Returns:
+        EventTable: The matching logs.
+    """
+    # pandas and pyarrow are only needed for archived files
+    from utils.columnar import is_columnar, read_columnar_table
+    from utils.event_table import EventTable
+    from utils.readers import iter_records
+
+    if is_columnar(path):
+        table = read_columnar_table(path)
+    else:
+        table = EventTable.from_records(iter_records(path))
+
+    table = table.filter(**filters)
+    if max_events is not None:
+        table = EventTable(table.frame.head(max_events))
+    return table
+
+
+# headless run for schedulers and scripts
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """
+    Fetches, optionally summarizes, and exports logs with no prompts or pauses.
+
+    Args:
+        args (argparse.Namespace): Flags from parse_args.
+
+    Returns:
+        int: Exit code; 1 if an export failed, else 0.
+    """
+    if args.metrics:
+        enable_metrics(trace_memory=args.trace_memory)
+    profiler = None
+    if args.profile:
+        profiler = PipelineProfiler(args.profile_stages)
+        profiler.start()
+
+    try:
+        return run_follow(args) if args.follow else run_pipeline(args)
+    finally:
+        # a failed or interrupted run still gets its profile and metrics
+        if profiler is not None:
+            profiler.stop()
+            try:
+                profiler.report(profiler.save(args.profile))
+            except OSError as e:
+                print(Fore.RED + Style.BRIGHT + f"❌ Could not save profile: {e}\n")
+        report_metrics(args.metrics)
+
+
+def can_stream(args: argparse.Namespace) -> bool:
+    """
+    Checks whether batch mode can export events while they are fetched.
+
+    Streaming needs a live, single-host, single-log fetch whose logs are only
+    exported: summaries, searches, printing, the event store and sharded
+    fetches all need every log first.
+
+    Args:
+        args (argparse.Namespace): Flags from parse_args.
+
+    Returns:
+        bool: True if the logs can go from PowerShell straight to the exports.
+    """
+    return bool(args.output) and not (args.summarize or args.search or args.regex or args.show_logs
+                                      or args.store or args.evtx or args.input
+                                      or args.hosts or args.inventory
+                                      or len(args.log_type) > 1 or (args.windows or 1) > 1)
+
+
+def stream_export(args: argparse.Namespace, filters: dict) -> int:
+    """
+    Exports events while PowerShell is still returning them, so memory stays flat.
+
+    Args:
+        args (argparse.Namespace): Flags from parse_args.
+        filters (dict): Keyword arguments for iter_event_records.
+
+    Returns:
+        int: Exit code; 1 if an export failed, else 0.
+    """
+    fetched = 0
+
+    def counted(records):
+        nonlocal fetched
+        for record in records:
+            fetched += 1
+            yield record
+
+    print(Fore.GREEN + "Fetching logs...")
+    results = export_many(counted(iter_event_records(log_type=args.log_type[0], **filters)),
+                          args.output, max_workers=args.export_workers, stats=args.stats)
+    count("fetch", "events", fetched)
+    print(Fore.LIGHTWHITE_EX + f"📋 {fetched} logs exported.")
+    return 1 if fetched and None in results.values() else 0
+
+
+def run_follow(args: argparse.Namespace) -> int:
+    """
+    Polls the live log and searches, prints, summarizes and exports each batch of new events.
+
+    Exports to .csv, .jsonl and .txt grow with every batch; other formats
+    hold the latest batch.
+
+    Args:
+        args (argparse.Namespace): Flags from parse_args.
+
+    Returns:
+        int: Exit code; 1 if an export failed, else 0.
+    """
+    exit_code = 0
+    print(Fore.GREEN + f"Following the {', '.join(args.log_type)} logs for new events (Ctrl+C to stop)...")
+    try:
+        for log_type, new_logs in follow_events(args.log_type, interval=args.interval, polls=args.polls,
+                                                start_time=args.start, max_events=args.max_events or 1000,
+                                                level=args.level, provider_name=args.provider,
+                                                event_ids=args.event_ids):
+            count("fetch", "events", len(new_logs))
+            print(Fore.LIGHTWHITE_EX + f"\n📋 {len(new_logs)} new {log_type} logs.")
+            if process_logs(args, new_logs, append=True):
+                exit_code = 1
+    except KeyboardInterrupt:
+        print(Fore.LIGHTWHITE_EX + "\n👋 Stopped following.")
+    return exit_code
+
+
+def run_pipeline(args: argparse.Namespace) -> int:
+    """
+    Runs the batch steps: fetch, search, print, summarize and export.
+
+    Args:
+        args (argparse.Namespace): Flags from parse_args.
+
+    Returns:
+        int: Exit code; 1 if an export failed, else 0.
+    """
+    filters = dict(start_time=args.start, end_time=args.end, max_events=args.max_events,
+                   level=args.level, provider_name=args.provider, event_ids=args.event_ids)
+
+    if args.evtx:
+        from utils.evtx_reader import read_evtx_records  # only needed for offline files
+        with stage("fetch"):
+            parsed_logs = read_evtx_records(args.evtx, **filters)
+    elif args.input:
+        with stage("fetch"):
+            parsed_logs = load_export(args.input, **filters)
+    else:
+        # the live log defaults match the interactive prompts
+        filters["start_time"] = filters["start_time"] or resolve_time("today")
+        filters["end_time"] = filters["end_time"] or resolve_time("now")
+        filters["max_events"] = filters["max_events"] or 100
+        if args.hosts or args.inventory:
+            from utils.fleet import fetch_fleet_records, load_inventory, parse_hosts
+            hosts = load_inventory(args.inventory) if args.inventory else parse_hosts(args.hosts.split(","))
+            print(Fore.GREEN + f"Fetching logs from {len(hosts)} hosts...")
+            parsed_logs = fetch_fleet_records(hosts, log_type=args.log_type[0], **filters,
+                                              max_workers=args.max_hosts, timeout=args.host_timeout)
+        elif can_stream(args):
+            return stream_export(args, filters)
+        else:
+            print(Fore.GREEN + "Fetching logs...")
+            store = get_event_store(args.store) if args.store else None
+            windows = args.windows or auto_windows(filters["start_time"], filters["end_time"],
+                                                   filters["max_events"])
+            if len(args.log_type) > 1 or windows > 1:
+                parsed_logs = fetch_event_records_sharded(args.log_type, **filters, windows=windows,
+                                                          store=store)
+            else:
+                parsed_logs = fetch_event_records(log_type=args.log_type[0], **filters, store=store)
+    count("fetch", "events", len(parsed_logs))
+    print(Fore.LIGHTWHITE_EX + f"📋 {len(parsed_logs)} logs returned.")
+    return process_logs(args, parsed_logs)
+
+
+def process_logs(args: argparse.Namespace, parsed_logs, append: bool = False) -> int:
+    """
+    Searches, prints, summarizes and exports fetched logs as the flags ask.
+
+    Args:
+        args (argparse.Namespace): Flags from parse_args.
+        parsed_logs: Fetched logs.
+        append (bool): Add to existing export files where the format allows it.
+
+    Returns:
+        int: Exit code; 1 if an export failed, else 0.
+    """
+    if args.search or args.regex:
+        with stage("search"):
+            parsed_logs = search_logs(parsed_logs, args.search or "", pattern=args.regex)
+        count("search", "matches", len(parsed_logs))
+        print(Fore.LIGHTWHITE_EX + f"🔎 {len(parsed_logs)} logs match the search.")
+
+    if args.show_logs and parsed_logs:
+        with stage("format"):
+            formatted = format_logs_for_gpt(parsed_logs)
+        print(formatted)
+
+    summary = None
+    if args.summarize and parsed_logs:
+        with stage("summarize"):
+            summary = summarize_with_gpt(parsed_logs, stats=args.stats, max_concurrency=args.summary_concurrency)
+        print(Fore.LIGHTWHITE_EX + "\n📄 GPT Summary:\n")
+        print(summary)
+
+    if args.output and parsed_logs:
+        # every format is written in one pass over the logs
+        results = export_many(parsed_logs, args.output, gpt_summary=summary,
+                              max_workers=args.export_workers, stats=args.stats, append=append)
+        return 1 if None in results.values() else 0
+    return 0
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_batch(parse_args()))
     main()
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from utils import async_summarize
+from utils.async_summarize import AsyncSummarizer
+
+
+class StatusError(Exception):
+    """Looks like an openai APIStatusError: a status code and the response headers."""
+
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def reply(text: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+                           usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5))
+
+
+class FakeClient:
+    """Async client that answers each prompt from a script of replies and errors."""
+
+    def __init__(self, script):
+        self.script = script
+        self.prompts = []
+        self.cancelled = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, max_tokens, temperature):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        try:
+            return await self.script(prompt, self.prompts.count(prompt))
+        except asyncio.CancelledError:
+            self.cancelled.append(prompt)
+            raise
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records backoff delays instead of waiting them out."""
+    delays = []
+    sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(async_summarize.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_retries_429_after_the_servers_wait(sleeps):
+    async def script(prompt, attempt):
+        if attempt == 1:
+            raise StatusError(429, {"retry-after": "2.5"})
+        return reply("ok")
+
+    summarizer = AsyncSummarizer(client=FakeClient(script), max_delay=30)
+    assert run(summarizer.complete("hello")) == "ok"
+    assert sleeps == [2.5]
+    assert summarizer.usage["retries"] == 1
+
+
+def test_retry_after_is_capped(sleeps):
+    async def script(prompt, attempt):
+        if attempt == 1:
+            raise StatusError(503, {"retry-after": "3600"})
+        return reply("ok")
+
+    run(AsyncSummarizer(client=FakeClient(script), max_delay=5).complete("hello"))
+    assert sleeps == [5]
+
+
+def test_tokens_are_charged_once_and_refunded_on_failure(sleeps):
+    async def script(prompt, attempt):
+        raise StatusError(429)
+
+    summarizer = AsyncSummarizer(client=FakeClient(script), max_retries=3, tokens_per_minute=10_000)
+
+    async def attempt():
+        with pytest.raises(StatusError):
+            await summarizer.complete("hello", max_tokens=500)
+        return summarizer._get_limits()[2]
+
+    bucket = run(attempt())
+    assert len(summarizer.client.prompts) == 4
+    assert bucket.tokens == pytest.approx(bucket.capacity)
+
+
+def test_successful_request_is_charged_once(sleeps):
+    async def script(prompt, attempt):
+        if attempt < 3:
+            raise StatusError(500)
+        return reply("ok")
+
+    summarizer = AsyncSummarizer(client=FakeClient(script), tokens_per_minute=10_000)
+
+    async def attempt():
+        await summarizer.complete("hello", max_tokens=500)
+        return summarizer._get_limits()[2]
+
+    bucket = run(attempt())
+    cost = async_summarize.estimate_tokens("hello") + 500
+    assert bucket.capacity - bucket.tokens == pytest.approx(cost, abs=1)
+
+
+def test_failure_cancels_the_other_requests(sleeps):
+    async def script(prompt, attempt):
+        if prompt == "bad":
+            await asyncio.sleep(0)
+            raise StatusError(400)  # not retryable
+        await asyncio.Event().wait()  # never answers
+
+    client = FakeClient(script)
+    with pytest.raises(StatusError):
+        run(AsyncSummarizer(client=client).complete_many(["slow 1", "bad", "slow 2"]))
+    assert sorted(client.cancelled) == ["slow 1", "slow 2"]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Chat completions endpoint that rate-limits the first request of each prompt."""
+    seen = set()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        if prompt not in self.seen:
+            self.seen.add(prompt)
+            self._send(429, {"error": {"message": "slow down", "type": "rate_limit"}}, {"retry-after": "0"})
+            return
+        self._send(200, {
+            "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": f"summary of {prompt}"}}],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 4, "total_tokens": 16},
+        })
+
+    def _send(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    StubHandler.seen = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+
+
+def test_local_stub_server(stub_server):
+    pytest.importorskip("openai")
+    summarizer = AsyncSummarizer(api_key="test", base_url=stub_server, base_delay=0.01)
+    replies = run(summarizer.complete_many(["one", "two"]))
+    assert replies == ["summary of one", "summary of two"]
+    assert summarizer.usage == {"requests": 2, "retries": 2, "prompt_tokens": 24, "completion_tokens": 8}
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from benchmarks import run_benchmarks
+from benchmarks.synthetic import generate_records, to_format_list, to_json
+from utils.parse_logs import DATETIME_FORMAT, iter_parse_logs, parse_json_logs
+
+
+def test_records_are_repeatable_and_newest_first():
+    records = list(generate_records(500, seed=3))
+    assert records == list(generate_records(500, seed=3))
+    assert records != list(generate_records(500, seed=4))
+    assert [r["RecordId"] for r in records] == list(range(500, 0, -1))
+    times = [datetime.strptime(r["TimeCreated"], DATETIME_FORMAT) for r in records]
+    assert times == sorted(times, reverse=True)
+
+
+def test_message_length_and_skew():
+    assert {len(r["Message"]) for r in generate_records(200, message_length=1000)} == {1000}
+    skewed = [r["Id"] for r in generate_records(2000, skew=3)]
+    top = max(set(skewed), key=skewed.count)
+    assert skewed.count(top) > len(skewed) / 2
+
+
+def test_rendered_output_parses_back():
+    records = list(generate_records(300))
+    assert parse_json_logs(to_json(records)) == records
+
+    # multi-line messages come back through their indented continuation lines
+    listed = list(iter_parse_logs(to_format_list(records).splitlines()))
+    assert [(log["ProviderName"], int(log["Id"]), log["Message"]) for log in listed] == \
+        [(r["ProviderName"], r["Id"], r["Message"]) for r in records]
+
+
+def test_compare_flags_slower_steps():
+    baseline = {"sizes": {"1000": {"parse_logs": {"seconds": 1.0}, "export_to_csv": {"seconds": 2.0}}}}
+    results = {"sizes": {"1000": {"parse_logs": {"seconds": 1.5}, "export_to_csv": {"seconds": 2.1},
+                                  "export_to_md": {"seconds": 9.0}}}}
+    assert run_benchmarks.compare(results, baseline, max_regression=0.25) == ["parse_logs at 1000 events: +50%"]
+
+
+def test_bench_size_times_every_step(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    steps = run_benchmarks.bench_size(50, repeat=1, message_length=None, skew=1.1,
+                                      stub_latency=0.0, formats=("csv", "jsonl"))
+    assert set(steps) == {"parse_logs", "parse_json_logs", "format_logs_for_gpt", "export_to_csv",
+                          "export_to_jsonl", "summarize_mapreduce", "summarize_mapreduce_clustered"}
+    assert steps["summarize_mapreduce"]["requests"] >= 1
+    assert all(step["seconds"] > 0 for step in steps.values())
+    # exports go to a temporary folder, not the working directory
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from utils import summarize_logs
+from utils.cluster_logs import (CLUSTER_HEADER, cluster_logs, format_cluster, format_cluster_counts,
+                                message_template)
+from utils.event_table import EventTable
+from utils.parse_logs import DATETIME_FORMAT
+from utils.summary_cache import SummaryCache
+
+BASE_TIME = datetime(2025, 6, 25, 10, 0, 0)
+
+
+def event(event_id: int, minute: int, message: str = None) -> dict:
+    return {"TimeCreated": (BASE_TIME + timedelta(minutes=minute)).strftime(DATETIME_FORMAT),
+            "Id": event_id, "LevelDisplayName": "Error", "ProviderName": "Service Control Manager",
+            "Message": message or f"The service {event_id} terminated unexpectedly. It has done this 3 time(s)."}
+
+
+def window() -> list[dict]:
+    """300 minutes of events, newest first: 150 event types, each seen twice."""
+    return [event(minute % 150, minute) for minute in reversed(range(300))]
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    """Replaces the OpenAI client with one that records every prompt."""
+    prompts = []
+
+    def create(model, messages, max_tokens, **kwargs):
+        prompts.append(messages[-1]["content"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Summary."))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(summarize_logs, "client", client)
+    return prompts
+
+
+def chunk_requests(prompts: list[str]) -> list[str]:
+    return [prompt for prompt in prompts if prompt.startswith(summarize_logs.CHUNK_PROMPT)]
+
+
+def test_message_template_masks_variable_parts():
+    assert (message_template("Logon from 10.0.0.5:445 by S-1-5-21-1-2-3 at C:\\Windows\\x.exe, code 0x1F")
+            == "Logon from <IP> by <SID> at <PATH> code <HEX>")
+
+
+def test_clusters_in_first_seen_order():
+    clusters = cluster_logs(window())
+    assert [c["Id"] for c in clusters[:3]] == [0, 1, 2]
+    assert clusters[0]["Count"] == 2
+    assert clusters[0]["FirstSeen"] == BASE_TIME.strftime(DATETIME_FORMAT)
+    assert clusters[0]["LastSeen"] == (BASE_TIME + timedelta(minutes=150)).strftime(DATETIME_FORMAT)
+
+
+def test_tables_cluster_like_dicts():
+    logs = window()
+    clusters = cluster_logs(logs)
+    assert cluster_logs(EventTable.from_records(logs)) == clusters
+    assert sum(c["Count"] for c in clusters) == len(logs)
+
+
+def test_cluster_names_its_hosts():
+    logs = [dict(event(7, minute), Host=f"web{minute % 3}") for minute in range(6)]
+    [cluster] = cluster_logs(logs)
+    assert format_cluster(cluster).startswith(
+        f"[6x, {logs[0]['TimeCreated']} to {logs[-1]['TimeCreated']}] Service Control Manager "
+        "(Event ID 7) on 3 hosts (web0, web1, web2): ")
+
+
+def test_small_set_is_sent_clustered_in_one_request(requests):
+    summarize_logs.summarize_logs_mapreduce([event(minute % 5, minute) for minute in range(20)], cluster=True)
+    assert len(requests) == 1
+    assert CLUSTER_HEADER in requests[0]
+    assert requests[0].count("(Event ID ") == 5
+    assert requests[0].count("[4x, ") == 5
+
+
+def test_counts_block_lists_busiest_groups():
+    logs = window() + [event(7, -1)]
+    block = format_cluster_counts(cluster_logs(logs), limit=2)
+    assert block.splitlines()[1].startswith("- Service Control Manager (Event ID 7): 3x, ")
+    assert len(block.splitlines()) == 3
+
+
+def test_rerun_with_repeated_event_reuses_every_chunk(requests):
+    options = dict(cache=SummaryCache(":memory:"), cluster=True, chunk_tokens=600)
+    summarize_logs.summarize_logs_mapreduce(window(), **options)
+    assert len(chunk_requests(requests)) > 3
+
+    requests.clear()
+    summarize_logs.summarize_logs_mapreduce([event(42, 300)] + window(), **options)
+    assert chunk_requests(requests) == []
+    # only the final merge is sent again, with the new count
+    assert len(requests) == 1
+    assert "(Event ID 42): 3x" in requests[0]
+
+
+def test_rerun_with_new_group_sends_one_chunk(requests):
+    options = dict(cache=SummaryCache(":memory:"), cluster=True, chunk_tokens=600)
+    summarize_logs.summarize_logs_mapreduce(window(), **options)
+
+    requests.clear()
+    summarize_logs.summarize_logs_mapreduce([event(999, 300)] + window(), **options)
+    sent = chunk_requests(requests)
+    assert len(sent) == 1
+    assert "(Event ID 999)" in sent[0]
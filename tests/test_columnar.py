@@ -0,0 +1,81 @@
+import importlib.util
+
+import pytest
+
+from utils import columnar
+
+
+@pytest.fixture
+def without_pyarrow(monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec",
+                        lambda name, *args: None if name == "pyarrow" else find_spec(name, *args))
+
+
+def test_columnar_files_need_pyarrow(without_pyarrow):
+    assert columnar.columnar_unavailable("logs.parquet") == columnar.PYARROW_MISSING
+    assert columnar.columnar_unavailable("logs.ARROW") == columnar.PYARROW_MISSING
+    assert columnar.columnar_unavailable("logs.jsonl.gz") is None
+
+
+def test_cli_rejects_columnar_files_without_pyarrow(without_pyarrow, capsys):
+    import event_summarizer
+
+    for argv in (["--output", "errors.parquet"], ["--input", "archive.arrow"]):
+        with pytest.raises(SystemExit):
+            event_summarizer.parse_args(argv)
+        assert "pip install pyarrow" in capsys.readouterr().err
+
+
+def event(record_id: int, provider: str, **extra) -> dict:
+    return dict({"TimeCreated": f"06/25/2025 10:{record_id:02d}:00 AM", "Id": 7036, "Level": 4,
+                 "LevelDisplayName": "Information", "ProviderName": provider,
+                 "RecordId": record_id, "Message": f"Event {record_id}."}, **extra)
+
+
+@pytest.fixture
+def batches_with_new_providers():
+    """Three row groups of two logs, each bringing a provider the earlier ones lacked."""
+    pytest.importorskip("pyarrow")
+    providers = ["Disk", "Disk", "Kernel-Power", "Disk", "Service Control Manager", "Kernel-Power"]
+    return [event(i, provider) for i, provider in enumerate(providers)]
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    from utils import exports
+    monkeypatch.setattr(exports, "EXPORT_DIR", str(tmp_path))
+    return exports
+
+
+def test_arrow_dictionaries_grow_as_deltas(export_dir, batches_with_new_providers):
+    import pyarrow as pa
+
+    path = export_dir.export_to_arrow(batches_with_new_providers, "deltas.arrow", row_group_size=2)
+    reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+    assert reader.num_record_batches == 3
+    dictionaries = [reader.get_batch(i).column("ProviderName").dictionary.to_pylist() for i in range(3)]
+    # every batch sees one running dictionary that earlier batches' indices still fit
+    assert dictionaries[-1] == ["Disk", "Kernel-Power", "Service Control Manager"]
+    assert all(d == dictionaries[-1][:len(d)] for d in dictionaries)
+    assert list(columnar.iter_columnar_records(path)) == batches_with_new_providers
+
+
+def test_parquet_round_trip_keeps_types(export_dir, batches_with_new_providers):
+    import pyarrow.parquet as pq
+
+    path = export_dir.export_to_parquet(batches_with_new_providers, "typed.parquet", row_group_size=4)
+    assert pq.ParquetFile(path).metadata.num_row_groups == 2
+    table = columnar.read_columnar_table(path)
+    assert str(table.frame["ProviderName"].dtype) == "category"
+    assert table.frame["TimeCreated"].dtype.kind == "M"
+    assert table.to_records() == batches_with_new_providers
+
+
+def test_values_that_dont_fit_become_nulls(export_dir):
+    pytest.importorskip("pyarrow")
+    logs = [event(0, "Disk", Id="not a number", TimeCreated="yesterday", Host="web01")]
+    path = export_dir.export_to_arrow(logs, "nulls.arrow")
+    [record] = columnar.iter_columnar_records(path)
+    assert "Id" not in record and "TimeCreated" not in record
+    assert record["Host"] == "web01"
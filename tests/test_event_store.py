@@ -0,0 +1,99 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from utils import fetch_logs
+from utils.event_store import EventStore
+
+# a closed range in the past, so coverage doesn't end at "now"
+RANGE = dict(start_time="06/25/2025 10:00:00 AM", end_time="06/25/2025 11:00:00 AM")
+
+
+def event(record_id: int, level: int = 4, **extra) -> dict:
+    return dict({"TimeCreated": f"06/25/2025 10:{record_id:02d}:00 AM", "Id": 7036, "Level": level,
+                 "LevelDisplayName": {2: "Error", 4: "Information"}[level],
+                 "ProviderName": "Service Control Manager", "RecordId": record_id,
+                 "Message": f"The service {record_id} entered the stopped state."}, **extra)
+
+
+# newest first, as Get-WinEvent returns them
+EVENTS = [event(30, level=2), event(20), event(10, level=2)]
+
+
+class CannedRunner:
+    """Stands in for run_powershell: counts commands and replays fixed events."""
+
+    def __init__(self, events: list[dict]):
+        self.events = events
+        self.commands = []
+
+    def __call__(self, command: str) -> str:
+        self.commands.append(command)
+        return json.dumps(self.events)
+
+
+@pytest.fixture
+def store():
+    store = EventStore(":memory:")
+    yield store
+    store.close()
+
+
+def test_stored_events_read_back_unchanged(tmp_path):
+    path = str(tmp_path / "events.sqlite3")
+    logs = [event(30, Host="web01", Keywords=["Classic"]), event(20), event(10, level=2)]
+    store = EventStore(path)
+    assert store.upsert(logs) == 3
+    assert store.upsert(logs[:2]) == 0  # deduplicated by log name and record ID
+    store.close()
+
+    reopened = EventStore(path)
+    assert reopened.query(**RANGE) == logs
+    assert reopened.query(log_type="Application", **RANGE) == []
+    reopened.close()
+
+
+def test_repeat_query_skips_powershell(store):
+    runner = CannedRunner(EVENTS)
+    first = fetch_logs.fetch_event_records("System", **RANGE, runner=runner, store=store)
+    again = fetch_logs.fetch_event_records("System", **RANGE, runner=runner, store=store)
+    assert again == first == EVENTS
+    # narrower filters are answered from the broader fetch too
+    errors = fetch_logs.fetch_event_records("System", **RANGE, level=2, runner=runner, store=store)
+    assert errors == [EVENTS[0], EVENTS[2]]
+    assert len(runner.commands) == 1
+    assert store.stats() == {"hits": 2, "misses": 1, "events": 3, "ranges": 1}
+
+
+def test_broader_filters_need_powershell(store):
+    runner = CannedRunner([EVENTS[0], EVENTS[2]])
+    fetch_logs.fetch_event_records("System", **RANGE, level=2, runner=runner, store=store)
+    runner.events = EVENTS
+    assert fetch_logs.fetch_event_records("System", **RANGE, runner=runner, store=store) == EVENTS
+    assert len(runner.commands) == 2
+
+
+def test_cut_off_fetch_only_covers_its_newest_events(store):
+    runner = CannedRunner(EVENTS[:2])
+    fetch_logs.fetch_event_records("System", **RANGE, max_events=2, runner=runner, store=store)
+    # older events may exist below the cut, so only queries the stored ones fill are answered
+    assert store.lookup(**RANGE, max_events=1) == EVENTS[:1]
+    assert store.lookup(**RANGE, max_events=5) is None
+    # a range inside the covered part is answered whatever its max_events
+    assert store.lookup(start_time="06/25/2025 10:20:01 AM", end_time=RANGE["end_time"]) == EVENTS[:1]
+
+
+def test_coverage_ends_when_the_fetch_started(store):
+    store.add(EVENTS, start_time=RANGE["start_time"], end_time=None,
+              fetched_at=datetime(2025, 6, 25, 10, 45))
+    assert store.lookup(start_time=RANGE["start_time"], end_time="06/25/2025 10:44:59 AM") == EVENTS
+    assert store.lookup(**RANGE) is None
+
+
+def test_full_text_search(store):
+    if not store.full_text:
+        pytest.skip("SQLite was built without FTS5")
+    store.upsert(EVENTS, log_type="Setup")
+    found = store.search('"service 20"')
+    assert found == [dict(EVENTS[1], LogName="Setup")]
@@ -0,0 +1,70 @@
+import csv
+import json
+
+import pytest
+
+import event_summarizer
+from utils import exports, metrics
+
+
+def event(record_id: int, level: int = 4, message: str = "The Spooler service entered the stopped state.") -> dict:
+    return {"TimeCreated": f"06/25/2025 10:{record_id:02d}:00 AM", "Id": 7036, "Level": level,
+            "LevelDisplayName": {2: "Error", 4: "Information"}[level],
+            "ProviderName": "Service Control Manager", "RecordId": record_id, "Message": message}
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    monkeypatch.setattr(metrics, "_metrics", None)
+
+
+def test_failed_run_still_reports_profile_and_metrics(tmp_path, monkeypatch):
+    def failing_pipeline(args):
+        with metrics.stage("fetch"):
+            metrics.count("fetch", "events", 3)
+            raise RuntimeError("PowerShell went away")
+
+    monkeypatch.setattr(event_summarizer, "run_pipeline", failing_pipeline)
+    metrics_path = tmp_path / "run.json"
+    args = event_summarizer.parse_args(["--log-type", "System", "--metrics", str(metrics_path),
+                                        "--profile", str(tmp_path / "profiles"), "--profile-stages", "fetch"])
+
+    with pytest.raises(RuntimeError):
+        event_summarizer.run_batch(args)
+
+    assert json.loads(metrics_path.read_text())["stages"]["fetch"]["counts"] == {"events": 3}
+    assert sorted(p.suffix for p in (tmp_path / "profiles").iterdir()) == [".folded", ".pstats"]
+
+
+def test_flags_match_the_prompts():
+    args = event_summarizer.parse_args(["--log-type", "system", "application", "--level", "error",
+                                        "--event-ids", "7036, 41", "--start", "06/25/2025 10:00:00 AM"])
+    assert args.log_type == ["System", "Application"]
+    assert args.level == 2
+    assert args.event_ids == [7036, 41]
+    assert args.start == "06/25/2025 10:00:00 AM"
+
+
+@pytest.mark.parametrize("argv", [["--level", "loud"], ["--log-type", "Kernel"], ["--start", "soon"],
+                                  ["--regex", "("], ["--export-workers", "-1"]])
+def test_bad_flags_are_rejected(argv, capsys):
+    with pytest.raises(SystemExit):
+        event_summarizer.parse_args(argv)
+    assert "error:" in capsys.readouterr().err
+
+
+def test_batch_run_filters_and_exports_an_earlier_export(tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(event_summarizer.time, "sleep", lambda seconds: pytest.fail("batch mode slept"))
+    logs = [event(1), event(2, level=2, message="The Themes service terminated unexpectedly."), event(3, level=2)]
+    archive = exports.export_many(logs, ["archive.jsonl.gz"])["archive.jsonl.gz"]
+
+    args = event_summarizer.parse_args(["--input", archive, "--level", "error", "--search", "stopped",
+                                        "--output", "errors.csv", "--output", "errors.jsonl"])
+    assert event_summarizer.run_batch(args) == 0
+
+    with open(tmp_path / "errors.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["RecordId"] for row in rows] == ["3"]
+    with open(tmp_path / "errors.jsonl", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == [logs[2]]
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from utils import exports
+from utils.event_table import EventTable
+from utils.parse_logs import format_logs_for_gpt
+
+
+def event(record_id, event_id=7036, level=4, **extra) -> dict:
+    return dict({"TimeCreated": "06/25/2025 10:00:00 AM", "Id": event_id, "Level": level,
+                 "LevelDisplayName": "Information", "ProviderName": "Service Control Manager",
+                 "RecordId": record_id, "Message": f"Service {record_id} stopped."}, **extra)
+
+
+@pytest.fixture
+def table() -> EventTable:
+    # the second log lacks every number and the first lacks the extra field
+    return EventTable.from_records([
+        event(1, Keywords="Classic"),
+        event(None, event_id=None, level=None),
+        event(3, event_id=41, level=1, Keywords="Audit"),
+    ])
+
+
+def test_missing_numbers_stay_missing(table):
+    assert str(table.frame["Id"].dtype) == "Int32"
+    records = table.to_records()
+    assert records[0]["Id"] == 7036 and records[0]["RecordId"] == 1
+    assert records[1]["Id"] is None
+    assert records[1]["Level"] is None
+    assert records[1]["RecordId"] is None
+
+
+def test_missing_extra_fields_stay_missing(table):
+    records = table.to_records()
+    assert [r["Keywords"] for r in records] == ["Classic", None, "Audit"]
+    text = format_logs_for_gpt(records)
+    assert "nan" not in text and "(Event ID 0)" not in text
+
+
+def test_filters_skip_missing_values(table):
+    assert [r["RecordId"] for r in table.filter(level=4)] == [1]
+    assert [r["RecordId"] for r in table.filter(event_ids=[41])] == [3]
+    assert table.stats()["ids"] == {7036: 1, 41: 1}
+
+
+def test_exports_leave_missing_values_empty(table, tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_DIR", str(tmp_path))
+    results = exports.export_many(table, ["table.jsonl", "table.csv"])
+    with open(results["table.jsonl"], encoding="utf-8") as f:
+        second = json.loads(f.readlines()[1])
+    assert second["Id"] is None and second["Keywords"] is None
+    with open(results["table.csv"], encoding="utf-8") as f:
+        text = f.read()
+    assert ",0," not in text and "nan" not in text
+
+
+def test_columnar_round_trip_keeps_missing_values(table, tmp_path):
+    pytest.importorskip("pyarrow")
+    from utils.columnar import read_columnar_table, write_table_frame
+
+    for name in ("table.parquet", "table.arrow"):
+        path = str(tmp_path / name)
+        write_table_frame(table.frame, path)
+        loaded = read_columnar_table(path)
+        assert str(loaded.frame["RecordId"].dtype) == "Int64"
+        assert loaded.to_records() == table.to_records()
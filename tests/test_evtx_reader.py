@@ -0,0 +1,265 @@
+import struct
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from utils.evtx_reader import (CHUNK_MAGIC, CHUNK_RECORDS_OFFSET, CHUNK_SIZE, FILE_HEADER_SIZE,
+                               FILE_MAGIC, RECORD_MAGIC, EvtxFormatError, iter_evtx_records,
+                               read_evtx_records)
+from utils.parse_logs import DATETIME_FORMAT
+
+BASE_TIME = datetime(2025, 6, 25, 10, 0, 0).astimezone()
+
+
+class Sub:
+    """A substitution slot in a template: the record supplies value number index."""
+
+    def __init__(self, index: int, optional: bool = False):
+        self.index = index
+        self.optional = optional
+
+
+def event_xml(provider, event_id, level, params) -> tuple:
+    """An <Event> tree as (name, attributes, children) tuples."""
+    return ("Event", [], [
+        ("System", [], [
+            ("Provider", [("Name", provider)], []),
+            ("EventID", [], [event_id]),
+            ("Level", [], [level]),
+        ]),
+        ("EventData", [], [("Data", [("Name", f"param{i + 1}")], [value])
+                           for i, value in enumerate(params)]),
+    ])
+
+
+class ChunkBuilder:
+    """
+    Writes a 64 KiB .evtx chunk holding records encoded as binary XML.
+
+    Offsets inside a chunk are absolute, so everything is appended to one
+    buffer and names are stored inline right where they are referenced.
+    """
+
+    def __init__(self):
+        self.data = bytearray(CHUNK_RECORDS_OFFSET)
+        self.first_id = None
+        self.template_offset = None
+
+    def _put(self, fmt: str, *values):
+        self.data += struct.pack(fmt, *values)
+
+    def _name(self, text: str):
+        self._put("<I", len(self.data) + 4)
+        self._put("<IHH", 0, 0, len(text))
+        self.data += text.encode("utf-16-le") + b"\x00\x00"
+
+    def _content(self, value):
+        if isinstance(value, Sub):
+            self._put("<BHB", 0x0e if value.optional else 0x0d, value.index, 0x01)
+        else:
+            value = str(value)
+            self._put("<BBH", 0x05, 0x01, len(value))
+            self.data += value.encode("utf-16-le")
+
+    def _element(self, node: tuple):
+        name, attrs, children = node
+        self._put("<BHI", 0x41 if attrs else 0x01, 0, 0)
+        self._name(name)
+        if attrs:
+            self._put("<I", 0)
+            for key, value in attrs:
+                self.data.append(0x06)
+                self._name(key)
+                self._content(value)
+        if not children:
+            self.data.append(0x03)
+            return
+        self.data.append(0x02)
+        for child in children:
+            if isinstance(child, tuple):
+                self._element(child)
+            else:
+                self._content(child)
+        self.data.append(0x04)
+
+    def _fragment(self, node: tuple):
+        self.data += b"\x0f\x01\x01\x00"
+        self._element(node)
+        self.data.append(0x00)
+
+    def _record(self, record_id: int, created: datetime, write_body):
+        if self.first_id is None:
+            self.first_id = record_id
+        start = len(self.data)
+        filetime = int((created - datetime(1601, 1, 1, tzinfo=timezone.utc)).total_seconds() * 10_000_000)
+        self.data += RECORD_MAGIC
+        self._put("<IQQ", 0, record_id, filetime)
+        write_body()
+        size = len(self.data) - start + 4
+        self._put("<I", size)
+        struct.pack_into("<I", self.data, start + 4, size)
+
+    def add_plain(self, record_id: int, created: datetime, node: tuple):
+        """Adds a record whose XML is written out in full."""
+        self._record(record_id, created, lambda: self._fragment(node))
+
+    def add_templated(self, record_id: int, created: datetime, template: tuple, values: list):
+        """
+        Adds a record that instantiates template with (type, bytes) values.
+
+        The template is defined inline by the first record and referenced by
+        offset from every later one, as Windows does.
+        """
+        def write_body():
+            self.data += b"\x0f\x01\x01\x00"
+            self._put("<BBI", 0x0c, 0x01, 0)
+            if self.template_offset is None:
+                self.template_offset = len(self.data) + 4
+                self._put("<I", self.template_offset)
+                header = len(self.data)
+                self.data += bytes(24)
+                self._fragment(template)
+                struct.pack_into("<I", self.data, header + 20, len(self.data) - header - 24)
+            else:
+                self._put("<I", self.template_offset)
+            self._put("<I", len(values))
+            for value_type, raw in values:
+                self._put("<HBB", len(raw), value_type, 0)
+            for _, raw in values:
+                self.data += raw
+        self._record(record_id, created, write_body)
+
+    def build(self) -> bytes:
+        header = bytearray(CHUNK_MAGIC + bytes(CHUNK_RECORDS_OFFSET - len(CHUNK_MAGIC)))
+        struct.pack_into("<Q", header, 24, self.first_id or 0)
+        struct.pack_into("<I", header, 48, len(self.data))
+        chunk = header + self.data[CHUNK_RECORDS_OFFSET:]
+        return bytes(chunk + bytes(CHUNK_SIZE - len(chunk)))
+
+
+def write_evtx(path, *chunks: ChunkBuilder) -> str:
+    header = FILE_MAGIC + bytes(FILE_HEADER_SIZE - len(FILE_MAGIC))
+    path.write_bytes(header + b"".join(chunk.build() for chunk in chunks))
+    return str(path)
+
+
+def utf16(text: str) -> tuple[int, bytes]:
+    return 0x01, text.encode("utf-16-le") + b"\x00\x00"
+
+
+def service_values(event_id: int, level: int, service: str) -> list:
+    return [utf16("Service Control Manager"), (0x06, struct.pack("<H", event_id)),
+            (0x04, struct.pack("<B", level)), utf16(service)]
+
+
+SERVICE_TEMPLATE = event_xml(Sub(0), Sub(1), Sub(2), [Sub(3), "stopped"])
+
+
+@pytest.fixture
+def sample(tmp_path):
+    """Two chunks stored out of order, as after the ring buffer wrapped."""
+    older = ChunkBuilder()
+    older.add_plain(1, BASE_TIME, event_xml("Kernel-Power", 41, 1, ["unexpected shutdown"]))
+    older.add_templated(2, BASE_TIME + timedelta(minutes=1), SERVICE_TEMPLATE,
+                        service_values(7036, 4, "Spooler"))
+    older.add_templated(3, BASE_TIME + timedelta(minutes=2), SERVICE_TEMPLATE,
+                        service_values(7031, 2, "Themes"))
+    newer = ChunkBuilder()
+    newer.add_plain(4, BASE_TIME + timedelta(minutes=3), event_xml("Disk", 7, 3, ["bad block"]))
+    return write_evtx(tmp_path / "System.evtx", newer, older)
+
+
+def test_reads_plain_and_templated_records(sample):
+    records = read_evtx_records(sample, newest_first=False)
+    assert [r["RecordId"] for r in records] == [1, 2, 3, 4]
+    assert records[0] == {
+        "TimeCreated": BASE_TIME.strftime(DATETIME_FORMAT), "Id": 41, "Level": 1,
+        "LevelDisplayName": "Critical", "ProviderName": "Kernel-Power", "RecordId": 1,
+        "Message": "param1: unexpected shutdown",
+    }
+    # the second templated record reuses the definition from the first
+    assert records[1]["ProviderName"] == records[2]["ProviderName"] == "Service Control Manager"
+    assert records[2]["Id"] == 7031
+    assert records[2]["LevelDisplayName"] == "Error"
+    assert records[2]["Message"] == "param1: Themes\nparam2: stopped"
+
+
+def test_newest_first_orders_chunks_by_record_id(sample):
+    assert [r["RecordId"] for r in iter_evtx_records(sample)] == [4, 3, 2, 1]
+
+
+def test_filters(sample):
+    def ids(**filters):
+        return [r["RecordId"] for r in iter_evtx_records(sample, **filters)]
+
+    at = lambda minutes: (BASE_TIME + timedelta(minutes=minutes)).strftime(DATETIME_FORMAT)
+    assert ids(start_time=at(1), end_time=at(2)) == [3, 2]
+    assert ids(level=2) == [3]
+    assert ids(provider_name="service control manager") == [3, 2]
+    assert ids(event_ids=[41, 7]) == [4, 1]
+    assert ids(max_events=2) == [4, 3]
+
+
+def test_corrupt_record_is_skipped(tmp_path):
+    chunk = ChunkBuilder()
+    chunk.add_plain(1, BASE_TIME, event_xml("Disk", 7, 3, ["bad block"]))
+    start = len(chunk.data)
+    chunk.add_plain(2, BASE_TIME, event_xml("Disk", 7, 3, ["bad block"]))
+    chunk.data[start + 28] = 0x0b  # a processing-instruction token where the element should open
+    chunk.add_plain(3, BASE_TIME, event_xml("Disk", 11, 2, ["controller error"]))
+    path = write_evtx(tmp_path / "corrupt.evtx", chunk)
+    assert [r["RecordId"] for r in iter_evtx_records(path)] == [3, 1]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "notes.evtx"
+    path.write_bytes(b"not an event log".ljust(FILE_HEADER_SIZE + CHUNK_SIZE, b"\x00"))
+    with pytest.raises(EvtxFormatError):
+        read_evtx_records(str(path))
+
+
+def test_invalid_time_raises(sample):
+    with pytest.raises(ValueError):
+        read_evtx_records(sample, start_time="yesterday")
+
+
+def test_template_values_keep_their_types(tmp_path):
+    sid = bytes([1, 5]) + (5).to_bytes(6, "big") + struct.pack("<5I", 21, 1, 2, 3, 500)
+    filetime = int((BASE_TIME - datetime(1601, 1, 1, tzinfo=timezone.utc)).total_seconds() * 10_000_000)
+    chunk = ChunkBuilder()
+    chunk.add_templated(1, BASE_TIME, event_xml(Sub(0), Sub(1), Sub(2), [Sub(3), Sub(4), Sub(5), Sub(6)]), [
+        utf16("Application Error"), (0x06, struct.pack("<H", 1000)), (0x04, struct.pack("<B", 2)),
+        (0x14, struct.pack("<I", 0xC0000005)), (0x13, sid),
+        (0x88, struct.pack("<3I", 1, 2, 3)), (0x11, struct.pack("<Q", filetime)),
+    ])
+    [record] = read_evtx_records(write_evtx(tmp_path / "typed.evtx", chunk))
+    assert (record["Id"], record["Level"]) == (1000, 2)
+    assert record["Message"].splitlines() == [
+        "param1: 0xc0000005", "param2: S-1-5-21-1-2-3-500", "param3: 1, 2, 3",
+        f"param4: {BASE_TIME.astimezone(timezone.utc).isoformat()}",
+    ]
+
+
+def test_optional_substitution_without_value_is_dropped(tmp_path):
+    template = ("Event", [], [
+        event_xml(Sub(0), Sub(1), Sub(2), [])[2][0],
+        ("EventData", [], [("Data", [("Name", Sub(3, optional=True))], [Sub(4, optional=True)]),
+                           ("Data", [("Name", "Reason")], [Sub(5)])]),
+    ])
+    chunk = ChunkBuilder()
+    chunk.add_templated(1, BASE_TIME, template, service_values(7040, 4, "unused")[:3]
+                        + [(0x00, b""), (0x00, b""), utf16("Updates")])
+    [record] = read_evtx_records(write_evtx(tmp_path / "optional.evtx", chunk))
+    assert record["Message"] == "Reason: Updates"
+
+
+def test_each_chunk_has_its_own_templates(tmp_path):
+    # both templates are defined at the same offset of their own chunk
+    first, second = ChunkBuilder(), ChunkBuilder()
+    first.add_templated(1, BASE_TIME, SERVICE_TEMPLATE, service_values(7036, 4, "Spooler"))
+    second.add_templated(2, BASE_TIME, event_xml(Sub(0), Sub(1), Sub(2), ["disk", Sub(3)]),
+                         service_values(7, 3, "Harddisk0"))
+    records = read_evtx_records(write_evtx(tmp_path / "two.evtx", first, second), newest_first=False)
+    assert first.template_offset == second.template_offset
+    assert [r["Message"] for r in records] == ["param1: Spooler\nparam2: stopped",
+                                               "param1: disk\nparam2: Harddisk0"]
@@ -0,0 +1,90 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+from utils import exports
+from utils.parse_logs import STRUCTURED_FIELDS
+
+
+def event(record_id: int, **extra) -> dict:
+    return dict({"TimeCreated": "06/25/2025 10:00:00 AM", "Id": 7036, "Level": 4,
+                 "LevelDisplayName": "Information", "ProviderName": "Service Control Manager",
+                 "RecordId": record_id, "Message": f"Service {record_id} stopped."}, **extra)
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def failing_stream(good: int):
+    """Yields some logs, then fails like iter_json_logs on a stray non-JSON line."""
+    for i in range(good):
+        yield event(i)
+    raise json.JSONDecodeError("Expecting value", "WARNING: something", 0)
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_source_error_closes_and_reports_every_file(monkeypatch, capsys, max_workers):
+    opened = []
+    make_writer = exports._make_writer
+
+    def recording_make_writer(*args):
+        opened.append(make_writer(*args))
+        return opened[-1]
+
+    monkeypatch.setattr(exports, "_make_writer", recording_make_writer)
+
+    results = exports.export_many(failing_stream(2500), ["out.json", "out.csv", "out.md"],
+                                  max_workers=max_workers)
+
+    assert results == {"out.json": None, "out.csv": None, "out.md": None}
+    assert all(writer.file is None for writer in opened)
+    output = capsys.readouterr().out
+    assert output.count("❌") == 3
+    assert "reading them failed: Expecting value" in output
+
+
+def test_error_on_first_log_is_reported(capsys):
+    assert exports.export_many(failing_stream(0), ["out.jsonl"]) == {"out.jsonl": None}
+    assert "❌ Error reading logs to export" in capsys.readouterr().out
+
+
+def test_streamed_csv_reports_late_fields(export_dir, capsys):
+    logs = iter([event(1, LogName="System"), event(2, LogName="System", Host="web01")])
+    results = exports.export_many(logs, ["stream.csv"])
+    with open(results["stream.csv"], newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert set(rows[0]) == set(STRUCTURED_FIELDS) | {"LogName"}
+    assert len(rows) == 2
+    assert "has no column for Host" in capsys.readouterr().out
+
+
+def test_list_csv_has_every_field(capsys):
+    results = exports.export_many([event(1), event(2, Host="web01")], ["list.csv"])
+    with open(results["list.csv"], newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]["Host"] == "web01"
+    assert "has no column" not in capsys.readouterr().out
+
+
+def exported_text(path: str) -> str:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        # the Markdown header says when the file was written
+        return "".join(line for line in f if not line.startswith("**Exported:**"))
+
+
+def test_threaded_and_serial_exports_match(export_dir, monkeypatch):
+    logs = [event(i, Host=f"web{i % 3}") for i in range(2500)]
+    filenames = ["out.json", "out.jsonl.gz", "out.csv", "out.txt", "out.md"]
+    outputs = {}
+    for max_workers in (0, 3):
+        monkeypatch.setattr(exports, "EXPORT_DIR", str(export_dir / str(max_workers)))
+        results = exports.export_many(logs, filenames, gpt_summary="Quiet day.", max_workers=max_workers)
+        outputs[max_workers] = {name: exported_text(path) for name, path in results.items()}
+    assert outputs[3] == outputs[0]
+    assert outputs[0]["out.csv"].count("\n") == 2501
@@ -0,0 +1,151 @@
+import json
+import re
+import subprocess
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from utils import fetch_logs
+from utils.parse_logs import DATETIME_FORMAT
+
+
+def event(record_id: int, message: str = "The service entered the stopped state.") -> dict:
+    return {"TimeCreated": "06/25/2025 10:00:00 AM", "Id": 7036, "Level": 4,
+            "LevelDisplayName": "Information", "ProviderName": "Service Control Manager",
+            "RecordId": record_id, "Message": message}
+
+
+class CannedRunner:
+    """Stands in for run_powershell: records each command and replays fixed stdout."""
+
+    def __init__(self, output: str = "", error: Exception = None):
+        self.output = output
+        self.error = error
+        self.commands = []
+
+    def __call__(self, command: str) -> str:
+        self.commands.append(command)
+        if self.error:
+            raise self.error
+        return self.output
+
+
+def test_single_object_output():
+    # PowerShell emits a bare object, not an array, when only one event matched
+    runner = CannedRunner(json.dumps(event(1)))
+    records = fetch_logs.fetch_event_records("System", runner=runner)
+    assert records == [event(1)]
+    assert len(runner.commands) == 1
+
+
+def test_array_output_keeps_order_and_multiline_messages():
+    message = "Line one.\r\n\r\nLine two."
+    runner = CannedRunner(json.dumps([event(3), event(2, message), event(1)]))
+    records = fetch_logs.fetch_event_records("System", runner=runner)
+    assert [r["RecordId"] for r in records] == [3, 2, 1]
+    assert records[1]["Message"] == message
+
+
+@pytest.mark.parametrize("output", ["", "  \r\n"])
+def test_empty_output(output):
+    assert fetch_logs.fetch_event_records("System", runner=CannedRunner(output)) == []
+
+
+def test_ms_date_is_converted():
+    ms = 1719309600000
+    record = dict(event(1), TimeCreated=f"/Date({ms})/", Message=None)
+    records = fetch_logs.fetch_event_records("System", runner=CannedRunner(json.dumps(record)))
+    expected = datetime.fromtimestamp(ms / 1000, tz=timezone.utc).astimezone().strftime(DATETIME_FORMAT)
+    assert records[0]["TimeCreated"] == expected
+    assert records[0]["Message"] == ""
+
+
+def test_no_matches_returns_empty():
+    # Get-WinEvent exits non-zero when nothing matches the filter
+    runner = CannedRunner(error=subprocess.CalledProcessError(1, "powershell"))
+    assert fetch_logs.fetch_event_records("System", runner=runner) == []
+
+
+def test_invalid_filters_never_run_powershell():
+    runner = CannedRunner("[]")
+    assert fetch_logs.fetch_event_records("System", start_time="yesterday", runner=runner) == []
+    assert fetch_logs.fetch_event_records("System", level=9, runner=runner) == []
+    assert runner.commands == []
+
+
+def test_filter_string_fields():
+    filters = fetch_logs.build_filter_string("Application", "06/25/2025 10:00:00 AM",
+                                             "06/25/2025 02:30:00 PM", 2, None, [1, 2])
+    assert filters == ("LogName='Application'; StartTime='2025-06-25T10:00:00'; "
+                       "EndTime='2025-06-25T14:30:00'; Level=2; Id=@(1,2)")
+    assert fetch_logs.build_filter_string("System", event_ids=[41]).endswith("; Id=41")
+
+
+@pytest.mark.parametrize("provider, quoted", [
+    ("O'Brien Service", "'O''Brien Service'"),
+    ('Say "hi"', "'Say \"hi\"'"),
+    ("$env:USERNAME", "'$env:USERNAME'"),
+    ("`n$(Remove-Item x)", "'`n$(Remove-Item x)'"),
+])
+def test_provider_names_are_literal(provider, quoted):
+    runner = CannedRunner("[]")
+    fetch_logs.fetch_event_records("System", provider_name=provider, runner=runner)
+    assert f"ProviderName={quoted}" in runner.commands[0]
+
+
+def test_utc_filter_times():
+    local = datetime(2025, 6, 25, 10, 0, 0)
+    utc = local.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    command = fetch_logs.build_structured_command("System", local.strftime(DATETIME_FORMAT), utc=True)
+    assert f"StartTime='{utc}'" in command
+    assert "ToUniversalTime" in command
+
+
+def test_iter_event_records_streams_lines():
+    commands = []
+
+    def stream_runner(command):
+        commands.append(command)
+        yield json.dumps(event(2)) + "\n"
+        yield "\n"
+        yield json.dumps(event(1)) + "\n"
+
+    records = fetch_logs.iter_event_records("System", max_events=2, stream_runner=stream_runner)
+    assert [r["RecordId"] for r in records] == [2, 1]
+    assert "-MaxEvents 2" in commands[0]
+
+
+class WinEventRunner:
+    """Filters a fixed set of events by the command's StartTime/EndTime, like Get-WinEvent."""
+
+    def __init__(self, times: list[datetime]):
+        self.times = times
+
+    def __call__(self, command: str) -> str:
+        bounds = {name: datetime.fromisoformat(value)
+                  for name, value in re.findall(r"(StartTime|EndTime)='([^']+)'", command)}
+        matched = [(record_id, created) for record_id, created in enumerate(self.times, 1)
+                   if bounds.get("StartTime", datetime.min) <= created <= bounds.get("EndTime", datetime.max)]
+        return json.dumps([dict(event(record_id), TimeCreated=created.strftime(DATETIME_FORMAT))
+                           for record_id, created in reversed(matched)])
+
+
+def test_split_time_range_shares_boundaries():
+    ranges = fetch_logs.split_time_range("06/25/2025 10:00:00 AM", "06/25/2025 10:03:00 AM", 3)
+    assert ranges == [("06/25/2025 10:00:00 AM", "06/25/2025 10:01:00 AM"),
+                      ("06/25/2025 10:01:00 AM", "06/25/2025 10:02:00 AM"),
+                      ("06/25/2025 10:02:00 AM", "06/25/2025 10:03:00 AM")]
+
+
+def test_sharded_fetch_keeps_events_near_boundaries():
+    base = datetime(2025, 6, 25, 10, 0, 0)
+    # just before, exactly on and just after each one-minute boundary
+    times = [base + timedelta(minutes=minute, seconds=offset)
+             for minute in (1, 2) for offset in (-0.5, 0, 0.5)]
+    runner = WinEventRunner(times)
+    window = dict(start_time="06/25/2025 10:00:00 AM", end_time="06/25/2025 10:03:00 AM", max_events=100)
+
+    whole = fetch_logs.fetch_event_records("System", runner=runner, **window)
+    sharded = fetch_logs.fetch_event_records_sharded("System", windows=3, runner=runner, **window)
+    assert len(whole) == len(times)
+    assert sorted(r["RecordId"] for r in sharded) == sorted(r["RecordId"] for r in whole)
@@ -0,0 +1,92 @@
+import json
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from utils import fleet
+from utils.parse_logs import DATETIME_FORMAT
+
+
+def event(record_id: int, time_created: str) -> dict:
+    return {"TimeCreated": time_created, "Id": 7036, "Level": 4, "LevelDisplayName": "Information",
+            "ProviderName": "Service Control Manager", "RecordId": record_id, "Message": "stopped"}
+
+
+class FakeTransport:
+    """Answers each host from a dict of canned outputs; exceptions are raised instead."""
+
+    def __init__(self, answers: dict):
+        self.answers = answers
+        self.calls = []
+
+    def __call__(self, host: str, command: str, timeout: float) -> str:
+        self.calls.append((host, command, timeout))
+        answer = self.answers[host]
+        if isinstance(answer, Exception):
+            raise answer
+        return json.dumps(answer)
+
+
+def test_parse_hosts_and_inventory(tmp_path):
+    assert fleet.parse_hosts([" web01", "WEB01", "", "db01 "]) == ["web01", "db01"]
+    inventory = tmp_path / "hosts.txt"
+    inventory.write_text("# datacenter A\nweb01, web02\n\ndb01  # primary\nweb02\n", encoding="utf-8")
+    assert fleet.load_inventory(str(inventory)) == ["web01", "web02", "db01"]
+
+
+def test_command_filters_in_utc():
+    transport = FakeTransport({"web01": []})
+    fleet.collect_fleet(["web01"], start_time="06/25/2025 10:00:00 AM", transport=transport)
+    command = transport.calls[0][1]
+    utc = datetime(2025, 6, 25, 10, 0, 0).astimezone(timezone.utc)
+    assert f"StartTime='{utc:%Y-%m-%dT%H:%M:%S}Z'" in command
+    assert "ToUniversalTime" in command
+
+
+def test_events_are_tagged_and_shown_in_local_time():
+    transport = FakeTransport({"web01": event(1, "06/25/2025 03:30:00 PM")})
+    result, = fleet.collect_fleet(["web01"], transport=transport)
+    local = datetime(2025, 6, 25, 15, 30, 0, tzinfo=timezone.utc).astimezone()
+    assert result.ok
+    assert result.records[0]["Host"] == "web01"
+    assert result.records[0]["TimeCreated"] == local.strftime(DATETIME_FORMAT)
+
+
+def test_merge_orders_hosts_by_time():
+    transport = FakeTransport({
+        "web01": [event(2, "06/25/2025 03:40:00 PM"), event(1, "06/25/2025 03:10:00 PM")],
+        "db01": [event(9, "06/25/2025 03:20:00 PM")],
+        "down": subprocess.CalledProcessError(1, "powershell", stderr="WinRM cannot complete the operation.\n"),
+    })
+    results = fleet.collect_fleet(["web01", "db01", "down"], transport=transport)
+    assert [r.host for r in results] == ["web01", "db01", "down"]
+    assert results[2].error == "WinRM cannot complete the operation."
+    merged = fleet.merge_host_records(results)
+    assert [(r["Host"], r["RecordId"]) for r in merged] == [("web01", 2), ("db01", 9), ("web01", 1)]
+
+
+def test_stuck_host_times_out_alone():
+    release = threading.Event()
+    answers = {f"web{i:02d}": [] for i in range(6)}
+
+    def transport(host, command, timeout):
+        if host == "web00":
+            release.wait()  # ignores its timeout, like a hung WinRM session
+        return json.dumps(answers[host])
+
+    start = time.monotonic()
+    try:
+        results = fleet.collect_fleet(list(answers), transport=transport, max_workers=2, timeout=0.2)
+    finally:
+        release.set()
+    assert time.monotonic() - start < 3
+    assert results[0].error == "timed out after 0.2s"
+    assert all(result.ok for result in results[1:])
+
+
+def test_invalid_filters_raise():
+    with pytest.raises(ValueError):
+        fleet.collect_fleet(["web01"], level=9, transport=FakeTransport({}))
@@ -0,0 +1,53 @@
+# tests/test_log_stats.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.log_stats import MAX_BUCKETS, compute_log_stats, parse_times
+from utils.parse_logs import DATETIME_FORMAT
+
+
+def steady_logs(minutes: int = 120, per_minute: int = 3, burst_at=None, burst: int = 300) -> list[dict]:
+    start = datetime(2025, 6, 25, 8)
+    logs = []
+    for minute in range(minutes):
+        count = per_minute + (burst if minute == burst_at else 0)
+        for i in range(count):
+            time_created = start + timedelta(minutes=minute, seconds=i % 60)
+            logs.append({"TimeCreated": time_created.strftime(DATETIME_FORMAT), "Level": 2,
+                         "Id": 7000 if minute == burst_at else 1, "ProviderName": "Service Control Manager"})
+    return logs
+
+
+@pytest.mark.parametrize("minute", [0, 1, 4, 60])
+def test_burst_is_found_anywhere_in_the_range(minute):
+    bursts = compute_log_stats(steady_logs(burst_at=minute))["bursts"]
+    assert len(bursts) == 1
+    start = datetime(2025, 6, 25, 8) + timedelta(minutes=minute)
+    assert bursts[0]["start"] == start.strftime(DATETIME_FORMAT)
+    assert bursts[0]["top"][0]["id"] == 7000
+
+
+def test_steady_rate_has_no_bursts():
+    stats = compute_log_stats(steady_logs())
+    assert stats["total"] == 360
+    assert stats["bursts"] == []
+
+
+@pytest.mark.parametrize("outlier, bucket", [
+    ("01/01/1601 12:00:00 AM", "30D"),  # an EVTX record with a zero FILETIME
+    ("01/01/1970 12:00:00 AM", "7D"),   # a /Date(0)/ value
+])
+def test_outlier_time_widens_buckets(outlier, bucket):
+    logs = steady_logs(minutes=10)
+    logs.append(dict(logs[0], TimeCreated=outlier))
+    stats = compute_log_stats(logs)
+    assert stats["first"] == outlier
+    assert stats["rate"]["bucket"] == bucket
+    assert stats["rate"]["buckets"] <= MAX_BUCKETS
+    assert sum(stats["histogram"]["counts"]) == len(logs)
+
+
+def test_long_strings_are_not_truncated():
+    times = parse_times(["06/25/2025 10:00:00 AM", "06/25/2025  10:00:00 AM", "06/25/2025  10:00:00 AM (UTC)", None])
+    assert [str(t) for t in times] == ["2025-06-25T10:00:00", "2025-06-25T10:00:00", "NaT", "NaT"]
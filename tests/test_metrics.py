@@ -0,0 +1,137 @@
+import json
+import re
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+from utils import metrics
+from utils.metrics import Metrics
+
+# one sample line of the Prometheus text format: name{labels} value
+SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+
+
+def prometheus_samples(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            name, labels, value = SAMPLE.match(line).groups()
+            samples[(name, labels)] = float(value)
+    return samples
+
+
+@pytest.fixture
+def collector():
+    collector = Metrics()
+    with collector.stage("fetch"):
+        with collector.stage("parse"):
+            collector.count("parse", "events", 120)
+        collector.count("fetch", "bytes", 4096)
+    with collector.stage("parse"):
+        collector.count("parse", "events", 30)
+    collector.count("summarize", 'model "gpt"\nretries', 2)
+    return collector
+
+
+def test_json_round_trip(collector, tmp_path):
+    path = tmp_path / "run.json"
+    collector.write(str(path))
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["stages"] == collector.to_dict()["stages"]
+    assert list(saved["stages"]) == ["fetch", "parse", "summarize"]
+    assert saved["stages"]["parse"]["calls"] == 2
+    assert saved["stages"]["parse"]["counts"] == {"events": 150}
+    assert saved["stages"]["parse"]["peak_memory_bytes"] is None
+    assert list(tmp_path.iterdir()) == [path]  # the temporary file was renamed
+
+
+def test_prometheus_round_trip(collector, tmp_path):
+    path = tmp_path / "run.prom"
+    collector.write(str(path))
+    text = path.read_text(encoding="utf-8")
+    samples = prometheus_samples(text)
+
+    assert samples[("event_summarizer_stage_calls", 'stage="parse"')] == 2
+    assert samples[("event_summarizer_stage_count", 'stage="fetch",name="bytes"')] == 4096
+    assert samples[("event_summarizer_stage_count", r'stage="summarize",name="model \"gpt\"\nretries"')] == 2
+    assert samples[("event_summarizer_stage_seconds", 'stage="fetch"')] == collector.stages[0].wall
+    assert samples[("event_summarizer_run_timestamp_seconds", None)] == collector.started.timestamp()
+    # every metric is introduced by its HELP and TYPE lines, and memory is left out when untraced
+    names = {name for name, _ in samples}
+    assert all(f"# TYPE {name} gauge" in text and f"# HELP {name} " in text for name in names)
+    assert "peak_memory" not in text
+
+
+def test_unsupported_file_is_rejected(collector, tmp_path):
+    with pytest.raises(ValueError, match="use .json or .prom"):
+        collector.write(str(tmp_path / "run.csv"))
+
+
+def test_overlapping_threads_count_elapsed_time():
+    collector = Metrics()
+
+    def fetch():
+        with collector.stage("fetch"):
+            time.sleep(0.2)
+
+    threads = [threading.Thread(target=fetch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    [stats] = collector.stages
+    assert stats.calls == 4
+    assert 0.2 <= stats.wall < 0.6
+
+
+def test_peak_memory_is_traced():
+    was_tracing = tracemalloc.is_tracing()
+    try:
+        collector = Metrics(trace_memory=True)
+        with collector.stage("parse"):
+            block = bytearray(8_000_000)
+            del block
+        with collector.stage("format"):
+            pass
+        peaks = {stats.name: stats.peak_memory for stats in collector.stages}
+        assert peaks["parse"] >= 8_000_000
+        assert peaks["format"] < 1_000_000
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+
+def test_module_helpers_do_nothing_until_enabled(monkeypatch):
+    monkeypatch.setattr(metrics, "_metrics", None)
+    with metrics.stage("fetch"):
+        metrics.count("fetch", "events")
+    assert metrics.get_metrics() is None
+
+    collector = metrics.enable_metrics()
+    assert metrics.enable_metrics() is collector
+    with metrics.stage("fetch"):
+        metrics.count("fetch", "events", 5)
+    assert collector.to_dict()["stages"]["fetch"]["counts"] == {"events": 5}
+
+
+def test_stage_hooks_wrap_stages(monkeypatch):
+    monkeypatch.setattr(metrics, "_metrics", None)
+    entered = []
+
+    def hook(name):
+        entered.append(name)
+        return None if name == "parse" else threading.Lock()
+
+    metrics.add_stage_hook(hook)
+    try:
+        with metrics.stage("fetch"):
+            with metrics.stage("parse"):
+                pass
+    finally:
+        metrics.remove_stage_hook(hook)
+    assert entered == ["fetch", "parse"]
+    with metrics.stage("export"):
+        pass
+    assert entered == ["fetch", "parse"]
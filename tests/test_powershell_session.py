@@ -0,0 +1,95 @@
+# tests/test_powershell_session.py
+import base64
+import subprocess
+import sys
+
+import pytest
+
+from utils.fetch_logs import fetch_event_records
+from utils.powershell_session import PowerShellSession, PowerShellSessionError
+
+# a Python stand-in for the PowerShell worker, speaking the same protocol:
+#   echo TEXT        -> TEXT
+#   fail             -> error status
+#   crash            -> exits mid-request
+#   crash-once PATH  -> exits the first time (creating PATH), then answers 'recovered'
+#   hang             -> never answers
+FAKE_WORKER = r"""
+import base64, os, sys, time
+marker = sys.argv[1]
+for line in sys.stdin:
+    command = base64.b64decode(line.strip()).decode("utf-8")
+    status = 0
+    if command.startswith("echo "):
+        print(command[5:])
+    elif command == "fail":
+        print("Something went wrong")
+        status = 1
+    elif command == "crash":
+        sys.exit(3)
+    elif command.startswith("crash-once "):
+        path = command.split(" ", 1)[1]
+        if not os.path.exists(path):
+            open(path, "w").close()
+            sys.exit(3)
+        print("recovered")
+    elif command == "hang":
+        time.sleep(60)
+    print(f"<<<END:{marker}:{status}>>>", flush=True)
+"""
+
+MARKER = "testmarker"
+
+
+@pytest.fixture
+def session():
+    session = PowerShellSession([sys.executable, "-c", FAKE_WORKER, MARKER], timeout=5, marker=MARKER)
+    yield session
+    session.close()
+
+
+def test_runs_commands_in_one_process(session):
+    assert session.run("echo first") == "first\n"
+    pid = session._process.pid
+    assert session.run("echo second\nline") == "second\nline\n"
+    assert session._process.pid == pid
+
+
+def test_command_is_framed_as_one_base64_line(session):
+    command = 'Get-WinEvent -FilterHashtable @{LogName="System"}\necho "ünïcode"'
+    frame = base64.b64encode(command.encode("utf-8")).decode("ascii")
+    assert "\n" not in frame
+    assert session.run("echo " + command) == command + "\n"
+
+
+def test_error_status_raises_called_process_error(session):
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        session.run("fail")
+    assert error.value.output == "Something went wrong\n"
+    assert session.run("echo still alive") == "still alive\n"
+
+
+def test_crashed_worker_is_restarted_and_retried(session, tmp_path):
+    assert session.run(f"crash-once {tmp_path / 'crashed'}") == "recovered\n"
+    assert session.restarts == 1
+
+
+def test_repeated_crash_raises_session_error(session):
+    with pytest.raises(PowerShellSessionError):
+        session.run("crash")
+    assert session.restarts == 2
+
+
+def test_timeout_kills_worker_and_next_call_starts_fresh(session):
+    with pytest.raises(subprocess.TimeoutExpired):
+        session.run("hang", timeout=0.5)
+    assert not session.alive
+    assert session.run("echo fresh") == "fresh\n"
+
+
+def test_fetch_returns_nothing_when_worker_keeps_crashing(session, capsys):
+    def runner(command):
+        return session.run("crash")
+
+    assert fetch_event_records(runner=runner) == []
+    assert "Could not fetch System logs" in capsys.readouterr().out
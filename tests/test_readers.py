@@ -0,0 +1,77 @@
+import importlib.util
+
+import pytest
+
+from utils import exports, readers
+from utils.compression import open_text, split_compression
+from utils.readers import iter_records, read_records
+
+
+def event(record_id: int, message: str = None) -> dict:
+    return {"TimeCreated": f"06/25/2025 10:{record_id % 60:02d}:00 AM", "Id": 7036, "Level": 4,
+            "LevelDisplayName": "Information", "ProviderName": "Service Control Manager",
+            "RecordId": record_id, "Message": message or f"Service {record_id} stopped."}
+
+
+# messages that need quoting, escaping or more than one read to come back whole
+LOGS = [event(1, 'The "Print Spooler" service, code 0x1F,\nstopped.'),
+        event(2, "Ünïcode — ✓"),
+        event(3, "x" * (readers.READ_SIZE + 100)),
+        *(event(i) for i in range(4, 1200))]
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("filename", ["logs.jsonl", "logs.json", "logs.csv",
+                                      "logs.jsonl.gz", "logs.json.gz", "logs.csv.gz"])
+def test_exports_read_back_unchanged(filename):
+    path = exports.export_many(LOGS, [filename])[filename]
+    assert path.endswith(filename)
+    assert read_records(path) == LOGS
+
+
+def test_json_elements_split_across_reads(monkeypatch):
+    path = exports.export_many(LOGS[:5], ["small.json.gz"])["small.json.gz"]
+    monkeypatch.setattr(readers, "READ_SIZE", 7)
+    assert list(iter_records(path)) == LOGS[:5]
+
+
+@pytest.mark.parametrize("filename", ["grow.jsonl.gz", "grow.csv.gz"])
+def test_appending_adds_a_member_read_as_one_stream(filename):
+    exports.export_many(LOGS[:10], [filename])
+    path = exports.export_many(LOGS[10:20], [filename], append=True)[filename]
+    assert read_records(path) == LOGS[:20]
+
+
+def test_compressed_files_are_smaller():
+    results = exports.export_many(LOGS, ["size.jsonl", "size.jsonl.gz"])
+    with open(results["size.jsonl"], "rb") as plain, open(results["size.jsonl.gz"], "rb") as packed:
+        assert len(packed.read()) * 5 < len(plain.read())
+
+
+def test_split_compression():
+    assert split_compression("logs.JSONL.GZ") == ("logs.JSONL", ".gz")
+    assert split_compression("logs.csv.zst") == ("logs.csv", ".zst")
+    assert split_compression("logs.csv") == ("logs.csv", "")
+
+
+@pytest.mark.skipif(importlib.util.find_spec("zstandard") is not None, reason="zstandard is installed")
+def test_zst_needs_zstandard(tmp_path):
+    with pytest.raises(ImportError, match="pip install zstandard"):
+        open_text(str(tmp_path / "logs.jsonl.zst"), "w")
+
+
+def test_zst_round_trip():
+    pytest.importorskip("zstandard")
+    exports.export_many(LOGS[:10], ["logs.jsonl.zst"])
+    path = exports.export_many(LOGS[10:20], ["logs.jsonl.zst"], append=True)["logs.jsonl.zst"]
+    assert read_records(path) == LOGS[:20]
+
+
+def test_unknown_formats_are_rejected():
+    with pytest.raises(ValueError, match="Can't read .md files"):
+        iter_records("report.md.gz")
@@ -0,0 +1,76 @@
+import re
+from itertools import chain
+
+import pytest
+
+from utils.event_table import EventTable
+from utils.search_logs import LogSearchIndex, parse_query, search_logs
+
+MESSAGES = [
+    "The Print Spooler service entered the stopped state.",
+    "Disk 2 is not responding; the request timed out.",
+    "The disk (harddisk0) was not responding in time.",
+    "Network adapter reset: error 0x1F on NIC-01.",
+    "The Windows Update service terminated with error 0x80070005.",
+    "Networking restored after 3 retries.",
+]
+
+
+def event(record_id: int, message: str) -> dict:
+    return {"TimeCreated": "06/25/2025 10:00:00 AM", "Id": 7036, "Level": 4,
+            "LevelDisplayName": "Information", "ProviderName": "Service Control Manager",
+            "RecordId": record_id, "Message": message}
+
+
+LOGS = [event(i, message) for i, message in enumerate(MESSAGES)]
+
+
+def ids(logs) -> list[int]:
+    return [log["RecordId"] for log in logs]
+
+
+def test_parse_query():
+    assert parse_query('Disk "not responding" /error 0x[0-9a-f]+/ net*') == (
+        ["disk", "net*"], ["not responding"], ["error 0x[0-9a-f]+"])
+
+
+@pytest.mark.parametrize("query, pattern, expected", [
+    ("disk", None, [1, 2]),
+    ("DISK responding", None, [1, 2]),  # every word must appear, in any case
+    ("disk timed", None, [1]),
+    ('"not responding"', None, [1, 2]),
+    ('"responding not"', None, []),
+    ("net*", None, [3, 5]),
+    ("service /error 0x[0-9a-f]{8}/", None, [4]),
+    ("", r"\berror\b", [3, 4]),
+    ("spooler missing", None, []),
+    ("", None, [0, 1, 2, 3, 4, 5]),
+])
+def test_index_search(query, pattern, expected):
+    index = LogSearchIndex(LOGS)
+    assert ids(index.search(query, pattern)) == expected
+    # the one-off search agrees with the index
+    assert ids(search_logs(LOGS, query, pattern)) == expected
+
+
+def test_index_matches_a_full_scan():
+    logs = [event(i, f"{MESSAGES[i % len(MESSAGES)]} batch {i % 7}") for i in range(700)]
+    index = LogSearchIndex(logs)
+    for word in ("disk", "service", "batch", "3", "0x1f", "nothing"):
+        scanned = [log for log in logs if re.search(rf"\b{word}\b", log["Message"], re.IGNORECASE)]
+        assert index.search(word) == scanned
+
+
+def test_limit_stops_early():
+    def no_more_logs():
+        raise AssertionError("read past the first match")
+        yield
+
+    logs = chain([LOGS[3]], no_more_logs())
+    assert ids(search_logs(logs, "/error/", limit=1)) == [3]
+    assert ids(LogSearchIndex(LOGS).search("error", limit=1)) == [3]
+
+
+def test_tables_are_searched_like_dicts():
+    table = EventTable.from_records(LOGS)
+    assert search_logs(table, '"not responding"') == [LOGS[1], LOGS[2]]
@@ -0,0 +1,49 @@
+# tests/test_summarize_logs.py
+from types import SimpleNamespace
+
+import pytest
+
+from utils import summarize_logs
+
+
+def make_records(count: int) -> list[dict]:
+    return [{"TimeCreated": "06/25/2025 10:00:00 AM", "Id": i, "LevelDisplayName": "Error",
+             "ProviderName": "Service Control Manager", "Message": f"Service {i} stopped unexpectedly. " * 5}
+            for i in range(count)]
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    """Replaces the OpenAI client with one that records max_tokens and replies with a fixed text."""
+    sent = []
+    reply = SimpleNamespace(text="Summary.")
+
+    def create(model, messages, max_tokens, **kwargs):
+        sent.append(max_tokens)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply.text))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(summarize_logs, "client", client)
+    return SimpleNamespace(sent=sent, reply=reply)
+
+
+def test_single_chunk_passes_max_tokens(requests):
+    assert summarize_logs.summarize_logs_mapreduce(make_records(3), max_tokens=77) == "Summary."
+    assert requests.sent == [77]
+
+
+def test_reduce_finishes_when_merges_stay_long(requests):
+    # every merge is longer than the whole reduce budget
+    requests.reply.text = "x" * 4 * 7000
+    summary = summarize_logs.summarize_logs_mapreduce(make_records(400), chunk_tokens=500,
+                                                      reduce_tokens=6000, max_tokens=123)
+    assert summary == requests.reply.text
+    assert set(requests.sent) == {123}
+    assert len(requests.sent) < 200
+
+
+def test_regroup_halves_groups_without_progress():
+    partials = ["y" * 4 * 6000] * 5
+    groups = summarize_logs.regroup(partials, 5, 6000)
+    assert [len(group) for group in groups] == [2, 2, 1]
+    assert all(len(text) <= 4 * 3000 + 2 for group in groups for text in group)
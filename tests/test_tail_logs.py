@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from utils import tail_logs
+
+
+def event(record_id: int) -> dict:
+    return {"TimeCreated": "06/25/2025 10:00:00 AM", "Id": 7036, "Level": 4,
+            "LevelDisplayName": "Information", "ProviderName": "Service Control Manager",
+            "RecordId": record_id, "Message": "The service entered the stopped state."}
+
+
+class CannedRunner:
+    """Records each command and answers with the given events."""
+
+    def __init__(self, events: list[dict]):
+        self.events = events
+        self.commands = []
+
+    def __call__(self, command: str) -> str:
+        self.commands.append(command)
+        return json.dumps(self.events)
+
+
+@pytest.mark.parametrize("provider, quoted", [
+    # the XPath is itself a single-quoted PowerShell string, so its own ' are doubled
+    ("O'Brien Service", """Provider[@Name="O''Brien Service"]"""),
+    ('Say "hi"', """Provider[@Name=''Say "hi"'']"""),
+    ("$env:USERNAME", "Provider[@Name=''$env:USERNAME'']"),
+    ("`n$(Remove-Item x)", "Provider[@Name=''`n$(Remove-Item x)'']"),
+])
+def test_provider_names_are_literal(tmp_path, provider, quoted):
+    runner = CannedRunner([])
+    tail_logs.fetch_new_events("System", state_file=str(tmp_path / "bookmarks.json"),
+                               start_time="06/25/2025 10:00:00 AM", provider_name=provider, runner=runner)
+    assert f" and {quoted}]]' -Oldest " in runner.commands[0]
+
+
+def test_log_name_is_literal(tmp_path):
+    runner = CannedRunner([])
+    tail_logs.fetch_new_events("Ops'$x", state_file=str(tmp_path / "bookmarks.json"), runner=runner)
+    assert runner.commands[0].startswith("Get-WinEvent -LogName 'Ops''$x' ")
+
+
+def test_bookmark_advances_past_returned_events(tmp_path):
+    state_file = str(tmp_path / "bookmarks.json")
+    runner = CannedRunner([event(5)])
+    # the first poll only remembers where the log ends
+    assert tail_logs.fetch_new_events("System", state_file=state_file, runner=runner) == []
+    runner.events = [event(6), event(7)]
+    assert [e["RecordId"] for e in tail_logs.fetch_new_events("System", state_file=state_file, runner=runner)] == [6, 7]
+    assert "EventRecordID > 5" in runner.commands[-1]
+    assert tail_logs.load_bookmarks(state_file)["System"]["RecordId"] == 7
@@ -0,0 +1,301 @@
+# utils/async_summarize.py
+import asyncio
+import random
+import time
+from functools import partial
+from typing import Optional
+
+from utils.cluster_logs import cluster_logs, format_cluster, format_cluster_counts, format_clusters_for_gpt
+from utils.metrics import count
+from utils.parse_logs import format_logs_for_gpt
+from utils.summarize_logs import (DEFAULT_MODEL, SYSTEM_PROMPT, SUMMARY_PROMPT, CHUNK_PROMPT,
+                                  chunk_logs, estimate_tokens, get_api_key, group_texts, log_stats_text,
+                                  reduce_prompt, regroup)
+
+# HTTP statuses worth retrying
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at a per-minute rate.
+
+    Args:
+        per_minute (float): Tokens added per minute; also the bucket capacity.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1):
+        """Waits until amount tokens are available, then takes them."""
+        amount = min(amount, self.capacity)  # oversized requests wait for a full bucket
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def refund(self, amount: float):
+        """Returns tokens taken for work that never happened."""
+        self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+
+class AsyncSummarizer:
+    """
+    Concurrent summarization engine on the async OpenAI client.
+
+    Requests run under a concurrency semaphore and wait on two token buckets,
+    one for requests per minute and one for (estimated) tokens per minute.
+    429, 5xx, timeout and connection errors are retried with jittered
+    exponential backoff, honoring Retry-After (up to max_delay) when the
+    server sends it. A request's tokens are charged once, not per attempt,
+    and refunded if it finally fails.
+    Cancelling the task running summarize() cancels every request in flight.
+
+    Args:
+        api_key (Optional[str]): API key; defaults to OPENAI_API_KEY (see get_api_key).
+        base_url (Optional[str]): API base URL, e.g. a local stub server.
+        model (str): The model name.
+        max_concurrency (int): Maximum requests in flight.
+        requests_per_minute (float): Request rate limit.
+        tokens_per_minute (float): Token rate limit (prompt estimate + max_tokens).
+        max_retries (int): Retries per request before giving up.
+        base_delay (float): First backoff delay in seconds.
+        max_delay (float): Cap on a single backoff delay in seconds.
+        client: An AsyncOpenAI-compatible client to use instead of creating one.
+        cache (Optional[SummaryCache]): Reuse earlier replies to identical requests.
+    """
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 model: str = DEFAULT_MODEL,
+                 max_concurrency: int = 4,
+                 requests_per_minute: float = 500,
+                 tokens_per_minute: float = 200_000,
+                 max_retries: int = 5,
+                 base_delay: float = 1.0,
+                 max_delay: float = 30.0,
+                 client=None,
+                 cache=None):
+        if client is None:
+            from openai import AsyncOpenAI  # heavy import, only when summarizing
+            # retries are handled here so they share the rate limiters
+            client = AsyncOpenAI(api_key=api_key or get_api_key(),
+                                 base_url=base_url, max_retries=0)
+        self.client = client
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cache = cache
+        self.usage = {"requests": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._limits = None
+
+    def _get_limits(self):
+        # asyncio primitives bind to the running loop, so create them lazily
+        if self._limits is None:
+            self._limits = (asyncio.Semaphore(self.max_concurrency),
+                            TokenBucket(self.requests_per_minute),
+                            TokenBucket(self.tokens_per_minute))
+        return self._limits
+
+    async def complete(self, prompt: str, max_tokens: int = 500, temperature: float = 0.5) -> str:
+        """
+        Sends one prompt, waiting on the rate limits and retrying transient errors.
+
+        Args:
+            prompt (str): The user message.
+            max_tokens (int): Maximum tokens in the reply.
+            temperature (float): Sampling temperature.
+
+        Returns:
+            str: The reply text.
+
+        Raises:
+            Exception: The last error once retries are exhausted, or any
+                non-retryable API error.
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(f"{SYSTEM_PROMPT}\n{prompt}", self.model,
+                                      max_tokens=max_tokens, temperature=temperature)
+            cached = self.cache.get(key)
+            if cached is not None:
+                count("summarize", "cache_hits")
+                return cached
+
+        semaphore, request_bucket, token_bucket = self._get_limits()
+        cost = estimate_tokens(prompt) + max_tokens
+
+        charged = False
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                await request_bucket.acquire(1)
+                if not charged:
+                    await token_bucket.acquire(cost)
+                    charged = True
+                try:
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt},
+                        ],
+                        max_tokens=max_tokens,
+                        temperature=temperature
+                    )
+                except Exception as e:
+                    if attempt >= self.max_retries or not _is_retryable(e):
+                        token_bucket.refund(cost)
+                        raise
+                    delay = _retry_after(e, self.max_delay)
+                else:
+                    self.usage["requests"] += 1
+                    count("summarize", "requests")
+                    usage = getattr(response, "usage", None)
+                    if usage is not None:
+                        self.usage["prompt_tokens"] += usage.prompt_tokens or 0
+                        self.usage["completion_tokens"] += usage.completion_tokens or 0
+                        count("summarize", "tokens_in", usage.prompt_tokens or 0)
+                        count("summarize", "tokens_out", usage.completion_tokens or 0)
+                    content = response.choices[0].message.content
+                    if key is not None and content:
+                        self.cache.put(key, content)
+                    return content
+
+            # back off outside the semaphore so other requests can proceed
+            self.usage["retries"] += 1
+            count("summarize", "retries")
+            if delay is None:
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+            await asyncio.sleep(delay)
+
+    async def complete_many(self, prompts: list[str], max_tokens: int = 500) -> list[str]:
+        """
+        Sends many prompts concurrently; if one fails the rest are cancelled.
+
+        Args:
+            prompts (list[str]): User messages.
+            max_tokens (int): Maximum tokens per reply.
+
+        Returns:
+            list[str]: Replies in the same order as prompts.
+        """
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(self.complete(p, max_tokens)) for p in prompts]
+        except ExceptionGroup as errors:
+            raise errors.exceptions[0]  # surface the first failure, not the group
+        return [task.result() for task in tasks]
+
+    async def summarize(self,
+                        parsed_logs,
+                        chunk_tokens: int = 3000,
+                        reduce_tokens: int = 6000,
+                        max_tokens: int = 500,
+                        cluster: bool = False,
+                        stats: bool = False) -> str:
+        """
+        Map-reduce summary of parsed logs, like summarize_logs_mapreduce.
+
+        Args:
+            parsed_logs: A list of parsed log dictionaries, Events or an EventTable.
+            chunk_tokens (int): Estimated token budget of logs per map request.
+            reduce_tokens (int): Estimated token budget of summaries per reduce request.
+            max_tokens (int): Maximum tokens per reply.
+            cluster (bool): Deduplicate repeated events before summarizing.
+            stats (bool): Add a statistics block to the prompt.
+
+        Returns:
+            str: The final summary.
+        """
+        stats_text = log_stats_text(parsed_logs) if stats and parsed_logs else None
+        final_text = stats_text
+        if cluster:
+            # chunks leave out counts so they stay cacheable (see summarize_logs_mapreduce)
+            parsed_logs = cluster_logs(parsed_logs)
+            format_chunk = format_clusters_for_gpt
+            format_part = partial(format_clusters_for_gpt, counts=False)
+            format_entry = partial(format_cluster, counts=False)
+            final_text = "\n\n".join(filter(None, [stats_text, format_cluster_counts(parsed_logs)])) or None
+        else:
+            format_chunk = format_part = format_logs_for_gpt
+            format_entry = None
+
+        chunks = chunk_logs(parsed_logs, chunk_tokens, content_defined=self.cache is not None,
+                            format_entry=format_entry)
+        if not chunks:
+            return "No logs provided for summarization."
+        if len(chunks) == 1:
+            text = format_chunk(chunks[0])
+            if stats_text:
+                text = f"{stats_text}\n\n{text}"
+            return await self.complete(f"{SUMMARY_PROMPT}{text}", max_tokens)
+
+        partials = await self.complete_many(
+            [f"{CHUNK_PROMPT}{format_part(chunk)}" for chunk in chunks], max_tokens)
+
+        groups = group_texts(partials, reduce_tokens)
+        while len(groups) > 1:
+            partials = await self.complete_many([reduce_prompt(g) for g in groups], max_tokens)
+            groups = regroup(partials, len(groups), reduce_tokens)
+        return await self.complete(reduce_prompt(groups[0], final_text), max_tokens)
+
+
+def _is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRY_STATUSES or status >= 500
+    # timeouts and dropped connections have no status code
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def _retry_after(error: Exception, limit: float) -> Optional[float]:
+    # the server's wait, capped so a bad header can't stall the run
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms") is not None:
+            delay = float(headers.get("retry-after-ms")) / 1000
+        else:
+            delay = float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+    if delay != delay or delay < 0:  # NaN or negative
+        return None
+    return min(delay, limit)
+
+
+def summarize_logs_async(parsed_logs, **options) -> str:
+    """
+    Runs an AsyncSummarizer map-reduce from synchronous code.
+
+    Args:
+        parsed_logs: A list of parsed log dictionaries, Events or an EventTable.
+        **options: AsyncSummarizer arguments, plus chunk_tokens, reduce_tokens,
+            max_tokens, cluster and stats for summarize().
+
+    Returns:
+        str: The final summary, or an error message.
+    """
+    summarize_options = {key: options.pop(key)
+                         for key in ("chunk_tokens", "reduce_tokens", "max_tokens", "cluster", "stats")
+                         if key in options}
+    try:
+        summarizer = AsyncSummarizer(**options)
+        return asyncio.run(summarizer.summarize(parsed_logs, **summarize_options))
+    except Exception as e:
+        return f"Error summarizing logs: {str(e)}"
@@ -0,0 +1,190 @@
+# utils/cluster_logs.py
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from utils.parse_logs import record_timestamp
+
+# variable parts of event messages, most specific first
+MASK_PATTERNS = [
+    (re.compile(r"\{?\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b\}?"), "<GUID>"),
+    (re.compile(r"\bS-1-\d+(?:-\d+)+\b"), "<SID>"),
+    (re.compile(r"(?:\b[A-Za-z]:\\|\\\\)[^\s\"'<>|]*"), "<PATH>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b"), "<HEX>"),
+    (re.compile(r"\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{6,}\b"), "<HEX>"),
+    (re.compile(r"\b\d+(?:[.,:]\d+)*\b"), "<NUM>"),
+]
+
+_WHITESPACE = re.compile(r"\s+")
+
+# host names listed per cluster before the rest are elided
+MAX_CLUSTER_HOSTS = 5
+
+# groups listed with their counts in the final merge of a chunked summary
+MAX_COUNTED_CLUSTERS = 25
+
+# header explaining the clustered format to the model
+CLUSTER_HEADER = ("Repeated events are grouped by provider, event ID and message template "
+                  "(<NUM>, <GUID>, <SID>, <PATH>, <IP> and <HEX> mark masked values). "
+                  "Each group shows its count, first and last occurrence and one example message.\n\n")
+
+# the same for chunks of a larger summary, whose counts are given at the merge
+CHUNK_CLUSTER_HEADER = ("Repeated events are grouped by provider, event ID and message template "
+                        "(<NUM>, <GUID>, <SID>, <PATH>, <IP> and <HEX> mark masked values). "
+                        "Each group shows when it first occurred and one example message; "
+                        "how often each group occurred is given separately.\n\n")
+
+
+@lru_cache(maxsize=8192)
+def message_template(message: str) -> str:
+    """
+    Masks the variable parts of a message so repeats of one event share a template.
+
+    Args:
+        message (str): The event message.
+
+    Returns:
+        str: The message with numbers, GUIDs, SIDs, paths, IPs and hex values
+            replaced by placeholders and whitespace collapsed.
+    """
+    template = message or ""
+    for pattern, placeholder in MASK_PATTERNS:
+        template = pattern.sub(placeholder, template)
+    return _WHITESPACE.sub(" ", template).strip()
+
+
+def cluster_logs(parsed_logs: Iterable[dict]) -> list[dict]:
+    """
+    Groups events by (provider, event ID, message template).
+
+    Args:
+        parsed_logs (Iterable[dict]): Parsed logs (dicts, Events or an EventTable).
+
+    Returns:
+        list[dict]: One cluster per group, in order of first occurrence, with keys
+            ProviderName, Id, LevelDisplayName, Template, Count, FirstSeen,
+            LastSeen and Example (the message of the first event seen), plus
+            Hosts (sorted host names) for events tagged with a Host.
+    """
+    clusters = {}
+    times = {}  # parsed TimeCreated values; many events share a second
+
+    for log in parsed_logs:
+        message = str(log.get("Message") or "")
+        key = (log.get("ProviderName"), log.get("Id"), message_template(message))
+
+        time_created = log.get("TimeCreated")
+        timestamp = times.get(time_created)
+        if timestamp is None:
+            timestamp = times[time_created] = record_timestamp(log)
+
+        cluster = clusters.get(key)
+        if cluster is None:
+            clusters[key] = {
+                "ProviderName": key[0],
+                "Id": key[1],
+                "LevelDisplayName": log.get("LevelDisplayName"),
+                "Template": key[2],
+                "Count": 1,
+                "FirstSeen": time_created,
+                "LastSeen": time_created,
+                "Example": message,
+                "_first": timestamp,
+                "_last": timestamp,
+                "_hosts": set(),
+            }
+            if log.get("Host"):
+                clusters[key]["_hosts"].add(log.get("Host"))
+            continue
+
+        cluster["Count"] += 1
+        if log.get("Host"):
+            cluster["_hosts"].add(log.get("Host"))
+        if timestamp < cluster["_first"]:
+            cluster["_first"], cluster["FirstSeen"] = timestamp, time_created
+        if timestamp > cluster["_last"]:
+            cluster["_last"], cluster["LastSeen"] = timestamp, time_created
+
+    # first-seen order only changes when older events come or go, so a re-run
+    # with a few new events keeps the earlier groups, and their chunks, in place
+    result = sorted(clusters.values(),
+                    key=lambda c: (c["_first"], str(c["ProviderName"]), str(c["Id"]), c["Template"]))
+    for cluster in result:
+        hosts = cluster.pop("_hosts")
+        if hosts:
+            cluster["Hosts"] = sorted(hosts)
+        del cluster["_first"], cluster["_last"]
+    return result
+
+
+def format_cluster(cluster: dict, counts: bool = True) -> str:
+    """
+    Formats one cluster like a format_logs_for_gpt entry, with its count and time span.
+
+    Args:
+        cluster (dict): A cluster from cluster_logs.
+        counts (bool): Include the count, last occurrence and hosts. Without
+            them the entry only changes when its first event does, so chunks
+            of a larger summary stay cacheable as new events arrive.
+
+    Returns:
+        str: The formatted entry.
+    """
+    if not counts:
+        return f"[{cluster['FirstSeen']}] {cluster['ProviderName']} (Event ID {cluster['Id']}): {cluster['Example']}"
+    if cluster["Count"] == 1:
+        when = f"[{cluster['FirstSeen']}]"
+    else:
+        when = f"[{cluster['Count']}x, {cluster['FirstSeen']} to {cluster['LastSeen']}]"
+    hosts = cluster.get("Hosts")
+    if hosts:
+        # name a few hosts; the count says how widespread the event is
+        names = ", ".join(hosts[:MAX_CLUSTER_HOSTS]) + (", ..." if len(hosts) > MAX_CLUSTER_HOSTS else "")
+        where = f" on {hosts[0]}" if len(hosts) == 1 else f" on {len(hosts)} hosts ({names})"
+    else:
+        where = ""
+    return f"{when} {cluster['ProviderName']} (Event ID {cluster['Id']}){where}: {cluster['Example']}"
+
+
+def format_clusters_for_gpt(clusters: list[dict], counts: bool = True) -> str:
+    """
+    Formats clusters into a string suitable for GPT input.
+
+    Args:
+        clusters (list[dict]): Clusters from cluster_logs.
+        counts (bool): Include counts and time spans (see format_cluster).
+
+    Returns:
+        str: A short explanation of the format followed by one entry per cluster.
+    """
+    if not clusters:
+        return ""
+    header = CLUSTER_HEADER if counts else CHUNK_CLUSTER_HEADER
+    return header + "\n\n".join(format_cluster(cluster, counts) for cluster in clusters)
+
+
+def format_cluster_counts(clusters: list[dict], limit: int = MAX_COUNTED_CLUSTERS) -> Optional[str]:
+    """
+    Lists the most frequent clusters with their counts, for the final merge.
+
+    Chunks of a larger summary are sent without counts (see format_cluster),
+    so the merge is told how often the busiest groups occurred.
+
+    Args:
+        clusters (list[dict]): Clusters from cluster_logs.
+        limit (int): Maximum number of clusters to list.
+
+    Returns:
+        Optional[str]: The block, or None if no group repeated.
+    """
+    busiest = sorted((c for c in clusters if c["Count"] > 1), key=lambda c: -c["Count"])[:limit]
+    if not busiest:
+        return None
+    lines = ["Most frequent event groups:"]
+    for cluster in busiest:
+        hosts = cluster.get("Hosts")
+        where = f" on {len(hosts)} host{'s' if len(hosts) > 1 else ''}" if hosts else ""
+        lines.append(f"- {cluster['ProviderName']} (Event ID {cluster['Id']}): {cluster['Count']}x{where}, "
+                     f"{cluster['FirstSeen']} to {cluster['LastSeen']}: {cluster['Template']}")
+    return "\n".join(lines)
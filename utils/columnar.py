@@ -0,0 +1,280 @@
+# utils/columnar.py
+# Parquet and Arrow IPC files with typed columns. pyarrow is optional and only
+# imported on first use, so everything else works without it.
+import importlib.util
+import os
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from utils.parse_logs import DATETIME_FORMAT
+
+# columnar file extensions
+COLUMNAR_EXTENSIONS = (".parquet", ".arrow")
+
+# rows per Parquet row group / Arrow record batch
+ROW_GROUP_SIZE = 50_000
+
+# low-cardinality string columns stored dictionary-encoded
+DICTIONARY_COLUMNS = ("LevelDisplayName", "ProviderName", "LogName", "Host")
+INTEGER_COLUMNS = {"Id": "int32", "Level": "int8", "RecordId": "int64"}
+EVENT_COLUMNS = ["TimeCreated", "Id", "Level", "LevelDisplayName",
+                 "ProviderName", "RecordId", "Message"]
+
+
+PYARROW_MISSING = "Parquet and Arrow files require the pyarrow package (pip install pyarrow)"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(PYARROW_MISSING)
+    return pyarrow
+
+
+def columnar_unavailable(path: str) -> Optional[str]:
+    """
+    Checks up front whether a columnar file can be read or written.
+
+    Args:
+        path (str): A file path of any format.
+
+    Returns:
+        Optional[str]: Why the file can't be handled (pyarrow isn't
+            installed), or None if it isn't columnar or pyarrow is available.
+    """
+    if is_columnar(path) and importlib.util.find_spec("pyarrow") is None:
+        return PYARROW_MISSING
+    return None
+
+
+def arrow_schema(columns: Iterable[str]):
+    """
+    Builds the Arrow schema for a set of log fields.
+
+    TimeCreated is a timestamp, Id/Level/RecordId are integers, provider,
+    level, log and host names are dictionary-encoded, anything else is a string.
+
+    Args:
+        columns (Iterable[str]): Field names; the standard event fields come first.
+
+    Returns:
+        pyarrow.Schema: The schema.
+    """
+    pa = _require_pyarrow()
+    names = EVENT_COLUMNS + sorted(c for c in set(columns) if c not in EVENT_COLUMNS)
+    fields = []
+    for name in names:
+        if name == "TimeCreated":
+            fields.append(pa.field(name, pa.timestamp("s")))
+        elif name in INTEGER_COLUMNS:
+            fields.append(pa.field(name, getattr(pa, INTEGER_COLUMNS[name])()))
+        elif name in DICTIONARY_COLUMNS:
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+def records_to_batch(records: list[dict], schema):
+    """
+    Converts a list of parsed logs to an Arrow record batch with the given schema.
+
+    Args:
+        records (list[dict]): Parsed logs (dicts or Events).
+        schema (pyarrow.Schema): Schema from arrow_schema.
+
+    Returns:
+        pyarrow.RecordBatch: The typed batch. Values that don't fit a column's
+            type become nulls.
+    """
+    pa = _require_pyarrow()
+    import pyarrow.compute as pc
+
+    arrays = []
+    for field in schema:
+        values = [record.get(field.name) for record in records]
+        if field.name == "TimeCreated":
+            arrays.append(_parse_times(pa, pc, values))
+        elif pa.types.is_integer(field.type):
+            arrays.append(pa.array([_to_int(v) for v in values], type=field.type))
+        elif pa.types.is_dictionary(field.type):
+            strings = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+            arrays.append(strings.dictionary_encode())
+        else:
+            arrays.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _parse_times(pa, pc, values: list):
+    strings = pa.array([v if isinstance(v, str) else None for v in values], type=pa.string())
+    try:
+        return pc.strptime(strings, format=DATETIME_FORMAT, unit="s", error_is_null=True)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # some platforms' strptime lack %p; parse in Python instead
+        parsed = []
+        for v in values:
+            try:
+                parsed.append(datetime.strptime(v, DATETIME_FORMAT))
+            except (TypeError, ValueError):
+                parsed.append(None)
+        return pa.array(parsed, type=pa.timestamp("s"))
+
+
+def _to_int(value) -> Optional[int]:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value)
+    return None
+
+
+class ColumnarFileWriter:
+    """
+    Writes Arrow record batches to a Parquet (.parquet) or Arrow IPC (.arrow) file.
+
+    Parquet files get one row group per batch and zstd compression; Arrow
+    IPC files are left uncompressed so they can be memory-mapped on reload.
+    An IPC file holds one dictionary per column, so each batch's dictionaries
+    are remapped onto a running one that only grows (written as deltas).
+
+    Args:
+        path (str): Output path ending in .parquet or .arrow.
+        schema (pyarrow.Schema): Schema of every batch.
+    """
+
+    def __init__(self, path: str, schema):
+        pa = _require_pyarrow()
+        self.schema = schema
+        if path.lower().endswith(".parquet"):
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, schema, compression="zstd")
+            self._parquet = True
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(self._sink, schema, options=options)
+            self._parquet = False
+            self._dictionaries = {}
+
+    def write_batch(self, batch):
+        if self._parquet:
+            self._writer.write_batch(batch, row_group_size=batch.num_rows)
+        else:
+            self._writer.write_batch(self._stable_dictionaries(batch))
+
+    def _stable_dictionaries(self, batch):
+        pa = _require_pyarrow()
+        import pyarrow.compute as pc
+
+        columns = []
+        for field, column in zip(batch.schema, batch.columns):
+            if pa.types.is_dictionary(field.type):
+                values = column.dictionary
+                known = self._dictionaries.get(field.name, pa.array([], type=values.type))
+                new = pc.filter(values, pc.invert(pc.is_in(values, value_set=known)))
+                if len(new):
+                    known = self._dictionaries[field.name] = pa.concat_arrays([known, new])
+                # batch index -> running index
+                remap = pc.index_in(values, value_set=known)
+                indices = pc.take(remap, column.indices).cast(field.type.index_type)
+                column = pa.DictionaryArray.from_arrays(indices, known)
+            columns.append(column)
+        return pa.RecordBatch.from_arrays(columns, schema=batch.schema)
+
+    def close(self):
+        self._writer.close()
+        if not self._parquet:
+            self._sink.close()
+
+
+def write_table_frame(frame, path: str, row_group_size: int = ROW_GROUP_SIZE):
+    """
+    Writes an EventTable's DataFrame straight to a columnar file, skipping the per-row path.
+
+    Args:
+        frame (pd.DataFrame): EventTable.frame
+        path (str): Output path ending in .parquet or .arrow.
+        row_group_size (int): Rows per row group / record batch.
+    """
+    pa = _require_pyarrow()
+    schema = arrow_schema(frame.columns)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    # categoricals become dictionaries and datetime64 timestamps; align the rest
+    table = table.select(schema.names).cast(schema)
+    writer = ColumnarFileWriter(path, schema)
+    try:
+        for batch in table.to_batches(max_chunksize=row_group_size):
+            writer.write_batch(batch)
+    finally:
+        writer.close()
+
+
+def _open_batches(path: str, batch_size: int):
+    pa = _require_pyarrow()
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+    reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+    return (reader.get_batch(i) for i in range(reader.num_record_batches))
+
+
+def iter_columnar_records(path: str, batch_size: int = 10_000) -> Iterator[dict]:
+    """
+    Reads a Parquet or Arrow file back into parsed-log dictionaries, one batch at a time.
+
+    Args:
+        path (str): Path to a .parquet or .arrow export.
+        batch_size (int): Rows decoded at a time (Parquet only; Arrow files use their batches).
+
+    Yields:
+        dict: Logs shaped like parse_logs output, with TimeCreated formatted
+            as MM/DD/YYYY HH:MM:SS AM/PM and null fields left out.
+    """
+    for batch in _open_batches(path, batch_size):
+        for record in batch.to_pylist():
+            time_created = record.get("TimeCreated")
+            if isinstance(time_created, datetime):
+                record["TimeCreated"] = time_created.strftime(DATETIME_FORMAT)
+            yield {key: value for key, value in record.items() if value is not None}
+
+
+def read_columnar_table(path: str):
+    """
+    Loads a Parquet or Arrow file into an EventTable, keeping its column types.
+
+    Args:
+        path (str): Path to a .parquet or .arrow export.
+
+    Returns:
+        EventTable: The loaded table, ready for filtering, exports or summarization.
+    """
+    pa = _require_pyarrow()
+    import pandas as pd  # pandas is only needed here
+    from utils.event_table import INTEGER_DTYPES, EventTable
+
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+    # nullable integers, as in EventTable.from_records, so missing numbers stay
+    # missing instead of turning the column into floats
+    nullable = {getattr(pa, INTEGER_COLUMNS[column])(): pd.api.types.pandas_dtype(dtype)
+                for column, dtype in INTEGER_DTYPES.items()}
+    frame = table.to_pandas(types_mapper=nullable.get)
+    for column in DICTIONARY_COLUMNS:
+        if column in frame and frame[column].hasnans:
+            frame[column] = frame[column].astype(object).fillna("").astype("category")
+    for column in frame.columns:
+        if column not in EVENT_COLUMNS and column not in DICTIONARY_COLUMNS:
+            frame[column] = frame[column].astype("string")
+    frame["Message"] = frame["Message"].fillna("")
+    return EventTable(frame)
+
+
+def is_columnar(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in COLUMNAR_EXTENSIONS
@@ -0,0 +1,68 @@
+# utils/compression.py
+import gzip
+import io
+
+# compressed file suffixes, e.g. logs.jsonl.gz
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+
+
+def split_compression(filename: str) -> tuple[str, str]:
+    """
+    Splits a compression suffix off a filename.
+
+    Args:
+        filename (str): e.g. 'logs.jsonl.gz'
+
+    Returns:
+        tuple[str, str]: ('logs.jsonl', '.gz'), or (filename, '') if uncompressed.
+    """
+    for suffix in COMPRESSION_SUFFIXES:
+        if filename.lower().endswith(suffix):
+            return filename[:-len(suffix)], suffix
+    return filename, ""
+
+
+def open_text(path: str, mode: str = "r", encoding: str = "utf-8", newline=None,
+              buffering: int = -1, compresslevel: int = 6):
+    """
+    Opens a text file, compressing or decompressing by its suffix.
+
+    .gz uses gzip; .zst uses the optional zstandard package. Appending to a
+    compressed file adds a new member/frame, which readers handle as one stream.
+
+    Args:
+        path (str): File path.
+        mode (str): 'r', 'w' or 'a'.
+        encoding (str): Text encoding.
+        newline: As for open().
+        buffering (int): Buffer size for uncompressed files, as for open().
+        compresslevel (int): gzip level 1-9; zstd levels are mapped the same way.
+
+    Returns:
+        A text file object.
+
+    Raises:
+        ImportError: If a .zst file is opened without zstandard installed.
+    """
+    mode = mode.replace("t", "")
+    _, suffix = split_compression(path)
+
+    if suffix == ".gz":
+        return gzip.open(path, mode + "t", compresslevel=compresslevel,
+                         encoding=encoding, newline=newline)
+
+    if suffix == ".zst":
+        try:
+            import zstandard  # optional dependency
+        except ImportError:
+            raise ImportError("Reading or writing .zst files requires the zstandard package "
+                              "(pip install zstandard)")
+        raw = open(path, mode + "b")
+        if mode == "r":
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True,
+                                                                closefd=True)
+            return io.TextIOWrapper(io.BufferedReader(stream), encoding=encoding, newline=newline)
+        stream = zstandard.ZstdCompressor(level=compresslevel).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding=encoding, newline=newline, write_through=False)
+
+    return open(path, mode, encoding=encoding, newline=newline, buffering=buffering)
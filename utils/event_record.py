@@ -0,0 +1,167 @@
+# utils/event_record.py
+import sys  # string interning
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from utils.parse_logs import DATETIME_FORMAT, iter_parse_logs
+
+# record keys and the slots that hold them, in record order
+_FIELDS = (
+    ("TimeCreated", "time_created"),
+    ("Id", "id"),
+    ("Level", "level"),
+    ("LevelDisplayName", "level_name"),
+    ("ProviderName", "provider"),
+    ("RecordId", "record_id"),
+    ("Message", "message"),
+    ("LogName", "log_name"),
+)
+_SLOT_FOR_KEY = dict(_FIELDS)
+
+# marks a field the source record didn't have
+_MISSING = object()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Event:
+    """
+    Compact event record.
+
+    Fields live in __slots__ instead of a per-record dict, provider, level
+    and log names are interned so repeated values share one string, and
+    TimeCreated is only parsed into a datetime when .timestamp is first read.
+
+    Event also behaves like a read-only mapping with the same keys as the
+    dicts from fetch_event_records, so exporters and format_logs_for_gpt
+    accept it unchanged.
+    """
+    __slots__ = ("time_created", "id", "level", "level_name", "provider",
+                 "record_id", "message", "log_name", "extra", "_timestamp")
+
+    def __init__(self, time_created=_MISSING, id=_MISSING, level=_MISSING,
+                 level_name=_MISSING, provider=_MISSING, record_id=_MISSING,
+                 message=_MISSING, log_name=_MISSING, extra: Optional[dict] = None):
+        self.time_created = time_created
+        self.id = id
+        self.level = level
+        self.level_name = _intern(level_name)
+        self.provider = _intern(provider)
+        self.record_id = record_id
+        self.message = message
+        self.log_name = _intern(log_name)
+        self.extra = extra  # any other keys
+        self._timestamp = None
+
+    @classmethod
+    def from_dict(cls, log: dict) -> "Event":
+        """
+        Builds an Event from a parsed log dictionary.
+
+        Args:
+            log (dict): A parsed log entry.
+
+        Returns:
+            Event: The compact record.
+        """
+        values = {}
+        extra = None
+        for key, value in log.items():
+            slot = _SLOT_FOR_KEY.get(key)
+            if slot is not None:
+                values[slot] = value
+            else:
+                if extra is None:
+                    extra = {}
+                extra[_intern(key)] = _intern(value)
+        return cls(extra=extra, **values)
+
+    @property
+    def timestamp(self) -> Optional[datetime]:
+        """TimeCreated as a datetime, parsed on first access."""
+        if self._timestamp is None and isinstance(self.time_created, str):
+            try:
+                self._timestamp = datetime.strptime(self.time_created, DATETIME_FORMAT)
+            except ValueError:
+                return None
+        return self._timestamp
+
+    # read-only mapping protocol
+
+    def keys(self) -> list[str]:
+        keys = [key for key, slot in _FIELDS if getattr(self, slot) is not _MISSING]
+        if self.extra:
+            keys.extend(self.extra)
+        return keys
+
+    def items(self) -> list[tuple]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __getitem__(self, key: str):
+        slot = _SLOT_FOR_KEY.get(key)
+        if slot is not None:
+            value = getattr(self, slot)
+            if value is not _MISSING:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Event, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Event({self.to_dict()!r})"
+
+
+def to_events(logs: Iterable[dict]) -> Iterator[Event]:
+    """
+    Converts parsed log dictionaries into Events one at a time.
+
+    Args:
+        logs (Iterable[dict]): Parsed logs from any fetch or parse function.
+
+    Yields:
+        Event: One compact record per log.
+    """
+    for log in logs:
+        yield log if isinstance(log, Event) else Event.from_dict(log)
+
+
+def parse_events(raw_text: str) -> list[Event]:
+    """
+    Parses raw Format-List output straight into Events.
+
+    Args:
+        raw_text (str): Raw event logs output from PowerShell.
+
+    Returns:
+        list[Event]: Parsed events.
+    """
+    return list(to_events(iter_parse_logs(raw_text.splitlines())))
@@ -0,0 +1,429 @@
+# utils/event_store.py
+import atexit  # close the shared store on exit
+import json
+import sqlite3  # persistent on-disk store
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from utils.parse_logs import DATETIME_FORMAT
+
+# default location of the event database
+DEFAULT_STORE_PATH = ".event_store.sqlite3"
+
+# sortable form of TimeCreated used inside the database
+STORE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# record fields with their own column; anything else is kept as JSON in `extra`
+STORE_FIELDS = ("TimeCreated", "Id", "Level", "LevelDisplayName", "ProviderName", "RecordId", "Message")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS events ("
+    " log_name TEXT NOT NULL,"
+    " record_id INTEGER NOT NULL,"
+    " time_created TEXT NOT NULL,"
+    " id INTEGER,"
+    " level INTEGER,"
+    " level_display_name TEXT,"
+    " provider_name TEXT COLLATE NOCASE,"
+    " message TEXT,"
+    " extra TEXT,"
+    " UNIQUE (log_name, record_id))",
+    "CREATE INDEX IF NOT EXISTS idx_events_time ON events (log_name, time_created)",
+    "CREATE INDEX IF NOT EXISTS idx_events_id ON events (id, time_created)",
+    "CREATE INDEX IF NOT EXISTS idx_events_provider ON events (provider_name, time_created)",
+    "CREATE INDEX IF NOT EXISTS idx_events_level ON events (level, time_created)",
+    # time ranges known to be complete for a set of filters
+    "CREATE TABLE IF NOT EXISTS coverage ("
+    " log_name TEXT NOT NULL,"
+    " level INTEGER,"
+    " provider_name TEXT COLLATE NOCASE,"
+    " event_ids TEXT,"
+    " start_time TEXT NOT NULL,"
+    " start_record_id INTEGER NOT NULL DEFAULT 0,"
+    " end_time TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_coverage_log ON coverage (log_name)",
+)
+
+# full-text index on Message, kept in step with the events table by triggers
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+    " message, content='events', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS events_ai AFTER INSERT ON events BEGIN"
+    " INSERT INTO events_fts (rowid, message) VALUES (new.rowid, new.message); END",
+    "CREATE TRIGGER IF NOT EXISTS events_ad AFTER DELETE ON events BEGIN"
+    " INSERT INTO events_fts (events_fts, rowid, message) VALUES ('delete', old.rowid, old.message); END",
+)
+
+
+def _store_time(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    return datetime.strptime(value, DATETIME_FORMAT).strftime(STORE_TIME_FORMAT)
+
+
+def _display_time(value: str) -> str:
+    # 'YYYY-MM-DD HH:MM:SS' -> DATETIME_FORMAT without a strptime per row
+    hour = int(value[11:13])
+    return (f"{value[5:7]}/{value[8:10]}/{value[:4]} {hour % 12 or 12:02d}{value[13:19]} "
+            f"{'PM' if hour >= 12 else 'AM'}")
+
+
+def _next_second(value: str) -> str:
+    return (datetime.strptime(value, STORE_TIME_FORMAT) + timedelta(seconds=1)).strftime(STORE_TIME_FORMAT)
+
+
+def _ids_key(event_ids: Optional[list[int]]) -> Optional[str]:
+    return json.dumps(sorted(set(event_ids))) if event_ids else None
+
+
+class EventStore:
+    """
+    Local SQLite index of fetched events, so repeat queries skip Get-WinEvent.
+
+    Fetched records are upserted and deduplicated by (log name, record ID).
+    Alongside the events, the store remembers which time ranges it holds
+    completely for a set of filters: a fetch that returned fewer than
+    max_events covers its whole range, and one that was cut off covers the
+    range down to its oldest event (Get-WinEvent returns events newest
+    first, by time and then record ID). A later query is answered from the
+    store only if the events it would return are covered by filters at least
+    as broad, so results match what Get-WinEvent would have returned.
+
+    Args:
+        path (str): SQLite database file; ':memory:' for a throwaway store.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # shards may be fetched from worker threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        try:
+            for statement in _FTS_SCHEMA:
+                self._conn.execute(statement)
+            self.full_text = True
+        except sqlite3.OperationalError:
+            self.full_text = False  # SQLite built without FTS5
+        self._conn.commit()
+
+    def add(self,
+            records: list[dict],
+            log_type: str = "System",
+            start_time: Optional[str] = None,
+            end_time: Optional[str] = None,
+            max_events: int = 100,
+            level: Optional[int] = None,
+            provider_name: Optional[str] = None,
+            event_ids: Optional[list[int]] = None,
+            fetched_at: Optional[datetime] = None) -> int:
+        """
+        Stores the result of a fetch and records the range it covers.
+
+        Args:
+            records (list[dict]): Records returned by the fetch, newest first.
+            log_type, start_time, end_time, max_events, level, provider_name,
+                event_ids: The filters the records were fetched with.
+            fetched_at (Optional[datetime]): When the fetch started. Events
+                written after it may be missing from the records, so coverage
+                ends there; defaults to now.
+
+        Returns:
+            int: Number of records that weren't in the store yet.
+        """
+        added = self.upsert(records, log_type)
+
+        try:
+            start = (_store_time(start_time) or "", 0)
+            # events can still arrive this second, so it isn't covered yet
+            now = ((fetched_at or datetime.now()) - timedelta(seconds=1)).strftime(STORE_TIME_FORMAT)
+            end = min(_store_time(end_time) or now, now)
+            if len(records) >= max_events:
+                # cut off: complete only down to the oldest event returned
+                start = max(start, min((_store_time(r["TimeCreated"]), r["RecordId"]) for r in records))
+            if any(r.get("RecordId") is None for r in records):
+                return added  # records without IDs can't be stored, so the range isn't complete
+        except (KeyError, TypeError, ValueError):
+            return added
+
+        if start[0] <= end:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO coverage (log_name, level, provider_name, event_ids, start_time,"
+                    " start_record_id, end_time) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (log_type, level, provider_name or None, _ids_key(event_ids), *start, end))
+                self._conn.commit()
+        return added
+
+    def upsert(self, records: Iterable[dict], log_type: str = "System") -> int:
+        """
+        Inserts records that aren't stored yet; records without a RecordId are skipped.
+
+        Args:
+            records (Iterable[dict]): Parsed event records.
+            log_type (str): Log the records came from, used when they have no LogName.
+
+        Returns:
+            int: Number of records inserted.
+        """
+        rows = []
+        for record in records:
+            try:
+                time_created = _store_time(record.get("TimeCreated"))
+            except (TypeError, ValueError):
+                continue
+            if time_created is None or record.get("RecordId") is None:
+                continue
+            extra = {k: v for k, v in record.items() if k not in STORE_FIELDS and k != "LogName"}
+            rows.append((record.get("LogName") or log_type, record["RecordId"], time_created,
+                         record.get("Id"), record.get("Level"), record.get("LevelDisplayName"),
+                         record.get("ProviderName"), record.get("Message"),
+                         json.dumps(extra) if extra else None))
+
+        with self._lock:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO events (log_name, record_id, time_created, id, level,"
+                " level_display_name, provider_name, message, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows)
+            self._conn.commit()
+        return cursor.rowcount
+
+    def lookup(self,
+               log_type: str = "System",
+               start_time: Optional[str] = None,
+               end_time: Optional[str] = None,
+               max_events: int = 100,
+               level: Optional[int] = None,
+               provider_name: Optional[str] = None,
+               event_ids: Optional[list[int]] = None) -> Optional[list[dict]]:
+        """
+        Answers a query from the store if it holds every event the query would return.
+
+        That is the case when the whole range is covered, or when the covered
+        newest part of it already has max_events matching events.
+
+        Args:
+            log_type (str): The log name, e.g., 'System', 'Application'
+            start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+            end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format; None means now
+            max_events (int): Maximum number of events to return
+            level (Optional[int]): Event level (1-5)
+            provider_name (Optional[str]): Name of the event provider
+            event_ids (Optional[list[int]]): List of specific event IDs
+
+        Returns:
+            Optional[list[dict]]: Event records, newest first, shaped like
+                fetch_event_records output; None if Get-WinEvent is needed.
+        """
+        try:
+            start = _store_time(start_time) or ""
+            end = _store_time(end_time) or datetime.now().strftime(STORE_TIME_FORMAT)
+        except ValueError:
+            return None
+
+        since = self.covered_since(log_type, start, end, level, provider_name, event_ids)
+        if since is not None:
+            if since <= (start, 0):
+                records = self._query(log_type, start, end, max_events, level, provider_name, event_ids)
+            else:
+                # only the newest part is covered; enough if it fills max_events
+                records = self._query(log_type, since[0], end, max_events, level, provider_name,
+                                      event_ids, since[1])
+            if since <= (start, 0) or len(records) >= max_events:
+                self.hits += 1
+                return records
+        self.misses += 1
+        return None
+
+    def covered_since(self,
+                      log_type: str,
+                      start: str,
+                      end: str,
+                      level: Optional[int] = None,
+                      provider_name: Optional[str] = None,
+                      event_ids: Optional[list[int]] = None) -> Optional[tuple[str, int]]:
+        """
+        Finds how far back from end the store is complete for a set of filters.
+
+        Ranges from earlier fetches are combined, as long as each was fetched
+        with the same or broader filters.
+
+        Args:
+            log_type (str): The log name.
+            start (str): Requested start in STORE_TIME_FORMAT, or '' for no start.
+            end (str): Requested end in STORE_TIME_FORMAT.
+            level, provider_name, event_ids: The query's other filters.
+
+        Returns:
+            Optional[tuple[str, int]]: (time, record ID) of the oldest event
+                from which everything up to end is covered; time is in
+                STORE_TIME_FORMAT ('' for the beginning of the log) and record
+                ID 0 means the whole second. None if end itself isn't covered.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start_time, start_record_id, end_time, event_ids FROM coverage"
+                " WHERE log_name = ? AND end_time >= ? AND start_time <= ?"
+                " AND (level IS NULL OR level = ?)"
+                " AND (provider_name IS NULL OR provider_name = ?)",
+                (log_type, start, end, level, provider_name or None)).fetchall()
+
+        wanted = set(event_ids or ())
+        ranges = sorted((((row_start, record_id), row_end) for row_start, record_id, row_end, ids in rows
+                         if ids is None or (wanted and wanted <= set(json.loads(ids)))),
+                        key=lambda r: r[1], reverse=True)
+
+        # walk back from end; ranges that touch or overlap join up
+        since = None
+        for row_start, row_end in ranges:
+            if since is None:
+                if row_end < end:
+                    return None
+                since = row_start
+            elif row_end >= since[0] or (since[1] == 0 and _next_second(row_end) == since[0]):
+                since = min(since, row_start)
+            else:
+                break
+            if since <= (start, 0):
+                break
+        return since
+
+    def query(self,
+              log_type: str = "System",
+              start_time: Optional[str] = None,
+              end_time: Optional[str] = None,
+              max_events: int = 100,
+              level: Optional[int] = None,
+              provider_name: Optional[str] = None,
+              event_ids: Optional[list[int]] = None) -> list[dict]:
+        """
+        Returns stored events matching the same filters as fetch_event_records,
+        whether or not the range is covered.
+
+        Args:
+            log_type (str): The log name, e.g., 'System', 'Application'
+            start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+            end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+            max_events (int): Maximum number of events to return
+            level (Optional[int]): Event level (1-5)
+            provider_name (Optional[str]): Name of the event provider
+            event_ids (Optional[list[int]]): List of specific event IDs
+
+        Returns:
+            list[dict]: Event records, newest first.
+        """
+        return self._query(log_type, _store_time(start_time), _store_time(end_time),
+                           max_events, level, provider_name, event_ids)
+
+    def _query(self, log_type: str, start: Optional[str], end: Optional[str], max_events: int,
+               level: Optional[int], provider_name: Optional[str],
+               event_ids: Optional[list[int]], start_record_id: int = 0) -> list[dict]:
+        clauses = ["log_name = ?"]
+        params: list = [log_type]
+        if start:
+            clauses.append("time_created >= ?")
+            params.append(start)
+        if start_record_id:
+            # within the first second, only events at or after this record
+            clauses.append("(time_created > ? OR record_id >= ?)")
+            params.extend((start, start_record_id))
+        if end:
+            clauses.append("time_created <= ?")
+            params.append(end)
+        if level is not None:
+            clauses.append("level = ?")
+            params.append(level)
+        if provider_name:
+            clauses.append("provider_name = ?")
+            params.append(provider_name)
+        if event_ids:
+            clauses.append(f"id IN ({', '.join('?' * len(event_ids))})")
+            params.extend(event_ids)
+        params.append(max_events)
+
+        return self._select(" WHERE " + " AND ".join(clauses)
+                            + " ORDER BY time_created DESC, record_id DESC LIMIT ?", params)
+
+    def search(self, text: str, log_type: Optional[str] = None, limit: int = 100) -> list[dict]:
+        """
+        Finds stored events whose Message matches a full-text query.
+
+        Args:
+            text (str): An FTS5 query, e.g. 'disk AND timeout' or '"service stopped"'.
+            log_type (Optional[str]): Only search this log.
+            limit (int): Maximum number of events to return.
+
+        Returns:
+            list[dict]: Matching records, newest first, with the LogName they came from.
+
+        Raises:
+            RuntimeError: If SQLite was built without FTS5.
+        """
+        if not self.full_text:
+            raise RuntimeError("Full-text search needs SQLite with FTS5")
+        where = " WHERE rowid IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)"
+        params: list = [text]
+        if log_type:
+            where += " AND log_name = ?"
+            params.append(log_type)
+        params.append(limit)
+        return self._select(where + " ORDER BY time_created DESC, record_id DESC LIMIT ?", params,
+                            with_log_name=True)
+
+    def _select(self, where: str, params: list, with_log_name: bool = False) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT time_created, id, level, level_display_name, provider_name, record_id,"
+                " message, extra, log_name FROM events" + where, params).fetchall()
+
+        records = []
+        for time_created, *values, extra, log_name in rows:
+            record = {"TimeCreated": _display_time(time_created)}
+            record.update((k, v) for k, v in zip(STORE_FIELDS[1:], values) if v is not None)
+            if extra:
+                record.update(json.loads(extra))
+            if with_log_name:
+                record["LogName"] = log_name
+            records.append(record)
+        return records
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and the number of stored events and covered ranges.
+
+        Returns:
+            dict: {"hits": int, "misses": int, "events": int, "ranges": int}
+        """
+        with self._lock:
+            events = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            ranges = self._conn.execute("SELECT COUNT(*) FROM coverage").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "events": events, "ranges": ranges}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# shared stores by path
+_stores: dict[str, EventStore] = {}
+
+
+def get_event_store(path: str = DEFAULT_STORE_PATH) -> EventStore:
+    """
+    Returns a process-wide store for path, opening it on first use.
+
+    Args:
+        path (str): SQLite database file.
+
+    Returns:
+        EventStore: The shared store. It is closed at exit.
+    """
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = EventStore(path)
+        atexit.register(store.close)
+    return store
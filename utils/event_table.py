@@ -0,0 +1,188 @@
+# utils/event_table.py
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.parse_logs import DATETIME_FORMAT
+
+# columns every table has, in record order
+EVENT_COLUMNS = ["TimeCreated", "Id", "Level", "LevelDisplayName",
+                 "ProviderName", "RecordId", "Message"]
+
+# low-cardinality string columns stored as categoricals
+CATEGORY_COLUMNS = ["LevelDisplayName", "ProviderName", "LogName", "Host"]
+
+# nullable integer columns, so a missing number stays missing instead of 0
+INTEGER_DTYPES = {"Id": "Int32", "Level": "Int8", "RecordId": "Int64"}
+
+
+class EventTable:
+    """
+    Columnar store for parsed events, backed by a pandas DataFrame.
+
+    TimeCreated is held as datetime64, Id/Level/RecordId as nullable integer
+    arrays, provider/level names as categoricals, so each distinct string is
+    stored once, and any other field as nullable strings. Iterating yields
+    dicts in the same shape as fetch_event_records, with missing values as
+    None, so a table can be handed to any exporter or to format_logs_for_gpt.
+
+    Args:
+        frame (pd.DataFrame): Frame with (at least) the EVENT_COLUMNS.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "EventTable":
+        """
+        Builds a table from parsed log dictionaries.
+
+        Args:
+            records (Iterable[dict]): Parsed logs (dicts or Events) from any fetch
+                or parse function.
+
+        Returns:
+            EventTable: The typed table.
+        """
+        frame = pd.DataFrame.from_records(
+            [r.to_dict() if hasattr(r, "to_dict") else r for r in records])
+        for column in EVENT_COLUMNS:
+            if column not in frame:
+                frame[column] = None
+
+        frame["TimeCreated"] = pd.to_datetime(
+            frame["TimeCreated"], format=DATETIME_FORMAT, errors="coerce")
+        for column, dtype in INTEGER_DTYPES.items():
+            values = pd.to_numeric(frame[column], errors="coerce")
+            frame[column] = values.astype(dtype)
+        for column in CATEGORY_COLUMNS:
+            if column in frame:
+                frame[column] = frame[column].fillna("").astype("category")
+        frame["Message"] = frame["Message"].fillna("").astype(object)
+
+        extra = [c for c in frame.columns if c not in EVENT_COLUMNS]
+        for column in extra:
+            if column not in CATEGORY_COLUMNS:
+                frame[column] = frame[column].astype("string")
+        return cls(frame[EVENT_COLUMNS + extra].reset_index(drop=True))
+
+    # sequence protocol
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __bool__(self) -> bool:
+        return not self.frame.empty
+
+    def __iter__(self) -> Iterator[dict]:
+        columns = list(self.frame.columns)
+        times = self.frame["TimeCreated"].dt.strftime(DATETIME_FORMAT)
+        data = [times.fillna("").tolist() if c == "TimeCreated"
+                else _to_list(self.frame[c]) for c in columns]
+        for row in zip(*data):
+            yield dict(zip(columns, row))
+
+    def to_records(self) -> list[dict]:
+        return list(self)
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.frame.columns)
+
+    # vectorized queries
+
+    def filter(self,
+               level: Optional[int] = None,
+               provider_name: Optional[str] = None,
+               event_ids: Optional[list[int]] = None,
+               start_time: Optional[str] = None,
+               end_time: Optional[str] = None) -> "EventTable":
+        """
+        Returns the rows matching every given filter.
+
+        Args:
+            level (Optional[int]): Event level (1-5)
+            provider_name (Optional[str]): Provider name, matched case-insensitively
+            event_ids (Optional[list[int]]): List of specific event IDs
+            start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+            end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+
+        Returns:
+            EventTable: A new table holding the matching rows.
+        """
+        mask = np.ones(len(self.frame), dtype=bool)
+        if level is not None:
+            mask &= (self.frame["Level"] == level).to_numpy(dtype=bool, na_value=False)
+        if provider_name:
+            providers = self.frame["ProviderName"].astype(str).str.lower()
+            mask &= (providers == provider_name.lower()).to_numpy()
+        if event_ids:
+            mask &= self.frame["Id"].isin(event_ids).to_numpy(dtype=bool)
+        if start_time:
+            mask &= (self.frame["TimeCreated"] >= datetime.strptime(start_time, DATETIME_FORMAT)).to_numpy()
+        if end_time:
+            mask &= (self.frame["TimeCreated"] <= datetime.strptime(end_time, DATETIME_FORMAT)).to_numpy()
+        return EventTable(self.frame[mask].reset_index(drop=True))
+
+    def counts_by(self, *columns: str) -> pd.Series:
+        """
+        Counts events per distinct value (or value combination) of columns.
+
+        Args:
+            *columns (str): Column names, e.g. 'ProviderName', 'Id'
+
+        Returns:
+            pd.Series: Counts, largest first.
+        """
+        return (self.frame.groupby(list(columns), observed=True)
+                .size()
+                .sort_values(ascending=False))
+
+    def time_range(self) -> Optional[tuple[str, str]]:
+        """
+        Returns the TimeCreated of the first and last rows.
+
+        Returns:
+            Optional[tuple[str, str]]: (first, last) formatted times, or None if empty.
+        """
+        times = self.frame["TimeCreated"].dropna()
+        if times.empty:
+            return None
+        return (times.iloc[0].strftime(DATETIME_FORMAT),
+                times.iloc[-1].strftime(DATETIME_FORMAT))
+
+    def providers(self) -> list[str]:
+        """
+        Returns the distinct provider names, in order of first appearance.
+
+        Returns:
+            list[str]: Provider names.
+        """
+        return [p for p in pd.unique(self.frame["ProviderName"].astype(str)) if p]
+
+    def stats(self) -> dict:
+        """
+        Summarizes the table in one pass over its columns.
+
+        Returns:
+            dict: Total count, time span and counts per level, provider and ID.
+        """
+        times = self.frame["TimeCreated"].dropna()
+        return {
+            "total": len(self.frame),
+            "first": times.min().strftime(DATETIME_FORMAT) if not times.empty else None,
+            "last": times.max().strftime(DATETIME_FORMAT) if not times.empty else None,
+            "levels": self.counts_by("LevelDisplayName").to_dict(),
+            "providers": self.counts_by("ProviderName").to_dict(),
+            "ids": {int(k): int(v) for k, v in self.counts_by("Id").items()},
+        }
+
+
+def _to_list(column: pd.Series) -> list:
+    # nullable columns hold pd.NA for missing values; hand them out as None
+    if column.hasnans:
+        return column.astype(object).where(column.notna(), None).tolist()
+    return column.tolist()
@@ -0,0 +1,534 @@
+# utils/evtx_reader.py
+import mmap  # read .evtx files without loading them whole
+import struct  # decode little-endian binary fields
+import uuid  # GUID values
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+from utils.parse_logs import DATETIME_FORMAT
+
+# file and chunk layout
+FILE_MAGIC = b"ElfFile\x00"
+CHUNK_MAGIC = b"ElfChnk\x00"
+RECORD_MAGIC = b"\x2a\x2a\x00\x00"
+FILE_HEADER_SIZE = 0x1000
+CHUNK_SIZE = 0x10000
+CHUNK_RECORDS_OFFSET = 0x200
+
+# binary XML tokens (low nibble; 0x40 marks "has attributes"/"more follow")
+TOKEN_EOF = 0x00
+TOKEN_OPEN_START_ELEMENT = 0x01
+TOKEN_CLOSE_START_ELEMENT = 0x02
+TOKEN_CLOSE_EMPTY_ELEMENT = 0x03
+TOKEN_END_ELEMENT = 0x04
+TOKEN_VALUE = 0x05
+TOKEN_ATTRIBUTE = 0x06
+TOKEN_CDATA = 0x07
+TOKEN_CHAR_REF = 0x08
+TOKEN_ENTITY_REF = 0x09
+TOKEN_PI_TARGET = 0x0a
+TOKEN_PI_DATA = 0x0b
+TOKEN_TEMPLATE_INSTANCE = 0x0c
+TOKEN_NORMAL_SUBSTITUTION = 0x0d
+TOKEN_OPTIONAL_SUBSTITUTION = 0x0e
+TOKEN_FRAGMENT_HEADER = 0x0f
+
+# tokens that can make up element content or an attribute value
+_CONTENT_TOKENS = (TOKEN_VALUE, TOKEN_CDATA, TOKEN_CHAR_REF, TOKEN_ENTITY_REF,
+                   TOKEN_NORMAL_SUBSTITUTION, TOKEN_OPTIONAL_SUBSTITUTION)
+
+# fixed-width substitution value types
+_STRUCT_TYPES = {
+    0x03: "<b", 0x04: "<B", 0x05: "<h", 0x06: "<H", 0x07: "<i", 0x08: "<I",
+    0x09: "<q", 0x0a: "<Q", 0x0b: "<f", 0x0c: "<d",
+}
+
+# Level Mapping:
+# 1 = Critical, 2 = Error, 3 = Warning, 4 = Information, 5 = Verbose
+LEVEL_NAMES = {
+    0: "Information",  # LogAlways, shown as Information by Event Viewer
+    1: "Critical",
+    2: "Error",
+    3: "Warning",
+    4: "Information",
+    5: "Verbose",
+}
+
+_FILETIME_EPOCH = datetime(1601, 1, 1, tzinfo=timezone.utc)
+
+
+class EvtxFormatError(ValueError):
+    """Raised when a file is not a readable .evtx log."""
+
+
+class _Substitution:
+    """Placeholder in a template for a value supplied by each record."""
+    __slots__ = ("index", "optional")
+
+    def __init__(self, index: int, optional: bool):
+        self.index = index
+        self.optional = optional
+
+
+class _Element:
+    """A decoded XML element: name, attributes and child nodes."""
+    __slots__ = ("name", "attrs", "children")
+
+    def __init__(self, name: str, attrs: list, children: list):
+        self.name = name
+        self.attrs = attrs
+        self.children = children
+
+    def find(self, name: str) -> Optional["_Element"]:
+        for child in self.children:
+            if isinstance(child, _Element) and child.name == name:
+                return child
+        return None
+
+    def elements(self) -> list["_Element"]:
+        return [child for child in self.children if isinstance(child, _Element)]
+
+    def attr(self, name: str) -> Optional[str]:
+        for key, value in self.attrs:
+            if key == name:
+                return value
+        return None
+
+    def text(self) -> str:
+        return "".join(_value_to_text(child) for child in self.children
+                       if not isinstance(child, _Element))
+
+
+def _filetime_to_datetime(value: int) -> datetime:
+    return _FILETIME_EPOCH + timedelta(microseconds=value // 10)
+
+
+def _value_to_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ", ".join(_value_to_text(v) for v in value)
+    return str(value)
+
+
+def _decode_sid(data: bytes) -> str:
+    revision, count = data[0], data[1]
+    authority = int.from_bytes(data[2:8], "big")
+    subs = struct.unpack_from(f"<{count}I", data, 8)
+    return "S-{}-{}".format(revision, authority) + "".join(f"-{s}" for s in subs)
+
+
+class _Chunk:
+    """
+    One 64 KiB chunk of an .evtx file.
+
+    String and template offsets are relative to the chunk start, so names
+    and templates are decoded lazily and cached per chunk.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self._names: dict[int, tuple[str, int]] = {}
+        self._templates: dict[int, _Element] = {}
+        self.free_space_offset = struct.unpack_from("<I", data, 48)[0]
+
+    # low-level readers
+
+    def _u16(self, pos: int) -> int:
+        return struct.unpack_from("<H", self.data, pos)[0]
+
+    def _u32(self, pos: int) -> int:
+        return struct.unpack_from("<I", self.data, pos)[0]
+
+    def _name_at(self, offset: int) -> tuple[str, int]:
+        """Returns (name, encoded length) for a name string at offset."""
+        cached = self._names.get(offset)
+        if cached is None:
+            length = self._u16(offset + 6)
+            start = offset + 8
+            name = self.data[start:start + length * 2].decode("utf-16-le")
+            cached = (name, 8 + length * 2 + 2)
+            self._names[offset] = cached
+        return cached
+
+    def _name(self, pos: int) -> tuple[str, int]:
+        """Reads a name reference at pos, skipping the string if it is inline."""
+        offset = self._u32(pos)
+        pos += 4
+        name, length = self._name_at(offset)
+        if offset == pos:
+            pos += length
+        return name, pos
+
+    # records
+
+    def records(self) -> Iterator[tuple[int, int, int]]:
+        """Yields (offset, record id, filetime) for every record in the chunk."""
+        pos = CHUNK_RECORDS_OFFSET
+        end = min(self.free_space_offset, len(self.data))
+        while pos + 24 <= end and self.data[pos:pos + 4] == RECORD_MAGIC:
+            size, record_id, filetime = struct.unpack_from("<IQQ", self.data, pos + 4)
+            if size < 28 or pos + size > len(self.data):
+                break
+            yield pos, record_id, filetime
+            pos += size
+
+    def record_root(self, offset: int) -> Optional[_Element]:
+        """Decodes the binary XML of the record at offset into an element tree."""
+        pos = offset + 24
+        if self.data[pos] == TOKEN_FRAGMENT_HEADER:
+            pos += 4
+        root, _ = self._fragment(pos)
+        if root is not None and self.data[pos] & 0x0f == TOKEN_OPEN_START_ELEMENT:
+            # XML written out without a template still holds attribute values as token lists
+            root = _instantiate(root, [])
+        return root
+
+    # binary XML
+
+    def _fragment(self, pos: int) -> tuple[Optional[_Element], int]:
+        """Parses a fragment: header followed by a template instance or element."""
+        if self.data[pos] == TOKEN_FRAGMENT_HEADER:
+            pos += 4
+        token = self.data[pos] & 0x0f
+        if token == TOKEN_TEMPLATE_INSTANCE:
+            return self._template_instance(pos)
+        if token == TOKEN_OPEN_START_ELEMENT:
+            return self._element(pos)
+        return None, pos
+
+    def _template_instance(self, pos: int) -> tuple[_Element, int]:
+        token_pos = pos
+        pos += 6  # token, unknown byte, template id
+        template_offset = self._u32(pos)
+        pos += 4
+        if template_offset > token_pos:
+            # the definition is stored inline the first time it's used
+            pos += 24 + self._u32(pos + 20)
+        template = self._template(template_offset)
+
+        count = self._u32(pos)
+        pos += 4
+        descriptors = [struct.unpack_from("<HB", self.data, pos + i * 4) for i in range(count)]
+        pos += count * 4
+
+        values = []
+        for size, value_type in descriptors:
+            values.append(self._value(pos, size, value_type))
+            pos += size
+
+        return _instantiate(template, values), pos
+
+    def _template(self, offset: int) -> _Element:
+        template = self._templates.get(offset)
+        if template is None:
+            template, _ = self._fragment(offset + 24)
+            self._templates[offset] = template
+        return template
+
+    def _element(self, pos: int) -> tuple[_Element, int]:
+        has_attributes = self.data[pos] & 0x40
+        pos += 7  # token, dependency id, data size
+        name, pos = self._name(pos)
+
+        attrs = []
+        if has_attributes:
+            pos += 4  # attribute list size
+            while self.data[pos] & 0x0f == TOKEN_ATTRIBUTE:
+                attr_name, pos = self._name(pos + 1)
+                parts, pos = self._content(pos)
+                attrs.append((attr_name, parts))
+
+        children = []
+        token = self.data[pos] & 0x0f
+        pos += 1
+        if token == TOKEN_CLOSE_START_ELEMENT:
+            while True:
+                token = self.data[pos] & 0x0f
+                if token == TOKEN_END_ELEMENT:
+                    pos += 1
+                    break
+                if token == TOKEN_OPEN_START_ELEMENT:
+                    child, pos = self._element(pos)
+                    children.append(child)
+                elif token in (TOKEN_PI_TARGET, TOKEN_PI_DATA):
+                    pos = self._skip_pi(pos)
+                elif token in _CONTENT_TOKENS:
+                    parts, pos = self._content(pos)
+                    children.extend(parts)
+                else:
+                    raise EvtxFormatError(f"Unexpected binary XML token 0x{token:02x}")
+        elif token != TOKEN_CLOSE_EMPTY_ELEMENT:
+            raise EvtxFormatError(f"Unexpected binary XML token 0x{token:02x}")
+
+        return _Element(name, attrs, children), pos
+
+    def _content(self, pos: int) -> tuple[list, int]:
+        """Parses consecutive value, reference and substitution tokens."""
+        parts = []
+        while self.data[pos] & 0x0f in _CONTENT_TOKENS:
+            token = self.data[pos] & 0x0f
+            if token == TOKEN_VALUE:
+                length = self._u16(pos + 2)
+                start = pos + 4
+                parts.append(self.data[start:start + length * 2].decode("utf-16-le"))
+                pos = start + length * 2
+            elif token == TOKEN_CDATA:
+                length = self._u16(pos + 1)
+                start = pos + 3
+                parts.append(self.data[start:start + length * 2].decode("utf-16-le"))
+                pos = start + length * 2
+            elif token == TOKEN_CHAR_REF:
+                parts.append(chr(self._u16(pos + 1)))
+                pos += 3
+            elif token == TOKEN_ENTITY_REF:
+                name, pos = self._name(pos + 1)
+                parts.append({"amp": "&", "lt": "<", "gt": ">", "quot": '"',
+                              "apos": "'"}.get(name, f"&{name};"))
+            else:
+                parts.append(_Substitution(self._u16(pos + 1),
+                                           token == TOKEN_OPTIONAL_SUBSTITUTION))
+                pos += 4
+        return parts, pos
+
+    def _skip_pi(self, pos: int) -> int:
+        if self.data[pos] & 0x0f == TOKEN_PI_TARGET:
+            _, pos = self._name(pos + 1)
+        if self.data[pos] & 0x0f == TOKEN_PI_DATA:
+            pos += 3 + self._u16(pos + 1) * 2
+        return pos
+
+    def _value(self, pos: int, size: int, value_type: int):
+        """Decodes one substitution value."""
+        raw = self.data[pos:pos + size]
+        if value_type == 0x00 or size == 0:
+            return None
+        if value_type == 0x01:
+            return raw.decode("utf-16-le", errors="replace").rstrip("\x00")
+        if value_type == 0x02:
+            return raw.decode("latin-1").rstrip("\x00")
+        if value_type in _STRUCT_TYPES:
+            return struct.unpack_from(_STRUCT_TYPES[value_type], raw)[0]
+        if value_type == 0x0d:
+            return bool(struct.unpack_from("<I", raw)[0])
+        if value_type == 0x0f:
+            return "{" + str(uuid.UUID(bytes_le=bytes(raw))).upper() + "}"
+        if value_type == 0x10:
+            return hex(int.from_bytes(raw, "little"))
+        if value_type == 0x11:
+            return _filetime_to_datetime(struct.unpack_from("<Q", raw)[0])
+        if value_type == 0x12:
+            year, month, _, day, hour, minute, second, ms = struct.unpack_from("<8H", raw)
+            return datetime(year, month, day, hour, minute, second, ms * 1000,
+                            tzinfo=timezone.utc)
+        if value_type == 0x13:
+            return _decode_sid(raw)
+        if value_type == 0x14:
+            return f"0x{struct.unpack_from('<I', raw)[0]:08x}"
+        if value_type == 0x15:
+            return f"0x{struct.unpack_from('<Q', raw)[0]:016x}"
+        if value_type == 0x21:
+            root, _ = self._fragment(pos)
+            return root
+        if value_type == 0x81:
+            return [s for s in raw.decode("utf-16-le", errors="replace").split("\x00") if s]
+        if value_type & 0x80 and (value_type & 0x7f) in _STRUCT_TYPES:
+            fmt = _STRUCT_TYPES[value_type & 0x7f]
+            width = struct.calcsize(fmt)
+            return [struct.unpack_from(fmt, raw, i)[0] for i in range(0, size - width + 1, width)]
+        return raw.hex()
+
+
+def _instantiate(node: _Element, values: list) -> _Element:
+    """Fills a template's substitutions with one record's values."""
+    attrs = []
+    for name, parts in node.attrs:
+        resolved = [_resolve(part, values) for part in parts]
+        if all(value is None for value in resolved):
+            continue  # optional substitution without a value drops the attribute
+        attrs.append((name, "".join(_value_to_text(value) for value in resolved)))
+
+    children = []
+    for child in node.children:
+        if isinstance(child, _Element):
+            children.append(_instantiate(child, values))
+        else:
+            value = _resolve(child, values)
+            if value is not None:
+                children.append(value)
+
+    return _Element(node.name, attrs, children)
+
+
+def _resolve(part, values: list):
+    if isinstance(part, _Substitution):
+        return values[part.index] if part.index < len(values) else None
+    return part
+
+
+def _format_data(element: _Element) -> str:
+    """Flattens EventData/UserData into 'Name: value' lines."""
+    lines = []
+    for child in element.elements():
+        name = child.attr("Name")
+        if child.elements():
+            for nested in child.elements():
+                lines.append(f"{nested.attr('Name') or nested.name}: {_text_of(nested)}")
+            continue
+        value = _text_of(child)
+        lines.append(f"{name}: {value}" if name else value)
+    # text directly inside EventData without Data elements
+    if not lines and element.text():
+        lines.append(element.text())
+    return "\n".join(line for line in lines if line)
+
+
+def _text_of(element: _Element) -> str:
+    nested = [child for child in element.children if isinstance(child, _Element)]
+    if nested:
+        return "; ".join(_format_data(child) or _text_of(child) for child in nested)
+    return element.text()
+
+
+def _build_record(root: _Element, record_id: int, filetime: int) -> Optional[dict]:
+    system = root.find("System")
+    if system is None:
+        return None
+
+    provider = system.find("Provider")
+    event_id = system.find("EventID")
+    level = system.find("Level")
+
+    level_value = int(level.text() or 0) if level is not None else 0
+
+    message_parts = []
+    for section in ("EventData", "UserData"):
+        element = root.find(section)
+        if element is not None:
+            message_parts.append(_format_data(element))
+
+    created = _filetime_to_datetime(filetime).astimezone()
+
+    return {
+        "TimeCreated": created.strftime(DATETIME_FORMAT),
+        "Id": int(event_id.text() or 0) & 0xffff if event_id is not None else 0,
+        "Level": level_value,
+        "LevelDisplayName": LEVEL_NAMES.get(level_value, str(level_value)),
+        "ProviderName": (provider.attr("Name") or provider.attr("EventSourceName") or "")
+        if provider is not None else "",
+        "RecordId": record_id,
+        "Message": "\n".join(part for part in message_parts if part),
+    }
+
+
+def _to_filetime(value: Optional[str]) -> Optional[int]:
+    """Converts a MM/DD/YYYY HH:MM:SS AM/PM local time to a FILETIME."""
+    if not value:
+        return None
+    try:
+        local = datetime.strptime(value, DATETIME_FORMAT).astimezone()
+    except ValueError:
+        raise ValueError(f"Invalid time format: {value}. Use MM/DD/YYYY HH:MM:SS AM/PM.")
+    return int((local - _FILETIME_EPOCH).total_seconds() * 10_000_000)
+
+
+def iter_evtx_records(path: str,
+                      start_time: Optional[str] = None,
+                      end_time: Optional[str] = None,
+                      max_events: Optional[int] = None,
+                      level: Optional[int] = None,
+                      provider_name: Optional[str] = None,
+                      event_ids: Optional[list[int]] = None,
+                      newest_first: bool = True) -> Iterator[dict]:
+    """
+    Reads events from an exported .evtx file without PowerShell.
+
+    The file is memory-mapped and walked chunk by chunk. Filters are applied
+    in-process; the time filter is checked against each record header before
+    its binary XML is decoded. Messages are built from EventData/UserData,
+    since provider message tables aren't available offline.
+
+    Args:
+        path (str): Path to the .evtx file
+        start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+        end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+        max_events (Optional[int]): Maximum number of events to yield
+        level (Optional[int]): Event level (1-5)
+        provider_name (Optional[str]): Provider name, matched case-insensitively
+        event_ids (Optional[list[int]]): List of specific event IDs
+        newest_first (bool): Yield newest events first, like Get-WinEvent
+
+    Yields:
+        dict: Records with the same keys as fetch_event_records.
+
+    Raises:
+        EvtxFormatError: If the file is not an .evtx log.
+    """
+    start_ft = _to_filetime(start_time)
+    end_ft = _to_filetime(end_time)
+    provider_filter = provider_name.lower() if provider_name else None
+    id_filter = set(event_ids) if event_ids else None
+
+    yielded = 0
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:8] != FILE_MAGIC:
+                raise EvtxFormatError(f"{path} is not an .evtx file")
+
+            # chunks form a ring buffer, so order them by their first record id
+            chunk_offsets = []
+            for offset in range(FILE_HEADER_SIZE, len(mm) - CHUNK_SIZE + 1, CHUNK_SIZE):
+                if mm[offset:offset + 8] == CHUNK_MAGIC:
+                    first_id = struct.unpack_from("<Q", mm, offset + 24)[0]
+                    chunk_offsets.append((first_id, offset))
+            chunk_offsets.sort(reverse=newest_first)
+
+            for _, offset in chunk_offsets:
+                chunk = _Chunk(mm[offset:offset + CHUNK_SIZE])
+                headers = list(chunk.records())
+                if newest_first:
+                    headers.reverse()
+
+                for record_offset, record_id, filetime in headers:
+                    if start_ft is not None and filetime < start_ft:
+                        continue
+                    if end_ft is not None and filetime > end_ft:
+                        continue
+
+                    try:
+                        root = chunk.record_root(record_offset)
+                    except (EvtxFormatError, struct.error, IndexError, UnicodeDecodeError):
+                        continue  # skip corrupt records rather than the whole file
+                    if root is None:
+                        continue
+                    record = _build_record(root, record_id, filetime)
+                    if record is None:
+                        continue
+
+                    if level is not None and record["Level"] != level:
+                        continue
+                    if provider_filter and record["ProviderName"].lower() != provider_filter:
+                        continue
+                    if id_filter and record["Id"] not in id_filter:
+                        continue
+
+                    yield record
+                    yielded += 1
+                    if max_events is not None and yielded >= max_events:
+                        return
+
+
+def read_evtx_records(path: str, **filters) -> list[dict]:
+    """
+    Reads every matching event from an .evtx file into a list.
+
+    Args:
+        path (str): Path to the .evtx file
+        **filters: Any keyword accepted by iter_evtx_records.
+
+    Returns:
+        list[dict]: Matching event records.
+    """
+    return list(iter_evtx_records(path, **filters))
@@ -1,10 +1,21 @@
 import json
 import csv
+import queue
 import re
 import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import chain, islice
+from typing import Iterable, Optional
 from colorama import init, Fore, Style
 
+from utils.columnar import ROW_GROUP_SIZE, ColumnarFileWriter, arrow_schema, records_to_batch, write_table_frame
+from utils.compression import open_text, split_compression
+from utils.metrics import count, stage
+from utils.parse_logs import STRUCTURED_FIELDS
+
 # Initialize colorama for colored output
 init(autoreset=True)
 
@@ -45,158 +56,764 @@ def normalize_filename(filename: str, extension: str) -> str:
 
     return filename
 
+# helper so record objects (e.g. Event) serialize like the dicts they mirror
 
-# csv file export function
-def export_to_csv(logs: list[dict], filename: str = None):
+
+def json_default(value):
     """
-    Exports parsed logs to a CSV file.
+    Fallback for json.dump: converts record objects with to_dict(), else str().
 
     Args:
-        logs (list[dict]): List of parsed log dictionaries.
-        filename (str): Optional filename for the CSV file. If None, uses timestamp-based name.
+        value: An object json can't serialize on its own.
+
+    Returns:
+        A JSON-serializable value.
+    """
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return str(value)
+
+# helper to check an iterable of logs for emptiness without consuming it
+
+
+def peek_logs(logs: Iterable[dict]) -> tuple[Optional[dict], Iterable[dict]]:
+    """
+    Returns the first log and an iterable that still yields every log.
+
+    Lists are returned unchanged; generators are re-chained so the first
+    record is not lost.
+
+    Args:
+        logs (Iterable[dict]): A list or iterator of parsed log dictionaries.
+
+    Returns:
+        tuple: (first log or None if empty, iterable of all logs)
+    """
+    if isinstance(logs, list):
+        return (logs[0] if logs else None), logs
+
+    iterator = iter(logs or ())
+    first = next(iterator, None)
+    if first is None:
+        return None, iterator
+    return first, chain([first], iterator)
+
+
+# buffer size for export files; large pulls are written in big blocks
+BUFFER_SIZE = 1 << 20
+
+# how many logs a writer thread receives at a time in export_many
+BATCH_SIZE = 1000
+
+# writer threads export_many uses when writing several files
+EXPORT_WORKERS = 4
+
+
+# writer classes: one per export format, each fed one log at a time
+
+
+class LogWriter:
+    """
+    Base class for export writers.
+
+    A writer opens its file, receives logs one at a time through write() and
+    finishes the file in close(), so several writers can share one pass over
+    the logs (see export_many). write_many() flushes after every BATCH_SIZE
+    logs, so a long export can be read back up to the last batch while it is
+    still running. Paths ending in .gz or .zst are compressed.
+
+    Args:
+        path (str): Output file path.
+        append (bool): Add to an existing file instead of replacing it, where
+            the format allows it.
+    """
+    label = ""
+    extension = ""
+    newline = None  # universal newlines unless a format needs otherwise
+    compressible = True  # accepts a .gz/.zst suffix
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.append = append
+        self.count = 0
+        self.file = None
+
+    def open(self):
+        self.file = open_text(self.path, 'a' if self.append else 'w', encoding='utf-8',
+                              newline=self.newline, buffering=BUFFER_SIZE)
+
+    def write(self, log: dict):
+        raise NotImplementedError
+
+    def write_many(self, logs: Iterable[dict]):
+        iterator = iter(logs)
+        while True:
+            batch = list(islice(iterator, BATCH_SIZE))
+            if not batch:
+                return
+            for log in batch:
+                self.write(log)
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvWriter(LogWriter):
+    """
+    Writes logs as CSV rows.
+
+    A CSV header can't grow once rows follow it, so fields that aren't
+    columns are left out; their names are collected in dropped so the
+    caller can report them.
+
+    Args:
+        path (str): Output file path.
+        fieldnames (list[str]): Column names; fields not listed are left out.
+        append (bool): Add rows to an existing file, reusing its header.
+    """
+    label = "CSV"
+    extension = "csv"
+    newline = ''
+
+    def __init__(self, path: str, fieldnames: list[str], append: bool = False):
+        super().__init__(path, append)
+        self.fieldnames = fieldnames
+        self.writer = None
+        self.dropped = set()
+
+    def open(self):
+        # appending keeps the columns of the existing file
+        existing_header = None
+        if self.append and os.path.exists(self.path):
+            with open_text(self.path, newline='', encoding='utf-8') as f:
+                existing_header = next(csv.reader(f), None)
+            if existing_header:
+                self.fieldnames = existing_header
+        self.append = bool(existing_header)
+
+        super().open()
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, extrasaction='ignore')
+        self._columns = set(self.fieldnames)
+        if not existing_header:
+            self.writer.writeheader()
+
+    def write(self, log: dict):
+        if not self._columns.issuperset(log.keys()):
+            self.dropped.update(log.keys() - self._columns)
+        self.writer.writerow(log)
+        self.count += 1
+
+
+class JsonWriter(LogWriter):
+    """
+    Writes logs as one indented JSON array, element by element.
+
+    The output matches json.dump(logs, indent=2) without holding the list.
+    """
+    label = "JSON"
+    extension = "json"
+
+    def open(self):
+        self.append = False  # a JSON array can't be extended in place
+        super().open()
+        self.encoder = json.JSONEncoder(indent=2, ensure_ascii=False, default=json_default)
+        self.file.write("[")
+
+    def write(self, log: dict):
+        text = self.encoder.encode(log)
+        self.file.write(",\n  " if self.count else "\n  ")
+        self.file.write(text.replace("\n", "\n  "))
+        self.count += 1
+
+    def write_many(self, logs: Iterable[dict]):
+        # encoding a batch as one list is much faster than element by element
+        iterator = iter(logs)
+        while True:
+            batch = list(islice(iterator, BATCH_SIZE))
+            if not batch:
+                return
+            text = self.encoder.encode(batch)  # "[\n  {...},\n  {...}\n]"
+            self.file.write(",\n  " if self.count else "\n  ")
+            self.file.write(text[4:-2])
+            self.count += len(batch)
+            self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.write("\n]" if self.count else "]")
+        super().close()
+
+
+class JsonlWriter(LogWriter):
+    """Writes logs as JSON Lines, one object per line."""
+    label = "JSONL"
+    extension = "jsonl"
+
+    def open(self):
+        super().open()
+        self.encoder = json.JSONEncoder(ensure_ascii=False, default=json_default)
+
+    def write(self, log: dict):
+        self.file.write(self.encoder.encode(log))
+        self.file.write("\n")
+        self.count += 1
+
+
+class TxtWriter(LogWriter):
+    """Writes logs as numbered 'key: value' blocks."""
+    label = "TXT"
+    extension = "txt"
+
+    def open(self):
+        self.append = False
+        super().open()
+
+    def write(self, log: dict):
+        self.count += 1
+        f = self.file
+        f.write(f"--- Log Entry #{self.count} ---\n")
+        for key, value in log.items():
+            f.write(f"{key}: {value}\n")
+        f.write("\n")  # blank line between logs
+
+
+class MarkdownWriter(LogWriter):
+    """
+    Writes a Markdown report: summary header, statistics, optional GPT summary, then every log.
+
+    The header needs the total, time range and providers, which are only
+    known once every log has been seen, so entries are written to a spooled
+    buffer and the report is assembled in close().
+
+    Args:
+        path (str): Output file path.
+        gpt_summary (Optional[str]): GPT-generated summary to include.
+        stats (bool): Include level, provider and event counts, the event rate and bursts.
+    """
+    label = "Markdown"
+    extension = "md"
+
+    def __init__(self, path: str, gpt_summary: Optional[str] = None, stats: bool = True):
+        super().__init__(path)
+        self.gpt_summary = gpt_summary
+        self.stats = stats
+        self.columns = {}  # column -> values, for the statistics
+        self.body = None
+        self.first_time = None
+        self.last_time = None
+        self.providers = {}  # insertion-ordered set
+
+    def open(self):
+        # entries stay in memory up to 8 MB, then spill to a temporary file
+        self.body = tempfile.SpooledTemporaryFile(max_size=8 << 20, mode='w+', encoding='utf-8')
+        if self.stats:
+            from utils.log_stats import STATS_COLUMNS  # numpy and pandas load only for Markdown reports
+            self.columns = {column: [] for column in STATS_COLUMNS}
+
+    def write(self, log: dict):
+        self.count += 1
+        time_created = log.get("TimeCreated")
+        if time_created is not None:
+            if self.first_time is None:
+                self.first_time = time_created
+            self.last_time = time_created
+        provider = log.get("ProviderName")
+        if provider is not None:
+            self.providers[provider] = None
+        for column, values in self.columns.items():
+            values.append(log.get(column))
+
+        fields = "".join([f"- **{key}**: {value}\n" for key, value in log.items()])
+        # divider between entries
+        self.body.write(f"## Log Entry #{self.count}\n\n{fields}\n---\n\n")
+
+    def close(self):
+        if self.body is None:
+            return
+        try:
+            super().open()
+            f = self.file
+            f.write("# 📝 Event Logs Report\n\n")
+            f.write(
+                f"**Exported:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+            # summary
+            f.write("## 📊 Log Summary\n\n")
+            f.write(f"- **Total Logs**: {self.count}\n")
+            if self.first_time is not None:
+                f.write(f"- **Time Range**: {self.first_time} ➡️ {self.last_time}\n")
+            if self.providers:
+                f.write(f"- **Providers**: {', '.join(str(p) for p in self.providers)}\n")
+
+            f.write("\n---\n\n")
+
+            # statistics
+            if self.columns and self.count:
+                from utils.log_stats import compute_log_stats, format_stats_markdown
+                f.write(format_stats_markdown(compute_log_stats(self.columns)))
+                f.write("\n---\n\n")
+
+            # GPT summary
+            if self.gpt_summary:
+                f.write("## 🤖 GPT Summary\n\n")
+                f.write(f"{self.gpt_summary}\n")
+
+            # log entries
+            f.write("\n---\n\n")
+            self.body.seek(0)
+            shutil.copyfileobj(self.body, f)
+        finally:
+            self.body.close()
+            self.body = None
+            super().close()
+
+
+class ColumnarWriter(LogWriter):
+    """
+    Base for typed columnar writers (requires pyarrow).
+
+    Logs are collected into row groups of row_group_size and converted to
+    Arrow batches with typed columns (see utils.columnar). The columns are
+    taken from the first row group; fields that only appear later are dropped.
+
+    Args:
+        path (str): Output file path.
+        row_group_size (int): Rows per row group / record batch.
+    """
+    compressible = False  # the formats compress internally
+
+    def __init__(self, path: str, row_group_size: int = ROW_GROUP_SIZE):
+        super().__init__(path)
+        self.row_group_size = row_group_size
+        self.rows = []
+        self.writer = None
+
+    def open(self):
+        pass  # the schema comes from the first row group
+
+    def write(self, log: dict):
+        self.rows.append(log)
+        self.count += 1
+        if len(self.rows) >= self.row_group_size:
+            self._write_rows()
+
+    def write_many(self, logs: Iterable[dict]):
+        for log in logs:
+            self.write(log)
+
+    def _write_rows(self):
+        if self.writer is None:
+            columns = set()
+            for log in self.rows:
+                columns.update(log.keys())
+            self.writer = ColumnarFileWriter(self.path, arrow_schema(columns))
+        if self.rows:
+            self.writer.write_batch(records_to_batch(self.rows, self.writer.schema))
+        self.rows = []
+
+    def close(self):
+        if self.writer is None and not self.rows:
+            return  # never opened
+        self._write_rows()
+        self.writer.close()
+        self.writer = None
+
+
+class ParquetWriter(ColumnarWriter):
+    """Writes logs to a zstd-compressed Parquet file, one row group per batch."""
+    label = "Parquet"
+    extension = "parquet"
+
+
+class ArrowWriter(ColumnarWriter):
+    """Writes logs to an Arrow IPC file that can be memory-mapped on reload."""
+    label = "Arrow"
+    extension = "arrow"
+
+
+# extension -> writer class
+WRITERS = {
+    ".csv": CsvWriter,
+    ".json": JsonWriter,
+    ".jsonl": JsonlWriter,
+    ".txt": TxtWriter,
+    ".md": MarkdownWriter,
+    ".parquet": ParquetWriter,
+    ".arrow": ArrowWriter,
+}
+
+# helper to pick CSV columns for any kind of logs
+
+
+def csv_fieldnames(logs: Iterable[dict], first: dict) -> list[str]:
+    """
+    Chooses CSV columns: a table's columns, every key of a list, or for a
+    stream the structured record fields plus the first log's keys.
+
+    Args:
+        logs (Iterable[dict]): The logs to be exported.
+        first (dict): The first log.
+
+    Returns:
+        list[str]: Sorted column names.
+    """
+    if getattr(logs, "columns", None):
+        # columnar tables already know their fields
+        return sorted(logs.columns)
+    if isinstance(logs, list):
+        # collect all unique fieldnames across all logs
+        all_fieldnames = set()
+        for log in logs:
+            all_fieldnames.update(log.keys())
+        return sorted(all_fieldnames)  # sort for consistent order
+    # streaming: a second pass isn't possible, so take every field a structured
+    # record can have; the first log adds tags such as LogName or Host. Fields
+    # that only appear later are left out and reported by the writer.
+    return sorted(set(STRUCTURED_FIELDS).union(first.keys()))
+
+
+# helper to check an export filename, with or without a compression suffix
+
+
+def export_format(filename: str) -> Optional[str]:
     """
-    if not logs:
+    Returns the export format of a filename, ignoring a .gz/.zst suffix.
+
+    Args:
+        filename (str): e.g. 'logs.csv' or 'logs.jsonl.gz'
+
+    Returns:
+        Optional[str]: The format extension (e.g. '.jsonl'), or None if unsupported.
+    """
+    base, suffix = split_compression(filename)
+    extension = os.path.splitext(base)[1].lower()
+    writer_class = WRITERS.get(extension)
+    if writer_class is None or (suffix and not writer_class.compressible):
+        return None
+    return extension
+
+
+def _make_writer(filename: str, logs, first: dict, gpt_summary: Optional[str] = None,
+                 append: bool = False, stats: bool = True) -> LogWriter:
+    base, suffix = split_compression(filename)
+    writer_class = WRITERS[export_format(filename)]
+    export_path = os.path.join(EXPORT_DIR, normalize_filename(base, writer_class.extension) + suffix)
+    if writer_class is CsvWriter:
+        return CsvWriter(export_path, csv_fieldnames(logs, first), append)
+    if writer_class is MarkdownWriter:
+        return MarkdownWriter(export_path, gpt_summary, stats)
+    if issubclass(writer_class, ColumnarWriter):
+        return writer_class(export_path)  # columnar files are always rewritten
+    return writer_class(export_path, append)
+
+
+def _export(logs: Iterable[dict], filename: str, extension: str,
+            gpt_summary: Optional[str] = None, append: bool = False, stats: bool = True):
+    first, logs = peek_logs(logs)
+    if first is None:
         print(f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}⚠️ No logs to export.")
         return
 
     # creates an export path
     ensure_export_dir()
-    safe_filename = normalize_filename(filename, "csv")
-    export_path = os.path.join(EXPORT_DIR, safe_filename)
-
-    # collect all unique fieldnames across all logs
-    all_fieldnames = set()
-    for log in logs:
-        all_fieldnames.update(log.keys())
-    fieldnames = sorted(all_fieldnames)  # sort for consistent order
+    base, suffix = split_compression(filename)
+    writer = _make_writer(normalize_filename(base, extension.lstrip(".")) + suffix, logs, first,
+                          gpt_summary, append, stats)
 
     try:
-        with open(export_path, mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(logs)
+        with writer:
+            writer.write_many(logs)
 
-        print(f"\n{Fore.GREEN}✅ Export complete. {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}📁 File saved to: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(export_path)}")
-        return export_path
+        _report_dropped(writer)
+        print(f"\n{Fore.GREEN}✅ Export complete. {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}📁 File saved to: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(writer.path)}")
+        return writer.path
     except Exception as e:
-        print(f"{Fore.RED + Style.BRIGHT}❌ Error exporting logs to CSV: {str(e)}")
+        print(f"{Fore.RED + Style.BRIGHT}❌ Error exporting logs to {writer.label}: {str(e)}")
+
+
+# csv file export function
+def export_to_csv(logs: Iterable[dict], filename: str = None, append: bool = False):
+    """
+    Exports parsed logs to a CSV file.
+
+    Args:
+        logs (Iterable[dict]): List or iterator of parsed log dictionaries. Iterators
+            are written as they are consumed, using the first log's fields as columns.
+        filename (str): Optional filename for the CSV file. If None, uses timestamp-based name.
+            Add .gz or .zst (e.g. 'logs.csv.gz') to compress the file.
+        append (bool): Add rows to an existing file, reusing its header.
+    """
+    return _export(logs, filename or "", ".csv", append=append)
 
 
 # json file export function
-def export_to_json(logs: list[dict], filename: str = None):
+def export_to_json(logs: Iterable[dict], filename: str = None):
     """
     Exports parsed logs to a JSON file.
 
     Args:
-        logs (list[dict]): List of parsed log dictionaries.
+        logs (Iterable[dict]): List or iterator of parsed log dictionaries.
         filename (str): Optional filename for the JSON file. If None, uses timestamp-based name.
+            Add .gz or .zst (e.g. 'logs.csv.gz') to compress the file.
     """
-    if not logs:
-        print(f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}⚠️ No logs to export.")
-        return
+    return _export(logs, filename or "", ".json")
 
-    # creates an export path
-    ensure_export_dir()
-    safe_filename = normalize_filename(filename, "json")
-    export_path = os.path.join(EXPORT_DIR, safe_filename)
 
-    try:
-        with open(export_path, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, indent=2, ensure_ascii=False)
+# json lines file export function
+def export_to_jsonl(logs: Iterable[dict], filename: str = None, append: bool = False):
+    """
+    Exports parsed logs to a JSON Lines file, one log object per line.
 
-        print(f"\n{Fore.GREEN}✅ Export complete. {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}📁 File saved to: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(export_path)}")
-        return export_path
-    except Exception as e:
-        print(f"{Fore.RED + Style.BRIGHT}❌ Error exporting logs to JSON: {str(e)}")
+    Args:
+        logs (Iterable[dict]): List or iterator of parsed log dictionaries.
+        filename (str): Optional filename for the JSONL file. If None, uses timestamp-based name.
+            Add .gz or .zst (e.g. 'logs.csv.gz') to compress the file.
+        append (bool): Add lines to an existing file instead of replacing it.
+    """
+    return _export(logs, filename or "", ".jsonl", append=append)
 
 
 # txt file export function
-def export_to_txt(logs: list[dict], filename: str = None):
+def export_to_txt(logs: Iterable[dict], filename: str = None):
     """
     Exports parsed logs to a text file.
 
     Args:
-        logs (list[dict]): List of parsed log dictionaries.
+        logs (Iterable[dict]): List or iterator of parsed log dictionaries.
         filename (str): Optional filename for the text file. If None, uses timestamp-based name.
+            Add .gz or .zst (e.g. 'logs.csv.gz') to compress the file.
     """
-    if not logs:
-        print(f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}⚠️ No logs to export.")
-        return
-
-    # creates an export path
-    ensure_export_dir()
-    safe_filename = normalize_filename(filename, "txt")
-    export_path = os.path.join(EXPORT_DIR, safe_filename)
-
-    try:
-        with open(export_path, 'w', encoding='utf-8') as f:
-            for i, log in enumerate(logs, 1):
-                f.write(f"--- Log Entry #{i} ---\n")
-                for key, value in log.items():
-                    f.write(f"{key}: {value}\n")
-                f.write("\n")  # blank line between logs
-
-        print(f"\n{Fore.GREEN}✅ Export complete. {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}📁 File saved to: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(export_path)}")
-        return export_path
-    except Exception as e:
-        print(f"{Fore.RED + Style.BRIGHT}❌ Error exporting logs to TXT: {str(e)}")
+    return _export(logs, filename or "", ".txt")
 
 
 # .md file export function
-def export_to_md(logs: list[dict], filename: str = None, gpt_summary: str = None):
+def export_to_md(logs: Iterable[dict], filename: str = None, gpt_summary: str = None, stats: bool = True):
     """
     Exports parsed logs to a Markdown file.
 
     Args:
-        logs (list[dict]): List of parsed log dictionaries.
+        logs (Iterable[dict]): List or iterator of parsed log dictionaries.
         filename (str): Optional filename for the Markdown file. If None, uses timestamp-based name.
+            Add .gz or .zst (e.g. 'logs.csv.gz') to compress the file.
         gpt_summary (str): Optional GPT-generated summary to include.
+        stats (bool): Include a statistics section (counts, event rate and bursts).
     """
-    if not logs:
+    return _export(logs, filename or "", ".md", gpt_summary=gpt_summary, stats=stats)
+
+
+# columnar file export functions
+def export_to_parquet(logs: Iterable[dict], filename: str = None, row_group_size: int = ROW_GROUP_SIZE):
+    """
+    Exports parsed logs to a Parquet file with typed columns (requires pyarrow).
+
+    Args:
+        logs (Iterable[dict]): List, iterator or EventTable of parsed logs.
+        filename (str): Optional filename for the Parquet file. If None, uses timestamp-based name.
+        row_group_size (int): Rows per row group.
+    """
+    return _export_columnar(logs, filename or "", ParquetWriter, row_group_size)
+
+
+def export_to_arrow(logs: Iterable[dict], filename: str = None, row_group_size: int = ROW_GROUP_SIZE):
+    """
+    Exports parsed logs to an Arrow IPC file with typed columns (requires pyarrow).
+
+    Args:
+        logs (Iterable[dict]): List, iterator or EventTable of parsed logs.
+        filename (str): Optional filename for the Arrow file. If None, uses timestamp-based name.
+        row_group_size (int): Rows per record batch.
+    """
+    return _export_columnar(logs, filename or "", ArrowWriter, row_group_size)
+
+
+def _export_columnar(logs, filename: str, writer_class, row_group_size: int):
+    frame = getattr(logs, "frame", None)
+    if frame is None:
+        first, logs = peek_logs(logs)
+        if first is None:
+            print(f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}⚠️ No logs to export.")
+            return
+    elif frame.empty:
         print(f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}⚠️ No logs to export.")
         return
 
-    # creates an export path
     ensure_export_dir()
-    safe_filename = normalize_filename(filename, "md")
-    export_path = os.path.join(EXPORT_DIR, safe_filename)
+    export_path = os.path.join(EXPORT_DIR, normalize_filename(filename, writer_class.extension))
 
     try:
-        with open(export_path, 'w', encoding='utf-8') as f:
-            f.write("# 📝 Event Logs Report\n\n")
-            f.write(
-                f"**Exported:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        if frame is not None:
+            # an EventTable's columns are already typed; convert them in one step
+            write_table_frame(frame, export_path, row_group_size)
+        else:
+            writer = writer_class(export_path, row_group_size)
+            with writer:
+                writer.write_many(logs)
 
-            # summary
-            f.write("## 📊 Log Summary\n\n")
-            f.write(f"- **Total Logs**: {len(logs)}\n")
-
-            # optional: find range and providers
-            times = [log.get("TimeCreated")
-                     for log in logs if "TimeCreated" in log]
-            providers = {log.get("ProviderName")
-                         for log in logs if "ProviderName" in log}
-            if times:
-                f.write(f"- **Time Range**: {times[0]} ➡️ {times[-1]}\n")
-            if providers:
-                f.write(f"- **Providers**: {', '.join(providers)}\n")
+        print(f"\n{Fore.GREEN}✅ Export complete. {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}📁 File saved to: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(export_path)}")
+        return export_path
+    except Exception as e:
+        print(f"{Fore.RED + Style.BRIGHT}❌ Error exporting logs to {writer_class.label}: {str(e)}")
 
-            f.write("\n---\n\n")
 
-            # GPT summary
-            if gpt_summary:
-                f.write("## 🤖 GPT Summary\n\n")
-                f.write(f"{gpt_summary}\n")
+# multi-format export function
 
-            # log entries
-            f.write("\n---\n\n")
-            for i, log in enumerate(logs, 1):
-                f.write(f"## Log Entry #{i}\n\n")
-                for key, value in log.items():
-                    f.write(f"- **{key}**: {value}\n")
-                f.write("\n---\n\n")  # divider between entries
 
-        print(f"\n{Fore.GREEN}✅ Export complete. {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}📁 File saved to: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(export_path)}")
-        return export_path
+def export_many(logs: Iterable[dict],
+                filenames: list[str],
+                gpt_summary: Optional[str] = None,
+                max_workers: int = EXPORT_WORKERS,
+                stats: bool = True,
+                append: bool = False) -> dict[str, Optional[str]]:
+    """
+    Exports logs to several files in one pass over the logs.
+
+    Each filename's extension picks its writer. Logs are read once and handed
+    to every writer; with several files, the writers run on up to max_workers
+    threads and receive the logs in batches, so slow formats (compression,
+    Markdown tables) don't hold up the others. Every file holds the same bytes
+    either way.
+    A writer that fails is reported and dropped without stopping the rest.
+    If reading the logs fails part way (e.g. PowerShell printed something
+    that isn't JSON), every file is closed and reported as incomplete;
+    nothing is raised.
+
+    Args:
+        logs (Iterable[dict]): List, iterator or EventTable of parsed logs.
+        filenames (list[str]): Output filenames ending in .csv, .json, .jsonl, .txt or .md,
+            optionally followed by .gz or .zst to compress the file, or in .parquet or .arrow.
+        gpt_summary (Optional[str]): GPT-generated summary for Markdown reports.
+        max_workers (int): Writer threads for several files; 0 writes everything
+            on the calling thread.
+        stats (bool): Add a statistics section to Markdown reports.
+        append (bool): Add to existing .csv, .jsonl and .txt files instead of
+            replacing them; other formats are always rewritten.
+
+    Returns:
+        dict[str, Optional[str]]: Export path per filename, or None where it failed.
+    """
+    results = {filename: None for filename in filenames}
+    try:
+        first, logs = peek_logs(logs)
     except Exception as e:
-        print(f"{Fore.RED + Style.BRIGHT}❌ Error exporting logs to Markdown: {str(e)}")
+        print(f"{Fore.RED + Style.BRIGHT}❌ Error reading logs to export: {str(e)}")
+        return results
+    if first is None:
+        print(f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}⚠️ No logs to export.")
+        return results
+
+    with stage("export"):
+        ensure_export_dir()
+        writers = {}
+        for filename in filenames:
+            if export_format(filename) is None:
+                print(f"{Fore.RED + Style.BRIGHT}❌ Unsupported file format: {filename}")
+                continue
+            writer = _make_writer(filename, logs, first, gpt_summary, append, stats)
+            try:
+                writer.open()
+                writers[filename] = writer
+            except Exception as e:
+                print(f"{Fore.RED + Style.BRIGHT}❌ Error exporting logs to {writer.label}: {str(e)}")
+
+        try:
+            if max_workers and len(writers) > 1:
+                failed = _write_threaded(logs, writers, max_workers)
+            else:
+                failed = _write_serial(logs, writers)
+        except Exception as e:
+            # the logs stopped coming, so no file holds all of them
+            failed = {filename: f"incomplete after {writer.count} logs, reading them failed: {e}"
+                      for filename, writer in writers.items()}
+
+        for filename, writer in writers.items():
+            try:
+                writer.close()
+            except Exception as e:
+                failed.setdefault(filename, e)
+            if filename in failed:
+                print(f"{Fore.RED + Style.BRIGHT}❌ Error exporting logs to {writer.label}: {str(failed[filename])}")
+                continue
+            results[filename] = writer.path
+            _report_dropped(writer)
+            count("export", "files")
+            count("export", "rows", writer.count)
+            print(f"\n{Fore.GREEN}✅ Export complete. {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}📁 File saved to: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(writer.path)}")
+    return results
+
+
+def _report_dropped(writer: LogWriter):
+    dropped = getattr(writer, "dropped", None)
+    if dropped:
+        print(f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}⚠️ {writer.path} has no column for "
+              f"{', '.join(sorted(dropped))}; these fields first appeared after the header was "
+              "written and were left out. Export to .jsonl to keep them.")
+
+
+def _write_serial(logs: Iterable[dict], writers: dict) -> dict:
+    failed = {}
+    active = dict(writers)
+    iterator = iter(logs)
+    while active:
+        batch = list(islice(iterator, BATCH_SIZE))
+        if not batch:
+            break
+        for filename, writer in list(active.items()):
+            try:
+                writer.write_many(batch)
+            except Exception as e:
+                failed[filename] = e
+                del active[filename]
+    return failed
+
+
+def _write_threaded(logs: Iterable[dict], writers: dict, max_workers: int) -> dict:
+    failed = {}
+    # writers are split across the workers; each worker has one bounded queue,
+    # which keeps a fast reader from buffering the whole pull
+    names = list(writers)
+    workers = min(max_workers, len(names))
+    groups = [names[i::workers] for i in range(workers)]
+    queues = [queue.Queue(maxsize=8) for _ in groups]
+
+    def drain(group: list[str], batches: queue.Queue):
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            for filename in group:
+                if filename in failed:
+                    continue  # keep draining so the reader never blocks
+                try:
+                    writers[filename].write_many(batch)
+                except Exception as e:
+                    failed[filename] = e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for group, batches in zip(groups, queues):
+            pool.submit(drain, group, batches)
+        try:
+            batch = []
+            for log in logs:
+                batch.append(log)
+                if len(batch) >= BATCH_SIZE:
+                    for batches in queues:
+                        batches.put(batch)
+                    batch = []
+            if batch:
+                for batches in queues:
+                    batches.put(batch)
+        finally:
+            for batches in queues:
+                batches.put(None)
+    return failed
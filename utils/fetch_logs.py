@@ -1,55 +1,165 @@
 # utils/fetch_logs.py
+import heapq  # merge shards in timestamp order
 import subprocess  # allow running PowerShell commands
-from datetime import datetime  # date formatting
-from typing import Optional
-import time
+from concurrent.futures import ThreadPoolExecutor  # run shards concurrently
+from datetime import datetime, timedelta, timezone  # date formatting
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, Union
 from colorama import init, Fore, Style  # colored output for console
 
+from utils.metrics import count, stage
+from utils.parse_logs import DATETIME_FORMAT, iter_json_logs, parse_json_logs, record_timestamp
+from utils.powershell_session import PowerShellSessionError
+
 # Initialize colorama for colored output
 init(autoreset=True)
 
+# properties requested from Get-WinEvent in structured mode
+# TimeCreated is rendered in PowerShell so it matches DATETIME_FORMAT
+STRUCTURED_SELECT = (
+    "@{n='TimeCreated';e={$_.TimeCreated.ToString('MM/dd/yyyy hh:mm:ss tt', "
+    "[Globalization.CultureInfo]::InvariantCulture)}}, "
+    "Id, Level, LevelDisplayName, ProviderName, RecordId, Message"
+)
 
-def fetch_event_logs(log_type: str = "System",
-                     start_time: Optional[str] = None,
-                     end_time: Optional[str] = None,
-                     max_events: int = 100,
-                     level: Optional[int] = None,
-                     provider_name: Optional[str] = None,
-                     event_ids: Optional[list[int]] = None) -> str:
+# the same properties with TimeCreated in UTC, for hosts in other time zones (see utils.fleet)
+STRUCTURED_SELECT_UTC = STRUCTURED_SELECT.replace("$_.TimeCreated.ToString(",
+                                                  "$_.TimeCreated.ToUniversalTime().ToString(")
+
+# ranges longer than this are split into parallel windows by auto_windows
+SHARD_SPAN = timedelta(days=1)
+
+# most windows auto_windows splits a range into
+MAX_WINDOWS = 8
+
+# smallest max_events worth splitting; smaller pulls stop early as one query anyway
+MIN_SHARD_EVENTS = 1000
+
+
+def run_powershell(command: str) -> str:
     """
-    Fetches Windows Event Logs using PowerShell's Get-WinEvent.
+    Runs a PowerShell command and returns its stdout.
+
     Args:
-        log_type (str): The log name, e.g., 'System', 'Application'
-        start_time (str): Start time in MM/DD/YYYY format
-        end_time (str): End time in MM/DD/YYYY format
-        max_events (int): Maximum number of events to retrieve
-        level (Optional[int]): Event level (1-5), if specified, filters logs by level
-        provider_name (Optional[str]): Name of the event provider to filter logs
-        event_ids (Optional[list[int]]): List of specific event IDs to filter logs
+        command (str): The PowerShell command to run.
+
     Returns:
-        str: Raw event logs output from PowerShell
+        str: Standard output of the command.
+
+    Raises:
+        subprocess.CalledProcessError: If PowerShell exits with a non-zero code.
     """
-    print(Fore.GREEN + "\nFetching logs...\n\n")
-    time.sleep(1)  # pause for a moment to let the user read the message
+    result = subprocess.run(
+        ["powershell", "-NoProfile", "-Command",
+         "[Console]::OutputEncoding = [Text.Encoding]::UTF8; " + command],
+        capture_output=True,
+        encoding="utf-8",
+        errors="replace",
+        check=True
+    )
+    return result.stdout
 
-    # building the filter hashtable for PowerShell command
-    filter_parts = [f'LogName="{log_type}"']
+
+def stream_powershell(command: str) -> Iterator[str]:
+    """
+    Runs a PowerShell command and yields its stdout line by line while it runs.
+
+    The process is killed if the caller stops iterating early.
+
+    Args:
+        command (str): The PowerShell command to run.
+
+    Yields:
+        str: Lines of standard output.
+
+    Raises:
+        subprocess.CalledProcessError: If PowerShell exits with a non-zero code
+            without producing any output.
+    """
+    args = ["powershell", "-NoProfile", "-Command",
+            "[Console]::OutputEncoding = [Text.Encoding]::UTF8; " + command]
+    process = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1
+    )
+    produced = False
+    try:
+        for line in process.stdout:
+            produced = True
+            yield line
+        process.wait()
+        if process.returncode and not produced:
+            raise subprocess.CalledProcessError(process.returncode, args)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+def quote_powershell(value: str) -> str:
+    """
+    Quotes a value as a literal PowerShell string.
+
+    Single-quoted strings don't expand $variables or backtick escapes, so the
+    only character to escape is the single quote itself, by doubling it.
+
+    Args:
+        value (str): Any text, e.g. a provider name.
+
+    Returns:
+        str: The value in single quotes.
+    """
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def build_filter_string(log_type: str = "System",
+                        start_time: Optional[str] = None,
+                        end_time: Optional[str] = None,
+                        level: Optional[int] = None,
+                        provider_name: Optional[str] = None,
+                        event_ids: Optional[list[int]] = None,
+                        utc: bool = False) -> str:
+    """
+    Builds the body of the -FilterHashtable argument for Get-WinEvent.
+
+    Args:
+        log_type (str): The log name, e.g., 'System', 'Application'
+        start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+        end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+        level (Optional[int]): Event level (1-5)
+        provider_name (Optional[str]): Name of the event provider
+        event_ids (Optional[list[int]]): List of specific event IDs
+        utc (bool): Send the times as UTC, so a host in another time zone
+            reads them as the same instant rather than as its own local time.
+
+    Returns:
+        str: Filter hashtable entries joined with '; '
+
+    Raises:
+        ValueError: If a time or the level is invalid.
+    """
+    filter_parts = [f"LogName={quote_powershell(log_type)}"]
     if start_time:
         try:
             # Convert start_time to datetime object and format it
-            start_dt = datetime.strptime(start_time, "%m/%d/%Y %I:%M:%S %p")
-            filter_parts.append(f'StartTime="{start_dt.isoformat()}"')
+            start_dt = datetime.strptime(start_time, DATETIME_FORMAT)
+            filter_parts.append(f"StartTime={quote_powershell(_filter_time(start_dt, utc))}")
         except ValueError:
-            print("Invalid start time format. Use MM/DD/YYYY HH:MM:SS AM/PM.")
-            return ""
+            raise ValueError(
+                "Invalid start time format. Use MM/DD/YYYY HH:MM:SS AM/PM.")
     if end_time:
         try:
             # Convert end_time to datetime object and format it
-            end_dt = datetime.strptime(end_time, "%m/%d/%Y %I:%M:%S %p")
-            filter_parts.append(f'EndTime="{end_dt.isoformat()}"')
+            end_dt = datetime.strptime(end_time, DATETIME_FORMAT)
+            filter_parts.append(f"EndTime={quote_powershell(_filter_time(end_dt, utc))}")
         except ValueError:
-            print("Invalid end time format. Use MM/DD/YYYY HH:MM:SS AM/PM.")
-            return ""
+            raise ValueError(
+                "Invalid end time format. Use MM/DD/YYYY HH:MM:SS AM/PM.")
 
     # Level Mapping:
     # 1 = Critical, 2 = Error, 3 = Warning, 4 = Information, 5 = Verbose
@@ -60,8 +170,7 @@ def fetch_event_logs(log_type: str = "System",
         filter_parts.append(f'Level={level}')
 
     if provider_name:
-        provider_name = provider_name.replace('"', '\\"')
-        filter_parts.append(f'ProviderName="{provider_name}"')
+        filter_parts.append(f"ProviderName={quote_powershell(provider_name)}")
 
     if event_ids:
         if len(event_ids) == 1:
@@ -71,7 +180,82 @@ def fetch_event_logs(log_type: str = "System",
             filter_parts.append(f"Id=@({ids_string})")
 
     # Join filter parts into a single string
-    filter_string = "; ".join(filter_parts)
+    return "; ".join(filter_parts)
+
+
+def _filter_time(value: datetime, utc: bool) -> str:
+    # a trailing Z makes each host convert the instant to its own clock
+    if utc:
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return value.isoformat()
+
+
+def build_structured_command(log_type: str = "System",
+                             start_time: Optional[str] = None,
+                             end_time: Optional[str] = None,
+                             max_events: int = 100,
+                             level: Optional[int] = None,
+                             provider_name: Optional[str] = None,
+                             event_ids: Optional[list[int]] = None,
+                             utc: bool = False) -> str:
+    """
+    Builds the Get-WinEvent command that returns events as one compressed JSON array.
+
+    Args:
+        log_type (str): The log name, e.g., 'System', 'Application'
+        start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+        end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+        max_events (int): Maximum number of events to retrieve
+        level (Optional[int]): Event level (1-5)
+        provider_name (Optional[str]): Name of the event provider to filter logs
+        event_ids (Optional[list[int]]): List of specific event IDs to filter logs
+        utc (bool): Filter and report TimeCreated in UTC instead of the local
+            time of the machine running the command.
+
+    Returns:
+        str: The PowerShell command.
+
+    Raises:
+        ValueError: If a time or the level is invalid.
+    """
+    filter_string = build_filter_string(
+        log_type, start_time, end_time, level, provider_name, event_ids, utc=utc)
+    select = STRUCTURED_SELECT_UTC if utc else STRUCTURED_SELECT
+    return (
+        f"Get-WinEvent -FilterHashtable @{{{filter_string}}} "
+        f"-MaxEvents {max_events} | Select-Object {select} | ConvertTo-Json -Compress"
+    )
+
+
+def fetch_event_logs(log_type: str = "System",
+                     start_time: Optional[str] = None,
+                     end_time: Optional[str] = None,
+                     max_events: int = 100,
+                     level: Optional[int] = None,
+                     provider_name: Optional[str] = None,
+                     event_ids: Optional[list[int]] = None) -> str:
+    """
+    Fetches Windows Event Logs using PowerShell's Get-WinEvent.
+    Args:
+        log_type (str): The log name, e.g., 'System', 'Application'
+        start_time (str): Start time in MM/DD/YYYY format
+        end_time (str): End time in MM/DD/YYYY format
+        max_events (int): Maximum number of events to retrieve
+        level (Optional[int]): Event level (1-5), if specified, filters logs by level
+        provider_name (Optional[str]): Name of the event provider to filter logs
+        event_ids (Optional[list[int]]): List of specific event IDs to filter logs
+    Returns:
+        str: Raw event logs output from PowerShell
+    """
+    print(Fore.GREEN + "\nFetching logs...\n\n")
+
+    # building the filter hashtable for PowerShell command
+    try:
+        filter_string = build_filter_string(
+            log_type, start_time, end_time, level, provider_name, event_ids)
+    except ValueError as e:
+        print(e)
+        return ""
 
     # Build PowerShell command
     command = (
@@ -95,3 +279,275 @@ def fetch_event_logs(log_type: str = "System",
     except subprocess.CalledProcessError:
         details = f"{Fore.LIGHTWHITE_EX}log_type={log_type}, start_time={start_time}, end_time={end_time}, level={level}, provider_name={provider_name}, event_ids={event_ids}, max_events={max_events}"
         return f"\n{Fore.LIGHTWHITE_EX}No logs found matching the specified criteria:\n\n{details}\n\n"
+
+
+def fetch_event_records(log_type: str = "System",
+                        start_time: Optional[str] = None,
+                        end_time: Optional[str] = None,
+                        max_events: int = 100,
+                        level: Optional[int] = None,
+                        provider_name: Optional[str] = None,
+                        event_ids: Optional[list[int]] = None,
+                        runner: Optional[Callable[[str], str]] = None,
+                        store=None) -> list[dict]:
+    """
+    Fetches Windows Event Logs as structured records.
+
+    Asks PowerShell for ConvertTo-Json output and decodes it directly, so
+    there is no Format-List text to scrape and multi-line messages survive.
+    With a store, queries whose range it already holds are answered from it
+    without running PowerShell, and everything fetched is added to it.
+
+    Args:
+        log_type (str): The log name, e.g., 'System', 'Application'
+        start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+        end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+        max_events (int): Maximum number of events to retrieve
+        level (Optional[int]): Event level (1-5)
+        provider_name (Optional[str]): Name of the event provider to filter logs
+        event_ids (Optional[list[int]]): List of specific event IDs to filter logs
+        runner (Optional[Callable[[str], str]]): Takes a PowerShell command and
+            returns its stdout. Defaults to run_powershell; pass a stand-in to
+            replay captured output.
+        store (Optional[EventStore]): Local event index from utils.event_store.
+
+    Returns:
+        list[dict]: Event records, newest first. Empty if nothing matched.
+    """
+    runner = runner or run_powershell
+    filters = dict(log_type=log_type, start_time=start_time, end_time=end_time,
+                   level=level, provider_name=provider_name, event_ids=event_ids)
+
+    if store is not None:
+        with stage("fetch"):
+            stored = store.lookup(max_events=max_events, **filters)
+        if stored is not None:
+            count("fetch", "store_hits")
+            return stored
+
+    try:
+        command = build_structured_command(max_events=max_events, **filters)
+    except ValueError as e:
+        print(Fore.RED + Style.BRIGHT + f"❌ {e}")
+        return []
+
+    # events written while the fetch runs may be missed, so the store's coverage ends here
+    fetched_at = datetime.now()
+    try:
+        with stage("fetch"):
+            output = runner(command)
+    except subprocess.TimeoutExpired:
+        print(f"{Fore.RED + Style.BRIGHT}❌ Timed out fetching {log_type} logs.")
+        return []
+    except subprocess.CalledProcessError:
+        details = f"log_type={log_type}, start_time={start_time}, end_time={end_time}, level={level}, provider_name={provider_name}, event_ids={event_ids}, max_events={max_events}"
+        print(f"\n{Fore.LIGHTWHITE_EX}No logs found matching the specified criteria:\n\n{details}\n")
+        return []
+    except PowerShellSessionError as e:
+        print(f"{Fore.RED + Style.BRIGHT}❌ Could not fetch {log_type} logs: {e}")
+        return []
+
+    count("fetch", "bytes", len(output))
+    with stage("parse"):
+        records = parse_json_logs(output)
+    count("parse", "events", len(records))
+    if store is not None:
+        with stage("fetch"):
+            store.add(records, max_events=max_events, fetched_at=fetched_at, **filters)
+    return records
+
+
+def iter_event_records(log_type: str = "System",
+                       start_time: Optional[str] = None,
+                       end_time: Optional[str] = None,
+                       max_events: int = 100,
+                       level: Optional[int] = None,
+                       provider_name: Optional[str] = None,
+                       event_ids: Optional[list[int]] = None,
+                       stream_runner: Optional[Callable[[str], Iterable[str]]] = None) -> Iterator[dict]:
+    """
+    Streams Windows Event Logs as structured records while PowerShell runs.
+
+    Each event is written as its own compressed JSON line, so records can be
+    handed to an exporter before the fetch finishes and memory stays flat
+    regardless of max_events.
+
+    Args:
+        log_type (str): The log name, e.g., 'System', 'Application'
+        start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+        end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+        max_events (int): Maximum number of events to retrieve
+        level (Optional[int]): Event level (1-5)
+        provider_name (Optional[str]): Name of the event provider to filter logs
+        event_ids (Optional[list[int]]): List of specific event IDs to filter logs
+        stream_runner (Optional[Callable[[str], Iterable[str]]]): Takes a
+            PowerShell command and yields stdout lines. Defaults to
+            stream_powershell.
+
+    Yields:
+        dict: Event records, newest first.
+    """
+    stream_runner = stream_runner or stream_powershell
+
+    try:
+        filter_string = build_filter_string(
+            log_type, start_time, end_time, level, provider_name, event_ids)
+    except ValueError as e:
+        print(Fore.RED + Style.BRIGHT + f"❌ {e}")
+        return
+
+    command = (
+        f"Get-WinEvent -FilterHashtable @{{{filter_string}}} "
+        f"-MaxEvents {max_events} | Select-Object {STRUCTURED_SELECT} | "
+        "ForEach-Object { ConvertTo-Json -InputObject $_ -Compress }"
+    )
+
+    try:
+        yield from iter_json_logs(stream_runner(command))
+    except subprocess.CalledProcessError:
+        details = f"log_type={log_type}, start_time={start_time}, end_time={end_time}, level={level}, provider_name={provider_name}, event_ids={event_ids}, max_events={max_events}"
+        print(f"\n{Fore.LIGHTWHITE_EX}No logs found matching the specified criteria:\n\n{details}\n")
+
+
+def split_time_range(start_time: str, end_time: str, windows: int) -> list[tuple[str, str]]:
+    """
+    Splits [start_time, end_time] into consecutive windows.
+
+    Each window ends where the next one starts. Get-WinEvent compares
+    TimeCreated with sub-second precision and treats both bounds as
+    inclusive, so ending a window any earlier would drop the events inside
+    that last fraction of a second; instead an event exactly on a boundary
+    is returned by both windows and fetch_event_records_sharded drops the
+    repeat by RecordId.
+
+    Args:
+        start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+        end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+        windows (int): Number of windows to create
+
+    Returns:
+        list[tuple[str, str]]: (start, end) pairs in the same format, oldest first.
+    """
+    start_dt = datetime.strptime(start_time, DATETIME_FORMAT)
+    end_dt = datetime.strptime(end_time, DATETIME_FORMAT)
+    total_seconds = int((end_dt - start_dt).total_seconds())
+    windows = max(1, min(windows, total_seconds))
+    step = total_seconds / windows
+
+    ranges = []
+    for i in range(windows):
+        window_start = start_dt + timedelta(seconds=round(i * step))
+        window_end = start_dt + timedelta(seconds=round((i + 1) * step))
+        ranges.append((window_start.strftime(DATETIME_FORMAT),
+                       window_end.strftime(DATETIME_FORMAT)))
+    return ranges
+
+
+def auto_windows(start_time: Optional[str], end_time: Optional[str], max_events: int) -> int:
+    """
+    Picks how many time windows a query should be split into.
+
+    Each window may return up to max_events, so splitting only pays off for
+    large pulls over a long range: one window per SHARD_SPAN, up to MAX_WINDOWS.
+
+    Args:
+        start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+        end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+        max_events (int): Maximum number of events to retrieve
+
+    Returns:
+        int: Number of windows; 1 means a single query.
+    """
+    if not start_time or not end_time or max_events < MIN_SHARD_EVENTS:
+        return 1
+    try:
+        span = datetime.strptime(end_time, DATETIME_FORMAT) - datetime.strptime(start_time, DATETIME_FORMAT)
+    except ValueError:
+        return 1
+    return max(1, min(MAX_WINDOWS, -(-span // SHARD_SPAN)))
+
+
+def fetch_event_records_sharded(log_types: Union[str, list[str]] = "System",
+                                start_time: Optional[str] = None,
+                                end_time: Optional[str] = None,
+                                max_events: int = 100,
+                                level: Optional[int] = None,
+                                provider_name: Optional[str] = None,
+                                event_ids: Optional[list[int]] = None,
+                                windows: int = 4,
+                                max_workers: int = 4,
+                                runner: Optional[Callable[[str], str]] = None,
+                                store=None) -> list[dict]:
+    """
+    Fetches several log channels and time windows concurrently and merges them.
+
+    Every (channel, window) pair becomes its own Get-WinEvent call run on a
+    bounded thread pool. Each shard is already newest first, so the results
+    are merged by TimeCreated and cut at a global max_events. Windows share
+    their boundaries, so an event on one is fetched twice and kept once.
+    Records carry a LogName field naming the channel they came from.
+
+    Args:
+        log_types (Union[str, list[str]]): One or more log names, e.g. ['System', 'Security']
+        start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+        end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+        max_events (int): Maximum number of events to return across all shards
+        level (Optional[int]): Event level (1-5)
+        provider_name (Optional[str]): Name of the event provider to filter logs
+        event_ids (Optional[list[int]]): List of specific event IDs to filter logs
+        windows (int): Number of time windows per channel. Only used when both
+            start_time and end_time are given.
+        max_workers (int): Maximum number of shards running at once
+        runner (Optional[Callable[[str], str]]): Passed through to fetch_event_records
+        store (Optional[EventStore]): Passed through to fetch_event_records
+
+    Returns:
+        list[dict]: Event records from all shards, newest first.
+    """
+    if isinstance(log_types, str):
+        log_types = [log_types]
+
+    time_ranges = [(start_time, end_time)]
+    if start_time and end_time and windows > 1:
+        try:
+            time_ranges = split_time_range(start_time, end_time, windows)
+        except ValueError:
+            pass  # fetch_event_records reports the bad format
+
+    shards = [(log_type, window_start, window_end)
+              for log_type in log_types
+              for window_start, window_end in time_ranges]
+
+    def fetch_shard(shard: tuple[str, Optional[str], Optional[str]]) -> list[dict]:
+        log_type, window_start, window_end = shard
+        records = fetch_event_records(log_type=log_type,
+                                      start_time=window_start,
+                                      end_time=window_end,
+                                      max_events=max_events,
+                                      level=level,
+                                      provider_name=provider_name,
+                                      event_ids=event_ids,
+                                      runner=runner,
+                                      store=store)
+        for record in records:
+            record["LogName"] = log_type
+        return records
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = list(pool.map(fetch_shard, shards))
+
+    merged = heapq.merge(*results, key=record_timestamp, reverse=True)
+    return list(islice(_unique_records(merged), max_events))
+
+
+def _unique_records(records: Iterable[dict]) -> Iterator[dict]:
+    # RecordId is unique within a channel; events without one are always kept
+    seen = set()
+    for record in records:
+        record_id = record.get("RecordId")
+        if record_id is not None:
+            key = (record.get("LogName"), record_id)
+            if key in seen:
+                continue
+            seen.add(key)
+        yield record
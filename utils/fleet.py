@@ -0,0 +1,333 @@
+# utils/fleet.py
+import heapq  # merge hosts in timestamp order
+import queue  # hand hosts to worker threads
+import subprocess  # run remote PowerShell commands
+import threading  # fetch hosts concurrently
+import time
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional
+
+from colorama import init, Fore, Style  # colored output for console
+
+from utils.fetch_logs import build_structured_command, run_powershell
+from utils.metrics import count, stage
+from utils.parse_logs import DATETIME_FORMAT, parse_json_logs, record_timestamp
+
+# Initialize colorama for colored output
+init(autoreset=True)
+
+# host names that mean this machine; fetched without remoting
+LOCAL_HOSTS = ("localhost", ".", "127.0.0.1")
+
+# takes (host, command, timeout in seconds) and returns the command's stdout from that host
+Transport = Callable[[str, str, float], str]
+
+
+def load_inventory(path: str) -> list[str]:
+    """
+    Reads a host inventory: one host per line (or several separated by commas),
+    with blank lines and # comments ignored.
+
+    Args:
+        path (str): Path to the inventory file.
+
+    Returns:
+        list[str]: Host names in file order, without duplicates.
+    """
+    hosts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            hosts.extend(line.split("#", 1)[0].split(","))
+    return parse_hosts(hosts)
+
+
+def parse_hosts(hosts: Iterable[str]) -> list[str]:
+    """
+    Cleans a list of host names: strips whitespace, drops blanks and repeats.
+
+    Args:
+        hosts (Iterable[str]): Host names, e.g. from a comma-separated flag.
+
+    Returns:
+        list[str]: Host names in their original order.
+    """
+    seen = {}
+    for host in hosts:
+        host = host.strip()
+        if host and host.lower() not in seen:
+            seen[host.lower()] = host
+    return list(seen.values())
+
+
+def invoke_command(host: str, command: str, timeout: float) -> str:
+    """
+    Runs a PowerShell command on a host with Invoke-Command (WinRM).
+
+    Local host names run the command directly instead. The whole pipeline,
+    including ConvertTo-Json, runs on the remote machine, so only the JSON
+    travels back.
+
+    Args:
+        host (str): Computer name.
+        command (str): The PowerShell command.
+        timeout (float): Seconds before the PowerShell process is killed.
+
+    Returns:
+        str: Standard output of the command.
+
+    Raises:
+        subprocess.CalledProcessError: If PowerShell exits with a non-zero code.
+        subprocess.TimeoutExpired: If the host doesn't answer within timeout.
+    """
+    if host.lower() not in LOCAL_HOSTS:
+        computer = host.replace("'", "''")
+        command = f"Invoke-Command -ComputerName '{computer}' -ScriptBlock {{ {command} }}"
+    result = subprocess.run(
+        ["powershell", "-NoProfile", "-Command",
+         "[Console]::OutputEncoding = [Text.Encoding]::UTF8; " + command],
+        capture_output=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=timeout,
+        check=True
+    )
+    return result.stdout
+
+
+def local_transport(host: str, command: str, timeout: float) -> str:
+    """
+    Stand-in transport that runs every host's command on this machine.
+
+    Useful to try fleet mode without remoting; each event is still tagged
+    with the host it was requested for.
+    """
+    return run_powershell(command)
+
+
+class HostResult:
+    """
+    Outcome of fetching one host.
+
+    Args:
+        host (str): The host name.
+        records (list[dict]): Its events, newest first, tagged with Host.
+        error (Optional[str]): Why the fetch failed, or None.
+        seconds (float): How long the fetch took.
+    """
+    __slots__ = ("host", "records", "error", "seconds")
+
+    def __init__(self, host: str, records: list[dict], error: Optional[str] = None,
+                 seconds: float = 0.0):
+        self.host = host
+        self.records = records
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def utc_to_local(value: str, converted: Optional[dict] = None) -> str:
+    """
+    Converts a UTC TimeCreated string to this machine's local time.
+
+    Args:
+        value (str): Time in MM/DD/YYYY HH:MM:SS AM/PM format, in UTC.
+        converted (Optional[dict]): Cache of earlier conversions; events
+            often share a second.
+
+    Returns:
+        str: The same instant in local time, or value unchanged if it can't be read.
+    """
+    if converted is not None and value in converted:
+        return converted[value]
+    try:
+        local = datetime.strptime(value, DATETIME_FORMAT).replace(tzinfo=timezone.utc).astimezone()
+        result = local.strftime(DATETIME_FORMAT)
+    except (TypeError, ValueError):
+        result = value
+    if converted is not None:
+        converted[value] = result
+    return result
+
+
+def fetch_host(host: str, command: str, transport: Transport, timeout: float) -> HostResult:
+    """
+    Runs the event query on one host, tags its events and converts their times to local time.
+
+    Args:
+        host (str): The host name.
+        command (str): Command from build_structured_command with utc=True,
+            so every host reports TimeCreated in UTC.
+        transport (Transport): Runs the command on the host.
+        timeout (float): Seconds to allow the host.
+
+    Returns:
+        HostResult: The events or the error; never raises.
+    """
+    start = time.perf_counter()
+    try:
+        with stage("fetch"):
+            output = transport(host, command, timeout)
+        count("fetch", "bytes", len(output))
+        with stage("parse"):
+            records = parse_json_logs(output)
+        count("parse", "events", len(records))
+        error = None
+    except subprocess.TimeoutExpired:
+        records, error = [], f"timed out after {timeout:g}s"
+    except subprocess.CalledProcessError as e:
+        # Get-WinEvent also fails when nothing matches, so report both
+        details = (e.stderr or "").strip().splitlines()
+        records, error = [], details[-1] if details else "no matching events or the host refused the query"
+    except Exception as e:
+        records, error = [], str(e) or e.__class__.__name__
+    if error is not None:
+        count("fetch", "failed_hosts")
+
+    converted = {}
+    for record in records:
+        record["Host"] = host
+        if record.get("TimeCreated"):
+            record["TimeCreated"] = utc_to_local(record["TimeCreated"], converted)
+    return HostResult(host, records, error, time.perf_counter() - start)
+
+
+def collect_fleet(hosts: Iterable[str],
+                  log_type: str = "System",
+                  start_time: Optional[str] = None,
+                  end_time: Optional[str] = None,
+                  max_events: int = 100,
+                  level: Optional[int] = None,
+                  provider_name: Optional[str] = None,
+                  event_ids: Optional[list[int]] = None,
+                  transport: Optional[Transport] = None,
+                  max_workers: int = 16,
+                  timeout: float = 60.0) -> list[HostResult]:
+    """
+    Fetches the same query from many hosts concurrently.
+
+    At most max_workers hosts are queried at once, so with enough workers
+    the whole fleet takes about as long as its slowest host. Times are
+    filtered and reported in UTC, then shown in local time, so hosts in
+    other time zones use the same range and merge in the right order.
+
+    Each host gets timeout seconds from when its fetch starts; the transport
+    enforces it, and a host that still hasn't answered a second later is
+    reported as timed out and a fresh worker takes over its slot, so a stuck
+    host costs one timeout rather than holding up every later host.
+
+    Args:
+        hosts (Iterable[str]): Host names.
+        log_type (str): The log name, e.g., 'System', 'Application'
+        start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+        end_time (str): End time in MM/DD/YYYY HH:MM:SS AM/PM format
+        max_events (int): Maximum number of events per host
+        level (Optional[int]): Event level (1-5)
+        provider_name (Optional[str]): Name of the event provider to filter logs
+        event_ids (Optional[list[int]]): List of specific event IDs to filter logs
+        transport (Optional[Transport]): Runs a command on a host. Defaults
+            to invoke_command; pass a stand-in to test without remoting.
+        max_workers (int): Maximum number of hosts fetched at once
+        timeout (float): Seconds allowed per host
+
+    Returns:
+        list[HostResult]: One result per host, in the order given.
+
+    Raises:
+        ValueError: If a time or the level is invalid.
+    """
+    hosts = parse_hosts(hosts)
+    transport = transport or invoke_command
+    command = build_structured_command(log_type, start_time, end_time, max_events,
+                                       level, provider_name, event_ids, utc=True)
+    if not hosts:
+        return []
+
+    pending = queue.Queue()
+    for host in hosts:
+        pending.put(host)
+    finished = queue.Queue()
+    started, results = {}, {}
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            try:
+                host = pending.get_nowait()
+            except queue.Empty:
+                return
+            with lock:
+                started[host] = time.monotonic()
+            finished.put((host, fetch_host(host, command, transport, timeout)))
+
+    def start_worker():
+        # daemon threads, so a transport that ignores its timeout can't keep the program alive
+        threading.Thread(target=worker, daemon=True).start()
+
+    for _ in range(max(1, min(max_workers, len(hosts)))):
+        start_worker()
+
+    while len(results) < len(hosts):
+        now = time.monotonic()
+        with lock:
+            running = {host: since + timeout + 1 for host, since in started.items() if host not in results}
+        expired = [host for host, deadline in running.items() if now >= deadline]
+        for host in expired:
+            # give up on the host; its worker may never return, so replace it
+            results[host] = HostResult(host, [], f"timed out after {timeout:g}s", timeout)
+            start_worker()
+        if expired:
+            continue
+        wait = min(running.values(), default=now + timeout + 1) - now
+        try:
+            host, result = finished.get(timeout=max(0.0, wait))
+        except queue.Empty:
+            continue
+        results.setdefault(host, result)  # a host that answered after its deadline stays timed out
+
+    return [results[host] for host in hosts]
+
+
+def merge_host_records(results: Iterable[HostResult]) -> list[dict]:
+    """
+    Merges the events of several hosts into one stream, newest first.
+
+    Args:
+        results (Iterable[HostResult]): Results from collect_fleet.
+
+    Returns:
+        list[dict]: Every host's events in TimeCreated order.
+    """
+    return list(heapq.merge(*(result.records for result in results),
+                            key=record_timestamp, reverse=True))
+
+
+def fetch_fleet_records(hosts: Iterable[str], **kwargs) -> list[dict]:
+    """
+    Fetches a query from every host, reports failed hosts, and merges the events.
+
+    Args:
+        hosts (Iterable[str]): Host names.
+        **kwargs: Filters and options for collect_fleet.
+
+    Returns:
+        list[dict]: Events from every host that answered, newest first, each
+            with a Host field. Empty if the filters are invalid.
+    """
+    try:
+        results = collect_fleet(hosts, **kwargs)
+    except ValueError as e:
+        print(Fore.RED + Style.BRIGHT + f"❌ {e}")
+        return []
+
+    answered = sum(result.ok for result in results)
+    slowest = max((result.seconds for result in results), default=0.0)
+    print(f"{Fore.LIGHTWHITE_EX}🖥️  {answered} of {len(results)} hosts answered "
+          f"(slowest {slowest:.1f}s).")
+    for result in results:
+        if not result.ok:
+            print(f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}⚠️  {result.host}: {Style.RESET_ALL}"
+                  f"{Fore.LIGHTWHITE_EX}{result.error}")
+    return merge_host_records(results)
@@ -11,19 +11,26 @@ init(autoreset=True)
 # typewriter effect for welcome banner
 
 
-def typewriter_line(text: str, color=Fore.WHITE, style=Style.NORMAL):
+def typewriter_line(text: str, color=Fore.WHITE, style=Style.NORMAL, delay: float = 0.02):
+    if delay <= 0:
+        # print the whole line at once
+        print(f"{color}{style}{text}{Style.RESET_ALL}")
+        return
     for char in text:
         sys.stdout.write(f"{color}{style}{char}{Style.RESET_ALL}")
         sys.stdout.flush()
-        time.sleep(0.02)
+        time.sleep(delay)
     print()  # move to next line
 
 # displays welcome message
 
 
-def display_welcome():
+def display_welcome(delay: float = 0.02):
     """
     Display a welcome message with the current date and time.
+
+    Args:
+        delay (float): Seconds per character of the typewriter effect; 0 prints instantly.
     """
 
     os.system('cls' if os.name == 'nt' else 'clear')  # clears the console
@@ -32,13 +39,42 @@ def display_welcome():
 
     print(Fore.LIGHTWHITE_EX + "=" * 55 + Style.RESET_ALL)
     typewriter_line("🔍  Event Log Summarizer".center(55),
-                    Fore.GREEN, Style.BRIGHT)
+                    Fore.GREEN, Style.BRIGHT, delay)
     typewriter_line("Analyze Windows Event Logs with GPT Assistance".center(
-        55), Fore.CYAN, Style.BRIGHT)
-    typewriter_line(f'{now}'.center(55), Style.BRIGHT + Fore.LIGHTBLUE_EX)
+        55), Fore.CYAN, Style.BRIGHT, delay)
+    typewriter_line(f'{now}'.center(55), Style.BRIGHT + Fore.LIGHTBLUE_EX, delay=delay)
     print(Fore.LIGHTWHITE_EX + "=" * 55 + Style.RESET_ALL)
     print("\n")
 
+# converts 'now', 'today', 'yesterday' or a datetime string to the filter format
+
+
+def resolve_time(value: str) -> str:
+    """
+    Resolves a start/end time the same way the time prompts do.
+
+    Args:
+        value (str): 'now' (or empty), 'today', 'yesterday', or a datetime in
+            MM/DD/YYYY HH:MM:SS AM/PM format.
+
+    Returns:
+        str: A valid datetime string.
+
+    Raises:
+        ValueError: If value is none of the above.
+    """
+    datetime_format = "%m/%d/%Y %I:%M:%S %p"
+    value = value.strip().lower()
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if value in ('now', ''):
+        return datetime.now().strftime(datetime_format)
+    if value == 'today':
+        return today.strftime(datetime_format)
+    if value == 'yesterday':
+        return (today - timedelta(days=1)).strftime(datetime_format)
+    return datetime.strptime(value.upper(), datetime_format).strftime(datetime_format)
+
 # prompt user function for log type
 
 
@@ -364,3 +400,25 @@ def prompt_event_ids() -> Optional[list[int]]:
         except ValueError:
             print(Fore.RED + Style.BRIGHT +
                   "❌ Invalid format. Please enter numbers separated by commas.\n")
+
+
+def prompt_search() -> Optional[str]:
+    """
+    Prompt the user for a search to narrow the fetched logs by message.
+    Returns:
+        Optional[str]: The search query, or None if skipped.
+    """
+    print(Style.BRIGHT + Fore.LIGHTBLUE_EX +
+          "🔎 Optionally search the messages of these logs.\n")
+    print(Fore.LIGHTWHITE_EX + "   Words must all appear; use quotes for a phrase, /slashes/ for a regular expression")
+    print(Fore.LIGHTWHITE_EX + "   and a trailing * for word prefixes.")
+    print(f"\n     {Fore.LIGHTWHITE_EX}Example: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}disk timeout {Style.RESET_ALL}{Fore.LIGHTWHITE_EX}or {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}\"not responding\" /0x[0-9a-f]+/")
+    print(Fore.LIGHTWHITE_EX + "\n   Leave blank to keep every log.\n")
+
+    user_input = input(Fore.LIGHTWHITE_EX +
+                       "🔤 Enter a search or press Enter to skip: ").strip()
+
+    # spacing for better readability
+    print(Fore.LIGHTWHITE_EX + "\n" + "=" * 55 + "\n")
+
+    return user_input or None
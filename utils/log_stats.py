@@ -0,0 +1,344 @@
+# utils/log_stats.py
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.parse_logs import DATETIME_FORMAT
+
+# columns the statistics need; messages are never read
+STATS_COLUMNS = ["TimeCreated", "Id", "Level", "LevelDisplayName", "ProviderName"]
+
+# level numbers -> names, for logs without LevelDisplayName
+LEVEL_NAMES = {1: "Critical", 2: "Error", 3: "Warning", 4: "Information", 5: "Verbose"}
+
+# characters for the Markdown rate sparkline, lowest to highest
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# most histogram buckets; longer ranges use the first wider bucket that fits
+MAX_BUCKETS = 20_000
+BUCKET_WIDTHS = ["1min", "5min", "15min", "1h", "6h", "1D", "7D", "30D", "365D"]
+
+
+def parse_times(values) -> np.ndarray:
+    """
+    Parses TimeCreated strings ('MM/DD/YYYY HH:MM:SS AM') without a per-row strptime.
+
+    The format is fixed-width, so the strings are viewed as a matrix of
+    characters and the digits are combined column by column. Anything that
+    doesn't fit the layout falls back to pandas.
+
+    Args:
+        values: TimeCreated strings; None or other values become NaT.
+
+    Returns:
+        np.ndarray: datetime64[s] values.
+    """
+    strings = [value if isinstance(value, str) else "" for value in values]
+    # longer strings are cut to 23 characters here, which always fails the layout check below
+    text = np.array(strings, dtype="U23")
+    chars = text.view(np.uint32).reshape(len(text), 23).astype(np.int64)
+    digits = chars - ord("0")
+
+    def number(*columns):
+        result = np.zeros(len(text), dtype=np.int64)
+        for column in columns:
+            result = result * 10 + digits[:, column]
+        return result
+
+    digit_columns = [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15, 17, 18]
+    valid = ((chars[:, 22] == 0)
+             & np.all((digits[:, digit_columns] >= 0) & (digits[:, digit_columns] <= 9), axis=1)
+             & (chars[:, 2] == ord("/")) & (chars[:, 5] == ord("/")) & (chars[:, 10] == ord(" "))
+             & (chars[:, 13] == ord(":")) & (chars[:, 16] == ord(":")) & (chars[:, 19] == ord(" "))
+             & np.isin(chars[:, 20], (ord("A"), ord("P"))) & (chars[:, 21] == ord("M")))
+    month, day, year = number(0, 1), number(3, 4), number(6, 7, 8, 9)
+    hour = number(11, 12) % 12 + np.where(chars[:, 20] == ord("P"), 12, 0)
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    seconds = hour * 3600 + number(14, 15) * 60 + number(17, 18)
+    times = months.astype("datetime64[D]") + (day - 1) + seconds.astype("timedelta64[s]")
+    # days past the end of a month roll into the next one; treat those as unparsed
+    valid &= times.astype("datetime64[M]") == months
+    times = np.where(valid, times, np.datetime64("NaT"))
+
+    # other layouts (or strings pandas can still read) go through pandas
+    fallback = np.flatnonzero(~valid & (text != ""))
+    if len(fallback):
+        parsed = pd.to_datetime(pd.Series([strings[i] for i in fallback]), format=DATETIME_FORMAT,
+                                errors="coerce")
+        times[fallback] = parsed.to_numpy(dtype="datetime64[s]")
+    return times
+
+
+def stats_frame(logs) -> pd.DataFrame:
+    """
+    Builds a frame with only the columns the statistics use.
+
+    Args:
+        logs: An EventTable, a DataFrame, a dict of column lists, or parsed
+            log dictionaries.
+
+    Returns:
+        pd.DataFrame: TimeCreated as datetime64, plus Id, Level,
+            LevelDisplayName and ProviderName.
+    """
+    frame = getattr(logs, "frame", logs)
+    if isinstance(frame, dict):
+        frame = pd.DataFrame(frame)
+    if not isinstance(frame, pd.DataFrame):
+        logs = list(logs)
+        frame = pd.DataFrame({column: [log.get(column) for log in logs] for column in STATS_COLUMNS})
+    else:
+        frame = frame.reindex(columns=STATS_COLUMNS)
+
+    if not pd.api.types.is_datetime64_any_dtype(frame["TimeCreated"]):
+        frame["TimeCreated"] = parse_times(frame["TimeCreated"].tolist())
+    frame["Id"] = pd.to_numeric(frame["Id"], errors="coerce").fillna(0).astype("int64")
+    levels = pd.to_numeric(frame["Level"], errors="coerce")
+    names = frame["LevelDisplayName"].astype(object)
+    # fall back to the level number's name where the display name is missing
+    frame["LevelDisplayName"] = names.where(names.notna() & (names != ""), levels.map(LEVEL_NAMES)).fillna("Unknown")
+    frame["ProviderName"] = frame["ProviderName"].astype(object).fillna("Unknown")
+    return frame
+
+
+def compute_log_stats(logs,
+                      bucket: str = "1min",
+                      window: int = 30,
+                      threshold: float = 4.0,
+                      min_events: int = 5,
+                      top: int = 10) -> dict:
+    """
+    Computes counts, a rate histogram and bursts for a set of logs.
+
+    Everything is vectorized: counts are group-bys, the histogram is one
+    value_counts over times floored to the bucket, and each bucket's z-score
+    compares it with the mean and standard deviation of the `window` buckets
+    before it. The first buckets, with too little history, are compared with
+    the median and median absolute deviation of the whole range instead, so
+    a burst right at the start (a boot storm) is still found. The deviation
+    is floored at the square root of the mean (the spread of a steady random
+    rate), so a quiet log with a flat baseline doesn't flag every small blip.
+    Consecutive flagged buckets form one burst. Ranges that would need more
+    than MAX_BUCKETS buckets (often one bad timestamp, such as a zero
+    FILETIME from 1601) use a wider bucket, reported in rate["bucket"].
+
+    Args:
+        logs: An EventTable, a DataFrame, or parsed log dictionaries.
+        bucket (str): Histogram bucket width as a pandas frequency, e.g. '1min'.
+        window (int): Buckets of history each bucket is compared with.
+        threshold (float): z-score at which a bucket counts as a spike.
+        min_events (int): Fewest events a spike bucket must have.
+        top (int): Number of providers and events to keep.
+
+    Returns:
+        dict: total, first, last, levels, providers, events, rate, histogram and bursts.
+            Empty lists and None values where the logs have no usable times.
+    """
+    frame = stats_frame(logs)
+    times = frame["TimeCreated"]
+    valid = times.notna()
+
+    events = (frame.groupby(["ProviderName", "Id"], observed=True).size()
+              .sort_values(ascending=False, kind="stable").head(top))
+    stats = {
+        "total": len(frame),
+        "first": times.min().strftime(DATETIME_FORMAT) if valid.any() else None,
+        "last": times.max().strftime(DATETIME_FORMAT) if valid.any() else None,
+        "levels": {str(name): int(n) for name, n in frame["LevelDisplayName"].value_counts().items()},
+        "providers": {str(name): int(n) for name, n in frame["ProviderName"].value_counts().head(top).items()},
+        "events": [{"provider": str(provider), "id": int(event_id), "count": int(n)}
+                   for (provider, event_id), n in events.items()],
+        "rate": None,
+        "histogram": None,
+        "bursts": [],
+    }
+    if not valid.any():
+        return stats
+
+    # per-bucket counts, with empty buckets filled in
+    bucket = _bucket_for_span(bucket, (times[valid].max() - times[valid].min()).total_seconds())
+    buckets = times[valid].dt.floor(bucket)
+    counts = buckets.value_counts().sort_index()
+    # second resolution, so times far from today (e.g. year 1601) don't overflow
+    index = pd.date_range(counts.index[0], counts.index[-1], freq=bucket, unit="s")
+    values = counts.reindex(index, fill_value=0).to_numpy(dtype=float)
+
+    peak = int(values.argmax())
+    stats["rate"] = {
+        "bucket": bucket,
+        "buckets": len(values),
+        "mean": float(values.mean()),
+        "median": float(np.median(values)),
+        "max": int(values[peak]),
+        "max_at": index[peak].strftime(DATETIME_FORMAT),
+    }
+    stats["histogram"] = {"start": index[0].strftime(DATETIME_FORMAT),
+                          "counts": values.astype(int).tolist()}
+
+    # rolling z-score of each bucket against the buckets before it
+    history = pd.Series(values).shift(1).rolling(window, min_periods=min(window, 5))
+    mean = history.mean().to_numpy()
+    std = history.std(ddof=0).to_numpy()
+    # buckets without enough history are compared with the whole range
+    early = np.isnan(mean)
+    median = np.median(values)
+    mean[early] = median
+    std[early] = 1.4826 * np.median(np.abs(values - median))  # MAD scaled to a standard deviation
+    spread = np.fmax(np.fmax(std, np.sqrt(mean)), 1.0)
+    z = (values - mean) / spread
+    spikes = np.flatnonzero((z >= threshold) & (values >= min_events))
+    if not len(spikes):
+        return stats
+
+    # consecutive spike buckets form one burst
+    breaks = np.flatnonzero(np.diff(spikes) > 1)
+    starts = np.r_[spikes[0], spikes[breaks + 1]]
+    ends = np.r_[spikes[breaks], spikes[-1]]
+    row_buckets = buckets.to_numpy()
+    ids = frame.loc[valid, ["ProviderName", "Id"]]
+
+    bursts = []
+    for start, end in zip(starts, ends):
+        in_burst = (row_buckets >= index[start].to_datetime64()) & (row_buckets <= index[end].to_datetime64())
+        causes = (ids[in_burst].groupby(["ProviderName", "Id"], observed=True).size()
+                  .sort_values(ascending=False, kind="stable").head(3))
+        bursts.append({
+            "start": index[start].strftime(DATETIME_FORMAT),
+            "end": (index[end] + pd.Timedelta(bucket)).strftime(DATETIME_FORMAT),
+            "events": int(values[start:end + 1].sum()),
+            "peak": int(values[start:end + 1].max()),
+            "z": float(np.nanmax(z[start:end + 1])),
+            "top": [{"provider": str(provider), "id": int(event_id), "count": int(n)}
+                    for (provider, event_id), n in causes.items()],
+        })
+    stats["bursts"] = sorted(bursts, key=lambda burst: burst["events"], reverse=True)
+    return stats
+
+
+def _bucket_for_span(bucket: str, span_seconds: float) -> str:
+    # seconds rather than Timedeltas, which overflow for spans of a few centuries
+    def seconds(width: str) -> float:
+        return pd.Timedelta(width).total_seconds()
+
+    if span_seconds / seconds(bucket) < MAX_BUCKETS:
+        return bucket
+    for width in BUCKET_WIDTHS:
+        if seconds(width) > seconds(bucket) and span_seconds / seconds(width) < MAX_BUCKETS:
+            return width
+    return f"{int(np.ceil(span_seconds / seconds('1D') / MAX_BUCKETS))}D"
+
+
+def _join_counts(counts: dict, limit: int) -> str:
+    return ", ".join(f"{name} {count}" for name, count in list(counts.items())[:limit])
+
+
+def _join_events(events: list[dict], limit: int) -> str:
+    return ", ".join(f"{e['provider']} ID {e['id']} ({e['count']})" for e in events[:limit])
+
+
+def format_stats_for_gpt(stats: dict, top: int = 5, max_bursts: int = 5) -> str:
+    """
+    Formats statistics as a short text block for the summarization prompt.
+
+    A few lines of totals, rates and bursts cost far fewer tokens than the
+    rows they describe, and tell the model about the whole set even when it
+    only sees samples or clusters of the events.
+
+    Args:
+        stats (dict): Output of compute_log_stats.
+        top (int): Providers and events to list.
+        max_bursts (int): Bursts to list, largest first.
+
+    Returns:
+        str: The statistics block, or an empty string for no logs.
+    """
+    if not stats["total"]:
+        return ""
+    span = f", {stats['first']} to {stats['last']}" if stats["first"] else ""
+    lines = [f"Event statistics (all {stats['total']} events{span}):",
+             f"- Levels: {_join_counts(stats['levels'], len(stats['levels']))}",
+             f"- Top providers: {_join_counts(stats['providers'], top)}",
+             f"- Top events: {_join_events(stats['events'], top)}"]
+
+    rate = stats["rate"]
+    if rate:
+        lines.append(f"- Rate per {rate['bucket']}: average {rate['mean']:.1f}, median {rate['median']:g}, "
+                     f"peak {rate['max']} at {rate['max_at']}")
+    for burst in stats["bursts"][:max_bursts]:
+        causes = _join_events(burst["top"], 3)
+        lines.append(f"- Burst {burst['start']} to {burst['end']}: {burst['events']} events "
+                     f"(peak {burst['peak']}, z={burst['z']:.1f}), mostly {causes}")
+    if len(stats["bursts"]) > max_bursts:
+        lines.append(f"- {len(stats['bursts']) - max_bursts} smaller bursts not listed")
+    return "\n".join(lines)
+
+
+def sparkline(counts: list[int], width: int = 60) -> str:
+    """
+    Draws counts as a one-line bar chart, summing neighbours to fit width.
+
+    Args:
+        counts (list[int]): Counts per bucket.
+        width (int): Maximum number of characters.
+
+    Returns:
+        str: One block character per column.
+    """
+    values = np.asarray(counts, dtype=float)
+    if not len(values):
+        return ""
+    if len(values) > width:
+        edges = np.linspace(0, len(values), width + 1).astype(int)[:-1]
+        values = np.add.reduceat(values, edges)
+    scale = values.max() or 1.0
+    levels = np.minimum((values / scale * len(SPARK_CHARS)).astype(int), len(SPARK_CHARS) - 1)
+    return "".join(SPARK_CHARS[level] for level in levels)
+
+
+def format_stats_markdown(stats: dict, top: int = 10) -> str:
+    """
+    Formats statistics as a Markdown report section.
+
+    Args:
+        stats (dict): Output of compute_log_stats.
+        top (int): Providers and events to list.
+
+    Returns:
+        str: Markdown with count tables, a rate sparkline and bursts.
+    """
+    out = ["## 📈 Statistics\n"]
+    out.append("| Level | Events |\n|---|---:|")
+    out.extend(f"| {name} | {count} |" for name, count in stats["levels"].items())
+    out.append("\n| Provider | Events |\n|---|---:|")
+    out.extend(f"| {name} | {count} |" for name, count in list(stats["providers"].items())[:top])
+    out.append("\n| Provider | Event ID | Events |\n|---|---:|---:|")
+    out.extend(f"| {e['provider']} | {e['id']} | {e['count']} |" for e in stats["events"][:top])
+
+    rate, histogram = stats["rate"], stats["histogram"]
+    if rate:
+        out.append(f"\n**Rate per {rate['bucket']}** ({histogram['start']} ➡️ {stats['last']}): "
+                   f"average {rate['mean']:.1f}, median {rate['median']:g}, "
+                   f"peak {rate['max']} at {rate['max_at']}\n")
+        out.append(f"`{sparkline(histogram['counts'])}`")
+    if stats["bursts"]:
+        out.append("\n| Burst | Events | Peak | z | Mostly |\n|---|---:|---:|---:|---|")
+        out.extend(f"| {b['start']} ➡️ {b['end']} | {b['events']} | {b['peak']} | {b['z']:.1f} | "
+                   f"{_join_events(b['top'], 3)} |" for b in stats["bursts"])
+    return "\n".join(out) + "\n"
+
+
+def log_stats_block(logs, **options) -> Optional[str]:
+    """
+    Computes statistics and formats them for the summarization prompt.
+
+    Args:
+        logs: An EventTable, a DataFrame, or parsed log dictionaries.
+        **options: Arguments for compute_log_stats.
+
+    Returns:
+        Optional[str]: The block, or None if there are no logs.
+    """
+    return format_stats_for_gpt(compute_log_stats(logs, **options)) or None
@@ -0,0 +1,343 @@
+# utils/metrics.py
+import contextlib
+import json
+import os
+import threading
+import time  # wall and CPU clocks
+import tracemalloc  # peak memory per stage
+from datetime import datetime
+from typing import Callable, ContextManager, Optional
+
+from colorama import init, Fore, Style  # colored output for console
+
+# Initialize colorama for colored output
+init(autoreset=True)
+
+# metrics file extension -> format
+METRICS_FORMATS = {".json": "json", ".prom": "prometheus"}
+
+# prefix of every Prometheus metric name
+PROMETHEUS_PREFIX = "event_summarizer"
+
+# stages the pipeline reports, in pipeline order
+STAGES = ("fetch", "parse", "search", "format", "summarize", "export")
+
+
+class StageStats:
+    """
+    Totals for one named stage across every time it ran.
+
+    Wall and CPU time only count while at least one instance of the stage is
+    running, so stages entered from several threads at once (shards, fleet
+    hosts, summary chunks) report elapsed time rather than the sum of their
+    threads. CPU time is the whole process's.
+
+    Args:
+        name (str): The stage name, e.g. 'fetch'.
+    """
+    __slots__ = ("name", "calls", "wall", "cpu", "peak_memory", "counts", "_open", "_since")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_memory: Optional[int] = None
+        self.counts: dict[str, float] = {}
+        self._open = 0
+        self._since = (0.0, 0.0)
+
+    def to_dict(self) -> dict:
+        return {"calls": self.calls, "wall_s": self.wall, "cpu_s": self.cpu,
+                "peak_memory_bytes": self.peak_memory, "counts": dict(self.counts)}
+
+
+class _Frame:
+    # one running instance of a stage; tracks traced memory above its start
+    __slots__ = ("stats", "start_memory", "peak")
+
+    def __init__(self, stats: StageStats, start_memory: int):
+        self.stats = stats
+        self.start_memory = start_memory
+        self.peak = start_memory
+
+
+class Metrics:
+    """
+    Collects wall time, CPU time, peak memory and counts per pipeline stage.
+
+    Stages may nest (a parse inside a fetch) and run in several threads.
+    Peak memory is the highest traced Python allocation above the stage's
+    starting point, measured with tracemalloc; tracing slows allocation-heavy
+    code (parsing several times over), so it is off unless asked for.
+
+    Args:
+        trace_memory (bool): Measure peak memory with tracemalloc.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.started = datetime.now()
+        self._clock = time.perf_counter()
+        self._stages: dict[str, StageStats] = {}
+        self._frames: list[_Frame] = []
+        self._lock = threading.Lock()
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _stats(self, name: str) -> StageStats:
+        stats = self._stages.get(name)
+        if stats is None:
+            stats = self._stages[name] = StageStats(name)
+        return stats
+
+    def _update_peaks(self):
+        # fold the process peak since the last reset into every running stage
+        if not self.trace_memory or not tracemalloc.is_tracing():
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._frames:
+            frame.peak = max(frame.peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """
+        Times a block as one run of a stage.
+
+        Args:
+            name (str): The stage name.
+        """
+        with self._lock:
+            stats = self._stats(name)
+            stats.calls += 1
+            frame = _Frame(stats, self._update_peaks())
+            self._frames.append(frame)
+            if stats._open == 0:
+                stats._since = (time.perf_counter(), time.process_time())
+            stats._open += 1
+        try:
+            yield stats
+        finally:
+            with self._lock:
+                self._update_peaks()
+                self._frames.remove(frame)
+                stats._open -= 1
+                if stats._open == 0:
+                    wall, cpu = stats._since
+                    stats.wall += time.perf_counter() - wall
+                    stats.cpu += time.process_time() - cpu
+                if self.trace_memory:
+                    used = frame.peak - frame.start_memory
+                    stats.peak_memory = max(stats.peak_memory or 0, used)
+
+    def count(self, name: str, key: str, value: float = 1):
+        """
+        Adds to a counter of a stage, e.g. events fetched or tokens sent.
+
+        Args:
+            name (str): The stage name.
+            key (str): The counter name.
+            value (float): Amount to add.
+        """
+        with self._lock:
+            counts = self._stats(name).counts
+            counts[key] = counts.get(key, 0) + value
+
+    @property
+    def stages(self) -> list[StageStats]:
+        """Stages in the order they first ran."""
+        return list(self._stages.values())
+
+    def to_dict(self) -> dict:
+        """
+        Returns every stage's totals as a JSON-ready dict.
+
+        Returns:
+            dict: {"started", "wall_s", "stages": {name: totals}}
+        """
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall_s": time.perf_counter() - self._clock,
+            "stages": {stats.name: stats.to_dict() for stats in self.stages},
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Renders the totals in the Prometheus text exposition format.
+
+        Suitable for node_exporter's textfile collector, so nightly runs can
+        be graphed and alerted on.
+
+        Returns:
+            str: Gauges labelled by stage (and counter name for counts).
+        """
+        def metric(name: str, help_text: str, samples: list[tuple[str, float]]) -> list[str]:
+            full = f"{PROMETHEUS_PREFIX}_{name}"
+            lines = [f"# HELP {full} {help_text}", f"# TYPE {full} gauge"]
+            # repr keeps full precision (a :g timestamp would round to the minute)
+            lines.extend(f"{full}{{{labels}}} {float(value)!r}" if labels else f"{full} {float(value)!r}"
+                         for labels, value in samples)
+            return lines
+
+        def label(value: str) -> str:
+            return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        stages = self.stages
+        lines = []
+        lines += metric("stage_seconds", "Wall-clock seconds spent in the stage.",
+                        [(f'stage="{label(s.name)}"', s.wall) for s in stages])
+        lines += metric("stage_cpu_seconds", "Process CPU seconds used during the stage.",
+                        [(f'stage="{label(s.name)}"', s.cpu) for s in stages])
+        lines += metric("stage_calls", "Times the stage ran.",
+                        [(f'stage="{label(s.name)}"', s.calls) for s in stages])
+        memory = [(f'stage="{label(s.name)}"', s.peak_memory) for s in stages if s.peak_memory is not None]
+        if memory:
+            lines += metric("stage_peak_memory_bytes", "Peak traced Python memory above the stage's start.",
+                            memory)
+        lines += metric("stage_count", "Stage counters such as events, tokens and retries.",
+                        [(f'stage="{label(s.name)}",name="{label(key)}"', value)
+                         for s in stages for key, value in s.counts.items()])
+        lines += metric("run_timestamp_seconds", "Unix time the run started.",
+                        [("", self.started.timestamp())])
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """
+        Saves the metrics as JSON (.json) or Prometheus text (.prom).
+
+        Args:
+            path (str): The metrics file.
+
+        Raises:
+            ValueError: If the extension is neither .json nor .prom.
+        """
+        metrics_format = metrics_file_format(path)
+        if metrics_format is None:
+            raise ValueError(f"Unsupported metrics file: {path}; use .json or .prom")
+        text = (json.dumps(self.to_dict(), indent=2) if metrics_format == "json"
+                else self.to_prometheus())
+        # write then rename, so a collector never reads half a file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def report(self):
+        """
+        Prints a table of every stage's time, memory and counts.
+        """
+        if not self._stages:
+            return
+        print(f"\n{Style.BRIGHT + Fore.LIGHTBLUE_EX}⏱️  Stage timings:\n")
+        for stats in self.stages:
+            memory = f"{stats.peak_memory / 1e6:8.1f} MB peak" if stats.peak_memory is not None else ""
+            counts = "  ".join(f"{key}={value:g}" for key, value in stats.counts.items())
+            print(f"    {Fore.YELLOW}{stats.name:<10}{Style.RESET_ALL}{Fore.LIGHTWHITE_EX}"
+                  f"{stats.wall:8.2f}s wall {stats.cpu:8.2f}s CPU {memory}  {counts}")
+        print(Fore.LIGHTWHITE_EX + "\n" + "=" * 55 + "\n")
+
+
+def metrics_file_format(path: str) -> Optional[str]:
+    """
+    Returns the metrics format for a filename.
+
+    Args:
+        path (str): e.g. 'nightly.prom'
+
+    Returns:
+        Optional[str]: 'json' or 'prometheus', or None if unsupported.
+    """
+    return METRICS_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+# collector for the current run; None until enable_metrics is called
+_metrics: Optional[Metrics] = None
+
+# extra instrumentation run around every stage (see add_stage_hook)
+_stage_hooks: list[Callable[[str], Optional[ContextManager]]] = []
+
+
+def enable_metrics(trace_memory: bool = False) -> Metrics:
+    """
+    Starts collecting stage metrics for this process.
+
+    Until this is called, stage() and count() do nothing, so instrumented
+    code costs almost nothing in normal runs.
+
+    Args:
+        trace_memory (bool): Measure peak memory with tracemalloc.
+
+    Returns:
+        Metrics: The collector.
+    """
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics(trace_memory)
+    return _metrics
+
+
+def get_metrics() -> Optional[Metrics]:
+    """Returns the active collector, or None if metrics are off."""
+    return _metrics
+
+
+def add_stage_hook(hook: Callable[[str], Optional[ContextManager]]):
+    """
+    Runs extra instrumentation, such as a profiler, around every stage.
+
+    Args:
+        hook (Callable[[str], Optional[ContextManager]]): Called with the stage
+            name when a stage starts; returns a context manager to wrap the
+            stage in, or None to leave that stage alone.
+    """
+    _stage_hooks.append(hook)
+
+
+def remove_stage_hook(hook: Callable[[str], Optional[ContextManager]]):
+    """Stops running a hook added with add_stage_hook."""
+    if hook in _stage_hooks:
+        _stage_hooks.remove(hook)
+
+
+def stage(name: str):
+    """
+    Times a block as one run of a stage if metrics are on, and runs any stage hooks.
+
+    Args:
+        name (str): The stage name, one of STAGES.
+
+    Returns:
+        A context manager.
+    """
+    if not _stage_hooks:
+        if _metrics is None:
+            return contextlib.nullcontext()
+        return _metrics.stage(name)
+    return _hooked_stage(name)
+
+
+@contextlib.contextmanager
+def _hooked_stage(name: str):
+    with contextlib.ExitStack() as stack:
+        if _metrics is not None:
+            stack.enter_context(_metrics.stage(name))
+        for hook in list(_stage_hooks):
+            context = hook(name)
+            if context is not None:
+                stack.enter_context(context)
+        yield
+
+
+def count(name: str, key: str, value: float = 1):
+    """
+    Adds to a stage counter if metrics are on.
+
+    Args:
+        name (str): The stage name.
+        key (str): The counter name, e.g. 'events' or 'tokens_in'.
+        value (float): Amount to add.
+    """
+    if _metrics is not None:
+        _metrics.count(name, key, value)
@@ -1,3 +1,17 @@
+import json
+import re
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+# datetime format used for TimeCreated in structured records
+DATETIME_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+
+# fields of a structured record, as selected from Get-WinEvent (see fetch_logs.STRUCTURED_SELECT)
+STRUCTURED_FIELDS = ["TimeCreated", "Id", "Level", "LevelDisplayName",
+                     "ProviderName", "RecordId", "Message"]
+
+# matches the /Date(1719300000000)/ form Windows PowerShell uses for DateTime
+_MS_DATE_PATTERN = re.compile(r'^/Date\((-?\d+)[^)]*\)/$')
 
 
 def parse_logs(raw_text: str) -> list:
@@ -32,6 +46,83 @@ def parse_logs(raw_text: str) -> list:
     return logs
 
 
+def iter_parse_logs(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Parses Format-List output line by line, yielding each entry as soon as it ends.
+
+    Unlike parse_logs, indented continuation lines (wrapped or multi-line
+    messages) are appended to the previous field instead of being dropped.
+
+    Args:
+        lines (Iterable[str]): Lines of raw event logs output from PowerShell.
+
+    Yields:
+        dict: One parsed log entry at a time.
+    """
+    log = {}
+    last_key = None
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+
+        # a blank line ends the current entry
+        if not line.strip():
+            if log:
+                yield log
+            log = {}
+            last_key = None
+            continue
+
+        # continuation of the previous value
+        if line[0].isspace() and last_key is not None:
+            log[last_key] = f"{log[last_key]}\n{line.strip()}".strip()
+            continue
+
+        if ':' not in line:
+            continue  # skip malformed lines
+        key, value = line.split(':', 1)
+        last_key = key.strip()
+        log[last_key] = value.strip()
+
+    if log:
+        yield log
+
+
+def iter_json_logs(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Parses line-delimited JSON output, yielding one record per line.
+
+    Args:
+        lines (Iterable[str]): Lines holding one compressed JSON object each.
+
+    Yields:
+        dict: One parsed log entry at a time.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if record:
+            yield normalize_record(record)
+
+
+def record_timestamp(log: dict) -> datetime:
+    """
+    Returns a log's TimeCreated as a datetime for sorting and merging.
+
+    Args:
+        log (dict): A parsed log entry.
+
+    Returns:
+        datetime: The parsed time, or datetime.min if it is missing or unreadable.
+    """
+    try:
+        return datetime.strptime(log.get("TimeCreated", ""), DATETIME_FORMAT)
+    except (TypeError, ValueError):
+        return datetime.min
+
+
 def format_logs_for_gpt(parsed_logs: list[dict]) -> str:
     """
     Formats parsed logs into a string suitable for GPT input.
@@ -49,8 +140,67 @@ def format_logs_for_gpt(parsed_logs: list[dict]) -> str:
         provider = log.get("ProviderName", "Unknown Provider")
         event_id = log.get("Id", "Unknown ID")
         message = log.get("Message", "No message provided")
+        host = log.get("Host")
 
-        entry = f"[{timestamp}] {provider} (Event ID {event_id}): {message}"
+        if host:
+            # events collected from several machines name their source
+            entry = f"[{timestamp}] {provider} (Event ID {event_id}) on {host}: {message}"
+        else:
+            entry = f"[{timestamp}] {provider} (Event ID {event_id}): {message}"
         formatted_logs.append(entry)
 
     return "\n\n".join(formatted_logs)
+
+
+def parse_json_logs(raw_json: str) -> list[dict]:
+    """
+    Parses ConvertTo-Json output from Get-WinEvent into a list of dictionaries.
+
+    Accepts either a JSON array, a single object (PowerShell emits one when
+    only one event matched) or one compressed object per line.
+
+    Args:
+        raw_json (str): JSON output from PowerShell.
+
+    Returns:
+        list: List of dictionaries containing parsed log entries.
+    """
+    raw_json = raw_json.strip()
+    if not raw_json:
+        return []
+
+    try:
+        data = json.loads(raw_json)
+    except json.JSONDecodeError:
+        # fall back to line-delimited JSON
+        data = [json.loads(line) for line in raw_json.splitlines() if line.strip()]
+
+    if isinstance(data, dict):
+        data = [data]
+
+    return [normalize_record(record) for record in data if record]
+
+
+def normalize_record(record: dict) -> dict:
+    """
+    Cleans up a record decoded from PowerShell JSON.
+
+    Args:
+        record (dict): A decoded event object.
+
+    Returns:
+        dict: The record with TimeCreated as a string and no null messages.
+    """
+    created = record.get("TimeCreated")
+    if isinstance(created, str):
+        match = _MS_DATE_PATTERN.match(created)
+        if match:
+            dt = datetime.fromtimestamp(int(match.group(1)) / 1000, tz=timezone.utc)
+            record["TimeCreated"] = dt.astimezone().strftime(DATETIME_FORMAT)
+
+    if record.get("Message") is None:
+        record["Message"] = ""
+    else:
+        record["Message"] = record["Message"].strip()
+
+    return record
@@ -0,0 +1,207 @@
+# utils/powershell_session.py
+import atexit  # close the shared session on exit
+import base64  # frame commands as single lines
+import queue  # hand stdout lines from the reader thread to callers
+import secrets  # per-session end-of-response marker
+import subprocess  # run the long-lived PowerShell process
+import threading
+import time
+from typing import Optional
+
+# PowerShell loop run by the worker: one base64 UTF-8 command per stdin line,
+# the output lines, then an end marker carrying the status (0 = ok, 1 = error)
+WORKER_SCRIPT = """
+[Console]::OutputEncoding = [Text.Encoding]::UTF8
+$ErrorActionPreference = 'Stop'
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    $status = 0
+    try {
+        $command = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String($line))
+        Invoke-Expression $command | Out-String -Stream -Width 4096 | ForEach-Object { [Console]::Out.WriteLine($_) }
+    } catch {
+        $status = 1
+        [Console]::Out.WriteLine($_.Exception.Message)
+    }
+    [Console]::Out.WriteLine("<<<END:__MARKER__:$status>>>")
+    [Console]::Out.Flush()
+}
+"""
+
+
+class PowerShellSessionError(RuntimeError):
+    """Raised when the worker process can't be started or keeps crashing."""
+
+
+class PowerShellSession:
+    """
+    A long-lived PowerShell worker that runs commands without per-call startup.
+
+    Commands are sent over stdin as one base64 line each; the worker answers
+    with the output lines followed by an end marker. A crashed worker is
+    restarted and the command retried once, and a command that runs past its
+    timeout kills the worker so the next call starts fresh.
+
+    run() has the same signature and error behavior as run_powershell, so it
+    can be passed as the runner to fetch_event_records.
+
+    Args:
+        argv (Optional[list[str]]): Command line of the worker. Defaults to
+            PowerShell running WORKER_SCRIPT. Any process that speaks the same
+            protocol (e.g. a small Python script in tests) can stand in.
+        timeout (float): Default seconds to wait for a command's response
+        marker (Optional[str]): End-of-response marker. Generated when argv is
+            None; a custom worker must use the one it is given.
+    """
+
+    def __init__(self,
+                 argv: Optional[list[str]] = None,
+                 timeout: float = 60.0,
+                 marker: Optional[str] = None):
+        self.marker = marker or secrets.token_hex(8)
+        if argv is None:
+            script = WORKER_SCRIPT.replace("__MARKER__", self.marker)
+            encoded = base64.b64encode(script.encode("utf-16-le")).decode("ascii")
+            argv = ["powershell", "-NoProfile", "-NoLogo", "-NonInteractive",
+                    "-EncodedCommand", encoded]
+        self.argv = argv
+        self.timeout = timeout
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: Optional[queue.Queue] = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    # process management
+
+    def start(self):
+        """Starts the worker if it isn't already running."""
+        if self.alive:
+            return
+        try:
+            self._process = subprocess.Popen(
+                self.argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1
+            )
+        except OSError as e:
+            raise PowerShellSessionError(f"Could not start PowerShell worker: {e}")
+
+        # a reader thread lets run() wait on stdout with a timeout
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_stdout,
+                         args=(self._process, self._lines),
+                         daemon=True).start()
+
+    @staticmethod
+    def _read_stdout(process: subprocess.Popen, lines: queue.Queue):
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)  # EOF: the worker exited
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def close(self):
+        """Stops the worker."""
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+            process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # requests
+
+    def run(self, command: str, timeout: Optional[float] = None) -> str:
+        """
+        Runs a PowerShell command in the worker and returns its stdout.
+
+        Args:
+            command (str): The PowerShell command to run.
+            timeout (Optional[float]): Seconds to wait; defaults to self.timeout.
+
+        Returns:
+            str: Standard output of the command.
+
+        Raises:
+            subprocess.CalledProcessError: If the command raised an error.
+            subprocess.TimeoutExpired: If no response arrived in time.
+            PowerShellSessionError: If the worker crashed twice in a row.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            for attempt in range(2):
+                self.start()
+                try:
+                    status, output = self._request(command, timeout)
+                except EOFError:
+                    # the worker died mid-request: restart and retry once
+                    self.close()
+                    self.restarts += 1
+                    continue
+                if status != 0:
+                    raise subprocess.CalledProcessError(status, command, output=output)
+                return output
+
+        raise PowerShellSessionError("PowerShell worker exited while running the command.")
+
+    def _request(self, command: str, timeout: float) -> tuple[int, str]:
+        frame = base64.b64encode(command.encode("utf-8")).decode("ascii")
+        try:
+            self._process.stdin.write(frame + "\n")
+            self._process.stdin.flush()
+        except OSError:
+            raise EOFError
+
+        end_prefix = f"<<<END:{self.marker}:"
+        deadline = time.monotonic() + timeout
+        output = []
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = self._lines.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                # the worker is stuck; kill it so the next call starts clean
+                self._process.kill()
+                self.close()
+                raise subprocess.TimeoutExpired(command, timeout)
+            if line is None:
+                raise EOFError
+            if line.startswith(end_prefix):
+                status = int(line[len(end_prefix):].strip().rstrip(">") or 0)
+                return status, "".join(output)
+            output.append(line)
+
+
+# shared session for the interactive program
+_default_session: Optional[PowerShellSession] = None
+
+
+def get_default_session() -> PowerShellSession:
+    """
+    Returns a process-wide PowerShell session, creating it on first use.
+
+    Returns:
+        PowerShellSession: The shared session. It is closed at exit.
+    """
+    global _default_session
+    if _default_session is None:
+        _default_session = PowerShellSession()
+        atexit.register(_default_session.close)
+    return _default_session
@@ -0,0 +1,181 @@
+# utils/profiling.py
+import contextlib
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional
+
+from colorama import init, Fore, Style  # colored output for console
+
+from utils.metrics import add_stage_hook, remove_stage_hook
+
+# Initialize colorama for colored output
+init(autoreset=True)
+
+# default folder for profile files
+DEFAULT_PROFILE_DIR = "profiles"
+
+# seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+
+def _frame_label(code) -> str:
+    # flamegraph frames read like 'parse_logs (parse_logs.py:13)'
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class PipelineProfiler:
+    """
+    Profiles a run, or only chosen stages of it, two ways at once.
+
+    cProfile records every call on the main thread, for exact call counts
+    and per-function times (.pstats, readable with pstats or snakeviz). A
+    sampler thread records the stack of every thread each few milliseconds,
+    so work in worker threads (fleet hosts, shards, summary chunks) shows up
+    too; the samples are saved as collapsed stacks (.folded) for
+    flamegraph.pl, speedscope or inferno. Both only run while a chosen stage
+    is running, or for the whole run if no stages are chosen.
+
+    Args:
+        stages (Optional[Iterable[str]]): Stage names to profile, e.g.
+            ['parse', 'export']; None profiles everything between start() and stop().
+        interval (float): Seconds between stack samples.
+    """
+
+    def __init__(self, stages: Optional[Iterable[str]] = None, interval: float = SAMPLE_INTERVAL):
+        self.stages = {name.lower() for name in stages} if stages else None
+        self.interval = interval
+        import cProfile  # deterministic profiler for the .pstats file; most runs never load it
+        self.profile = cProfile.Profile()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._active = 0  # chosen stages running in any thread
+        self._main_depth = 0  # chosen stages running on the main thread
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Starts the sampler thread and, without chosen stages, both profilers.
+        """
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._sampler.start()
+        if self.stages is None:
+            self._enter()
+        else:
+            add_stage_hook(self._hook)
+
+    def stop(self):
+        """
+        Stops profiling.
+        """
+        if self.stages is None:
+            self._exit()
+        else:
+            remove_stage_hook(self._hook)
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _hook(self, name: str):
+        if name.lower() not in self.stages:
+            return None
+        return self._profiled()
+
+    @contextlib.contextmanager
+    def _profiled(self):
+        self._enter()
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def _enter(self):
+        with self._lock:
+            self._active += 1
+            # one Profile can't follow several threads, so cProfile stays on the main thread
+            if threading.current_thread() is threading.main_thread():
+                self._main_depth += 1
+                if self._main_depth == 1:
+                    self.profile.enable()
+
+    def _exit(self):
+        with self._lock:
+            self._active -= 1
+            if threading.current_thread() is threading.main_thread():
+                self._main_depth -= 1
+                if self._main_depth == 0:
+                    self.profile.disable()
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if not self._active:
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """
+        Returns the samples as collapsed stacks, one 'thread;outer;...;inner count' line each.
+
+        Returns:
+            str: Text for flamegraph.pl, speedscope or inferno.
+        """
+        return "".join(f"{stack} {samples}\n" for stack, samples in self.stacks.most_common())
+
+    def save(self, directory: str = DEFAULT_PROFILE_DIR, name: Optional[str] = None) -> tuple[str, str]:
+        """
+        Writes the .pstats and .folded files.
+
+        Args:
+            directory (str): Folder for the files, created if missing.
+            name (Optional[str]): File name without extension; defaults to
+                profile-YYYYMMDD-HHMMSS.
+
+        Returns:
+            tuple[str, str]: Paths of the .pstats and .folded files.
+        """
+        os.makedirs(directory, exist_ok=True)
+        name = name or datetime.now().strftime("profile-%Y%m%d-%H%M%S")
+        base = os.path.join(directory, name)
+        self.profile.dump_stats(f"{base}.pstats")
+        with open(f"{base}.folded", "w", encoding="utf-8") as f:
+            f.write(self.folded())
+        return f"{base}.pstats", f"{base}.folded"
+
+    def report(self, paths: tuple[str, str]):
+        """
+        Prints where the profiles were saved and how to open them.
+
+        Args:
+            paths (tuple[str, str]): Paths returned by save().
+        """
+        pstats_path, folded_path = paths
+        print(f"{Fore.LIGHTWHITE_EX}🔬 Profile saved to: {Style.RESET_ALL}{Fore.LIGHTYELLOW_EX + Style.BRIGHT}"
+              f"{os.path.abspath(pstats_path)}")
+        print(f"{Fore.LIGHTWHITE_EX}🔥 Flamegraph stacks ({self.samples} samples) saved to: {Style.RESET_ALL}"
+              f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}{os.path.abspath(folded_path)}")
+        print(f"{Fore.LIGHTWHITE_EX}   Open with: python -m pstats {pstats_path}   |   "
+              f"flamegraph.pl {folded_path} > flame.svg\n")
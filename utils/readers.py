@@ -0,0 +1,147 @@
+# utils/readers.py
+import csv
+import json
+import os
+from typing import Iterator
+
+from utils.columnar import iter_columnar_records
+from utils.compression import open_text, split_compression
+
+# CSV columns restored to integers on reading
+INTEGER_COLUMNS = ("Id", "Level", "RecordId")
+
+# characters read per step when streaming a JSON array
+READ_SIZE = 1 << 16
+
+
+def iter_jsonl(path: str) -> Iterator[dict]:
+    """
+    Reads a JSON Lines export one record at a time.
+
+    Args:
+        path (str): Path to a .jsonl file, optionally .gz/.zst compressed.
+
+    Yields:
+        dict: One log per non-blank line.
+    """
+    with open_text(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_csv(path: str) -> Iterator[dict]:
+    """
+    Reads a CSV export one row at a time.
+
+    Empty cells are dropped and Id, Level and RecordId are turned back into
+    integers, so rows look like the logs that were exported.
+
+    Args:
+        path (str): Path to a .csv file, optionally .gz/.zst compressed.
+
+    Yields:
+        dict: One log per row.
+    """
+    with open_text(path, newline='') as f:
+        for row in csv.DictReader(f):
+            log = {key: value for key, value in row.items() if value != ""}
+            for column in INTEGER_COLUMNS:
+                value = log.get(column)
+                if value is not None and value.lstrip("-").isdigit():
+                    log[column] = int(value)
+            yield log
+
+
+def iter_json(path: str) -> Iterator[dict]:
+    """
+    Reads a JSON array export one element at a time, without loading the whole file.
+
+    Args:
+        path (str): Path to a .json file, optionally .gz/.zst compressed.
+
+    Yields:
+        dict: One log per array element.
+
+    Raises:
+        ValueError: If the file isn't a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    with open_text(path) as f:
+        buffer = f.read(READ_SIZE).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"{path} is not a JSON array")
+        pos = 1
+        eof = False
+
+        while True:
+            # skip whitespace and the separator before the next element
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                buffer, pos = f.read(READ_SIZE), 0
+                eof = not buffer
+
+            if pos >= len(buffer) or buffer[pos] == "]":
+                return
+
+            try:
+                log, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # the element continues past the buffer; read more and retry
+                chunk = f.read(READ_SIZE)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+
+            yield log
+            pos = end
+
+
+# extension -> reader
+READERS = {
+    ".jsonl": iter_jsonl,
+    ".json": iter_json,
+    ".csv": iter_csv,
+    ".parquet": iter_columnar_records,
+    ".arrow": iter_columnar_records,
+}
+
+
+def iter_records(path: str) -> Iterator[dict]:
+    """
+    Reads any .jsonl, .json or .csv export (optionally compressed), or a
+    .parquet/.arrow export, one record at a time.
+
+    Args:
+        path (str): Path to the export file.
+
+    Yields:
+        dict: The exported logs, in file order.
+
+    Raises:
+        ValueError: If the file type has no reader.
+    """
+    extension = os.path.splitext(split_compression(path)[0])[1].lower()
+    reader = READERS.get(extension)
+    if reader is None:
+        raise ValueError(f"Can't read {extension or 'this'} files; "
+                         "use .jsonl, .json, .csv, .parquet or .arrow")
+    return reader(path)
+
+
+def read_records(path: str) -> list[dict]:
+    """
+    Reads a whole export into a list.
+
+    Args:
+        path (str): Path to the export file.
+
+    Returns:
+        list[dict]: The exported logs.
+    """
+    return list(iter_records(path))
@@ -0,0 +1,244 @@
+# utils/search_logs.py
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import compress
+from typing import Iterable, Iterator, Optional, Union
+
+# words indexed and matched; lowercase letters, digits and underscores
+_TOKEN = re.compile(r"\w+")
+
+# query parts: "quoted phrases", /regex/, or single words (a trailing * matches prefixes)
+_QUERY_PART = re.compile(r'"([^"]*)"|/((?:[^/\\]|\\.)+)/|(\S+)')
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits text into lowercase word tokens.
+
+    Args:
+        text (str): A message or query.
+
+    Returns:
+        list[str]: The tokens, in order.
+    """
+    return _TOKEN.findall(text.lower())
+
+
+def parse_query(query: str) -> tuple[list[str], list[str], list[str]]:
+    """
+    Splits a search query into words, phrases and regular expressions.
+
+    Args:
+        query (str): e.g. 'disk "not responding" /error 0x[0-9a-f]+/ net*'
+
+    Returns:
+        tuple[list[str], list[str], list[str]]: (words, phrases, patterns).
+            Words are lowercase and may end in * for a prefix match.
+    """
+    words, phrases, patterns = [], [], []
+    for phrase, pattern, word in _QUERY_PART.findall(query):
+        if phrase:
+            if tokenize(phrase):
+                phrases.append(phrase)
+        elif pattern:
+            patterns.append(pattern)
+        else:
+            tokens = tokenize(word)
+            if tokens and word.endswith("*"):
+                tokens[-1] += "*"
+            words.extend(tokens)
+    return words, phrases, patterns
+
+
+def phrase_pattern(phrase: str) -> re.Pattern:
+    """
+    Compiles a phrase into a case-insensitive pattern matching its words in order.
+
+    Args:
+        phrase (str): e.g. 'not responding'
+
+    Returns:
+        re.Pattern: Matches the words as whole words, separated by any punctuation or spaces.
+    """
+    words = [re.escape(token) for token in tokenize(phrase)]
+    return re.compile(r"(?<!\w)" + r"\W+".join(words) + r"(?!\w)", re.IGNORECASE)
+
+
+def _compile(patterns: list[str], phrases: list[str],
+             pattern: Union[str, re.Pattern, None], flags: int) -> list[re.Pattern]:
+    compiled = [phrase_pattern(phrase) for phrase in phrases]
+    compiled.extend(re.compile(p, flags) for p in patterns)
+    if pattern is not None:
+        compiled.append(pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags))
+    return compiled
+
+
+class LogSearchIndex:
+    """
+    Inverted index from message words to the logs containing them.
+
+    Built once per result set; each search then intersects posting lists
+    (smallest first) instead of rereading every message. Phrases and
+    regular expressions are only checked against the logs left after the
+    word lookup (a phrase's own words narrow it too), and scanning stops as
+    soon as enough matches are found.
+
+    Args:
+        logs (Iterable[dict]): Parsed logs (dicts, Events or an EventTable).
+        field (str): The field to index.
+    """
+
+    def __init__(self, logs: Iterable[dict], field: str = "Message"):
+        self.logs = list(logs)
+        self.field = field
+        postings = defaultdict(list)
+        findall = _TOKEN.findall
+        for position, log in enumerate(self.logs):
+            for token in set(findall(str(log.get(field) or "").lower())):
+                postings[token].append(position)
+        # 4-byte positions take half the memory of lists of ints
+        self.postings: dict[str, array] = {token: array("I", positions)
+                                           for token, positions in postings.items()}
+        self._vocabulary: Optional[list[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.logs)
+
+    def lookup(self, word: str) -> array:
+        """
+        Returns the positions of the logs containing a word, in log order.
+
+        Args:
+            word (str): A lowercase token; a trailing * matches every token with that prefix.
+
+        Returns:
+            array: Sorted log positions.
+        """
+        if not word.endswith("*"):
+            return self.postings.get(word, array("I"))
+
+        prefix = word[:-1]
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        # mark matching logs in a bitmap rather than merging sorted lists
+        matched = bytearray(len(self.logs))
+        for token in self._vocabulary[bisect_left(self._vocabulary, prefix):]:
+            if not token.startswith(prefix):
+                break
+            for position in self.postings[token]:
+                matched[position] = 1
+        return array("I", compress(range(len(self.logs)), matched))
+
+    def candidates(self, words: list[str], phrases: list[str] = ()) -> Optional[Iterable[int]]:
+        """
+        Intersects the posting lists of every word, including the words of phrases.
+
+        Args:
+            words (list[str]): Query words.
+            phrases (list[str]): Query phrases.
+
+        Returns:
+            Optional[Iterable[int]]: Sorted positions of logs containing every
+                word, or None if the query has no words (every log is a candidate).
+        """
+        terms = list(words)
+        for phrase in phrases:
+            terms.extend(tokenize(phrase))
+        if not terms:
+            return None
+
+        postings = sorted((self.lookup(term) for term in set(terms)), key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if not result:
+                break
+            posting_set = set(posting)
+            result = [position for position in result if position in posting_set]
+        return result
+
+    def search(self,
+               query: str = "",
+               pattern: Union[str, re.Pattern, None] = None,
+               limit: Optional[int] = None,
+               flags: int = re.IGNORECASE) -> list[dict]:
+        """
+        Finds the logs whose messages match a query and/or a regular expression.
+
+        Args:
+            query (str): Words (all must appear), "quoted phrases", /regular
+                expressions/ and prefix* words, e.g. 'disk "not responding"'.
+            pattern (Union[str, re.Pattern, None]): Another regular expression to match.
+            limit (Optional[int]): Stop after this many matches.
+            flags (int): Flags for compiling string patterns.
+
+        Returns:
+            list[dict]: Matching logs, in their original order.
+        """
+        words, phrases, patterns = parse_query(query)
+        compiled = _compile(patterns, phrases, pattern, flags)
+
+        positions = self.candidates(words, phrases)
+        if positions is None:
+            positions = range(len(self.logs))
+        if not compiled:
+            return [self.logs[position] for position in positions[:limit]]
+        logs = (self.logs[position] for position in positions)
+        return list(scan_logs(logs, compiled, limit, self.field))
+
+
+def scan_logs(logs: Iterable[dict],
+              patterns: list[re.Pattern],
+              limit: Optional[int] = None,
+              field: str = "Message") -> Iterator[dict]:
+    """
+    Yields the logs whose field matches every pattern.
+
+    Args:
+        logs (Iterable[dict]): Logs to scan, in order.
+        patterns (list[re.Pattern]): Compiled regular expressions, all of which must match.
+        limit (Optional[int]): Stop scanning after this many matches.
+        field (str): The field to match.
+
+    Yields:
+        dict: Matching logs.
+    """
+    if limit is not None and limit <= 0:
+        return
+    found = 0
+    for log in logs:
+        text = str(log.get(field) or "")
+        if all(pattern.search(text) for pattern in patterns):
+            yield log
+            found += 1
+            if found == limit:
+                return
+
+
+def search_logs(logs: Iterable[dict],
+                query: str = "",
+                pattern: Union[str, re.Pattern, None] = None,
+                limit: Optional[int] = None,
+                flags: int = re.IGNORECASE) -> list[dict]:
+    """
+    Searches log messages once, without keeping an index.
+
+    Regular expressions and phrases alone are scanned directly, stopping at
+    limit; queries with plain words build a LogSearchIndex first. Keep the index
+    (or use LogSearchIndex directly) to search the same logs repeatedly.
+
+    Args:
+        logs (Iterable[dict]): Parsed logs (dicts, Events or an EventTable).
+        query (str): Words, "quoted phrases", /regular expressions/ and prefix* words.
+        pattern (Union[str, re.Pattern, None]): Another regular expression to match.
+        limit (Optional[int]): Stop after this many matches.
+        flags (int): Flags for compiling string patterns.
+
+    Returns:
+        list[dict]: Matching logs, in their original order.
+    """
+    words, phrases, patterns = parse_query(query)
+    if words:
+        return LogSearchIndex(logs).search(query, pattern, limit, flags)
+    return list(scan_logs(logs, _compile(patterns, phrases, pattern, flags), limit))
@@ -0,0 +1,134 @@
+# utils/session_cache.py
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from utils.event_record import to_events
+from utils.search_logs import LogSearchIndex
+
+
+class QueryResult:
+    """
+    One query of an interactive session: its filters, events and GPT summary.
+
+    Events are stored as compact Event records, and the summary is filled in
+    once the user asks for it, so reopening the query never repeats either.
+    The message search index is built on the first search and kept too.
+
+    Args:
+        filters (dict): The filters the events were fetched with.
+        logs (Iterable[dict]): The fetched events.
+    """
+    __slots__ = ("filters", "logs", "summary", "_index")
+
+    def __init__(self, filters: dict, logs: Iterable[dict]):
+        self.filters = filters
+        self.logs = list(to_events(logs))
+        self.summary: Optional[str] = None
+        self._index: Optional[LogSearchIndex] = None
+
+    def search(self, query: str) -> list:
+        """
+        Searches the messages of the stored events.
+
+        Args:
+            query (str): A query for LogSearchIndex.search.
+
+        Returns:
+            list: Matching events, in their original order.
+
+        Raises:
+            re.error: If a /regular expression/ in the query is invalid.
+        """
+        if self._index is None:
+            self._index = LogSearchIndex(self.logs)
+        return self._index.search(query)
+
+    def describe(self) -> str:
+        """
+        Returns a one-line description of the query for menus.
+
+        Returns:
+            str: e.g. "System, 06/25/2025 12:00:00 AM → 06/25/2025 04:00:00 PM, level 2 (42 logs)"
+        """
+        f = self.filters
+        parts = [f.get("log_type", "?"), f"{f.get('start_time')} → {f.get('end_time')}"]
+        if f.get("level") is not None:
+            parts.append(f"level {f['level']}")
+        if f.get("provider_name"):
+            parts.append(f["provider_name"])
+        if f.get("event_ids"):
+            parts.append("IDs " + ",".join(str(i) for i in f["event_ids"]))
+        return f"{', '.join(parts)} ({len(self.logs)} logs)"
+
+
+class QueryCache:
+    """
+    Keeps the most recent query results of a session, least recently used dropped first.
+
+    Bounding the cache is what keeps memory flat over long sessions: once a
+    result falls out, nothing else holds on to its events.
+
+    Args:
+        max_entries (int): Number of results to keep.
+    """
+
+    def __init__(self, max_entries: int = 5):
+        self.max_entries = max(1, max_entries)
+        self._results: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def make_key(filters: dict) -> tuple:
+        return tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                            for name, value in filters.items()))
+
+    def get(self, filters: dict) -> Optional[QueryResult]:
+        """
+        Returns the cached result for exactly these filters, or None.
+
+        Args:
+            filters (dict): Query filters.
+
+        Returns:
+            Optional[QueryResult]: The cached result, marked as most recently used.
+        """
+        key = self.make_key(filters)
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+        return result
+
+    def put(self, filters: dict, logs: Iterable[dict]) -> QueryResult:
+        """
+        Caches the events of a query, evicting the least recently used result if full.
+
+        Args:
+            filters (dict): Query filters.
+            logs (Iterable[dict]): The fetched events.
+
+        Returns:
+            QueryResult: The new cached result.
+        """
+        key = self.make_key(filters)
+        result = self._results[key] = QueryResult(filters, logs)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        return result
+
+    def touch(self, result: QueryResult):
+        """Marks a result as most recently used."""
+        key = self.make_key(result.filters)
+        if key in self._results:
+            self._results.move_to_end(key)
+
+    def recent(self) -> list[QueryResult]:
+        """
+        Returns the cached results, most recently used first.
+
+        Returns:
+            list[QueryResult]: Cached results.
+        """
+        return list(reversed(self._results.values()))
+
+    def __len__(self) -> int:
+        return len(self._results)
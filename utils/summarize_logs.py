@@ -1,73 +1,436 @@
 import os  # allows access to env variables
-from dotenv import load_dotenv  # loads env variables from .env file
-from openai import OpenAI  # OpenAI API client
+import threading  # guards client creation
+import zlib  # stable hashes for content-defined chunk boundaries
+from functools import partial
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor  # summarize chunks concurrently
 from colorama import init, Fore, Style  # for colored terminal output
 
+from utils.cluster_logs import cluster_logs, format_cluster, format_cluster_counts, format_clusters_for_gpt
+from utils.metrics import count
+from utils.parse_logs import format_logs_for_gpt
+
 # Initialize colorama for colored output
 init(autoreset=True)
 
-# load API key from .env file
-load_dotenv()
+# OpenAI client, created on first use by get_client()
+client = None
+_client_lock = threading.Lock()
 
-# prompt user for API key to configure OpenAI client
-api_key = os.getenv("OPENAI_API_KEY")
 
-if not api_key:
-    print(Fore.RED + Style.BRIGHT + "⚠️  No OpenAI API key found.\n")
-    print(Fore.LIGHTYELLOW_EX + Style.BRIGHT +
-          "💡 Tip: You can create a '.env' file and add:")
-    print(Fore.LIGHTWHITE_EX + "OPENAI_API_KEY=your-api-key-here\n")
+def get_api_key() -> str:
+    """
+    Returns the OpenAI API key from the environment or .env, prompting for it if missing.
 
-    while not api_key:
-        api_key = input(Fore.LIGHTWHITE_EX +
-                        "🔑 Please enter your OpenAI API key: ").strip()
-        if not api_key:
-            print(Fore.RED + Style.BRIGHT +
-                  "❌ API key is required to proceed.\n")
+    A key entered at the prompt is saved to .env for future runs.
 
-    # save api_key to .env
-    try:
-        with open(".env", "a") as env_file:
-            env_file.write(f"\nOPENAI_API_KEY={api_key}\n")
-        print(Fore.GREEN + "✅ Your API key was saved to .env for future use.\n")
-    except Exception as e:
-        print(Fore.RED + f"⚠️  Could not save API key to .env: {e}\n")
+    Returns:
+        str: The API key.
+    """
+    from dotenv import load_dotenv  # loads env variables from .env file
+
+    # load API key from .env file
+    load_dotenv()
+    api_key = os.getenv("OPENAI_API_KEY")
+
+    if not api_key:
+        print(Fore.RED + Style.BRIGHT + "⚠️  No OpenAI API key found.\n")
+        print(Fore.LIGHTYELLOW_EX + Style.BRIGHT +
+              "💡 Tip: You can create a '.env' file and add:")
+        print(Fore.LIGHTWHITE_EX + "OPENAI_API_KEY=your-api-key-here\n")
 
-client = OpenAI(api_key=api_key)
+        while not api_key:
+            api_key = input(Fore.LIGHTWHITE_EX +
+                            "🔑 Please enter your OpenAI API key: ").strip()
+            if not api_key:
+                print(Fore.RED + Style.BRIGHT +
+                      "❌ API key is required to proceed.\n")
 
+        # save api_key to .env
+        try:
+            with open(".env", "a") as env_file:
+                env_file.write(f"\nOPENAI_API_KEY={api_key}\n")
+            print(Fore.GREEN + "✅ Your API key was saved to .env for future use.\n")
+        except Exception as e:
+            print(Fore.RED + f"⚠️  Could not save API key to .env: {e}\n")
 
-def summarize_logs(log_string: str) -> str:
+        # later lookups in this process shouldn't prompt again
+        os.environ["OPENAI_API_KEY"] = api_key
+
+    return api_key
+
+
+def get_client():
+    """
+    Returns the shared OpenAI client, creating it on first use.
+
+    openai is a heavy import, so it is only loaded when something is
+    actually summarized; runs that never summarize don't pay for it.
+
+    Returns:
+        OpenAI: The client.
+    """
+    global client
+    # chunk summaries start in worker threads; only one of them should prompt
+    with _client_lock:
+        if client is None:
+            from openai import OpenAI  # OpenAI API client
+            client = OpenAI(api_key=get_api_key())
+    return client
+
+# default model and prompts
+DEFAULT_MODEL = "gpt-3.5-turbo"
+SYSTEM_PROMPT = "You are an expert at summarizing Windows Event Viewer logs into clear, concise reports."
+SUMMARY_PROMPT = "Please summarize the following logs:\n\n"
+CHUNK_PROMPT = "Please summarize the following logs. This is one part of a larger set; keep notable event IDs, providers, counts and times:\n\n"
+REDUCE_PROMPT = "The following are summaries of consecutive parts of one set of Windows event logs. Combine them into a single clear, concise report:\n\n"
+
+# rough characters per token for English/log text
+CHARS_PER_TOKEN = 4
+
+
+def chat_completion(prompt: str,
+                    model: str = DEFAULT_MODEL,
+                    max_tokens: int = 500,
+                    temperature: float = 0.5,
+                    cache=None) -> str:
+    """
+    Sends one prompt to the chat completions API and returns the reply text.
+
+    Args:
+        prompt (str): The user message.
+        model (str): The model name.
+        max_tokens (int): Maximum tokens in the reply.
+        temperature (float): Sampling temperature.
+        cache (Optional[SummaryCache]): Reuse an earlier reply to the same request.
+
+    Returns:
+        str: The reply text.
+    """
+    key = None
+    if cache is not None:
+        key = cache.make_key(f"{SYSTEM_PROMPT}\n{prompt}", model,
+                             max_tokens=max_tokens, temperature=temperature)
+        cached = cache.get(key)
+        if cached is not None:
+            count("summarize", "cache_hits")
+            return cached
+
+    request = dict(
+        model=model,
+
+        messages=[
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        max_tokens=max_tokens,
+        temperature=temperature
+    )
+
+    completions = get_client().chat.completions
+    # the raw response tells how many times the client retried (rate limits, timeouts)
+    raw = getattr(completions, "with_raw_response", None)
+    if raw is not None:
+        raw_response = raw.create(**request)
+        count("summarize", "retries", getattr(raw_response, "retries_taken", 0))
+        response = raw_response.parse()
+    else:
+        response = completions.create(**request)
+
+    count("summarize", "requests")
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        count("summarize", "tokens_in", usage.prompt_tokens or 0)
+        count("summarize", "tokens_out", usage.completion_tokens or 0)
+
+    content = response.choices[0].message.content
+    if key is not None and content:
+        cache.put(key, content)
+    return content
+
+
+def summarize_logs(log_string, model: str = DEFAULT_MODEL, cache=None, max_tokens: int = 500) -> str:
     """
     Summarizes the provided log string using OpenAI's GPT model.
 
     Args:
-        log_string (str): The string containing logs to be summarized.
+        log_string (str): The string containing logs to be summarized. Parsed
+            logs (a list of dicts or an EventTable) are formatted first.
+        model (str): The model name.
+        cache (Optional[SummaryCache]): Reuse an earlier summary of the same logs.
+        max_tokens (int): Maximum tokens in the reply.
 
     Returns:
         str: Summary of the logs.
     """
+    if not isinstance(log_string, str) and log_string is not None:
+        log_string = format_logs_for_gpt(log_string)
+
     if not log_string:
         return "No logs provided for summarization."
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at summarizing Windows Event Viewer logs into clear, concise reports."
-                },
-                {
-                    "role": "user",
-                    "content": f"Please summarize the following logs:\n\n{log_string}"
-                }
-            ],
-            max_tokens=500,
-            temperature=0.5
-        )
-
-        return response.choices[0].message.content
+        return chat_completion(f"{SUMMARY_PROMPT}{log_string}", model=model, max_tokens=max_tokens,
+                               cache=cache)
+
+    except Exception as e:
+        return f"Error summarizing logs: {str(e)}"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in text without calling the API.
+
+    Uses tiktoken when it is installed, otherwise about four characters per token.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: Estimated token count.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken  # optional, more accurate token counts
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    return _encoding or None
+
+
+def chunk_logs(parsed_logs,
+               token_budget: int = 3000,
+               content_defined: bool = False,
+               format_entry=None) -> list[list]:
+    """
+    Splits parsed logs into consecutive chunks that each fit a token budget.
+
+    Args:
+        parsed_logs: A list of parsed log dictionaries, Events or an EventTable.
+        token_budget (int): Maximum estimated tokens of formatted logs per chunk.
+            A single log larger than the budget gets a chunk of its own.
+        content_defined (bool): Also end a chunk after logs whose content hash
+            marks a boundary (once the chunk is at least half full). Boundaries
+            then follow the events rather than their positions, so adding or
+            dropping events at either end of a window leaves the other chunks,
+            and their cached summaries, unchanged.
+        format_entry (Optional[Callable[[dict], str]]): Formats one item for
+            the token estimate; defaults to a format_logs_for_gpt entry.
+
+    Returns:
+        list[list]: The chunks, in the original order.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    for log in parsed_logs:
+        entry = format_entry(log) if format_entry else format_logs_for_gpt([log])
+        tokens = estimate_tokens(entry) + 1
+        if current and current_tokens + tokens > token_budget:
+            chunks.append(current)
+            current = []
+            current_tokens = 0
+        current.append(log)
+        current_tokens += tokens
+
+        if (content_defined and current_tokens >= token_budget // 2
+                and zlib.crc32(entry.encode("utf-8")) % 8 == 0):
+            chunks.append(current)
+            current = []
+            current_tokens = 0
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def group_texts(texts: list[str], token_budget: int) -> list[list[str]]:
+    """
+    Groups consecutive texts so each group fits a token budget.
+
+    Args:
+        texts (list[str]): Texts such as partial summaries.
+        token_budget (int): Maximum estimated tokens per group.
+
+    Returns:
+        list[list[str]]: The groups, in order.
+    """
+    groups = []
+    current = []
+    current_tokens = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and current_tokens + tokens > token_budget:
+            groups.append(current)
+            current = []
+            current_tokens = 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def regroup(partials: list[str], previous: int, token_budget: int) -> list[list[str]]:
+    """
+    Groups merged summaries for the next reduce round, making sure there are fewer groups.
+
+    If the merges came back about as long as their budget, grouping alone
+    gives as many groups as before and the reduce would never finish, so
+    each summary is then cut to half the budget and they are merged in pairs.
+
+    Args:
+        partials (list[str]): Summaries returned by the last round.
+        previous (int): Number of groups in the last round.
+        token_budget (int): Maximum estimated tokens per group.
+
+    Returns:
+        list[list[str]]: The groups, in order.
+    """
+    groups = group_texts(partials, token_budget)
+    if len(groups) < previous:
+        return groups
+    limit = max(1, token_budget // 2) * CHARS_PER_TOKEN
+    trimmed = [text if len(text) <= limit else text[:limit].rstrip() + " …" for text in partials]
+    return [trimmed[i:i + 2] for i in range(0, len(trimmed), 2)]
+
+
+def reduce_prompt(summaries: list[str], stats_text: Optional[str] = None) -> str:
+    """
+    Builds the prompt that merges partial summaries into one report.
+
+    Args:
+        summaries (list[str]): Partial summaries, in log order.
+        stats_text (Optional[str]): Statistics of the whole log set, for the final merge.
+
+    Returns:
+        str: The prompt text.
+    """
+    joined = "\n\n".join(f"Part {i}:\n{text}" for i, text in enumerate(summaries, 1))
+    if stats_text:
+        return f"{REDUCE_PROMPT}{stats_text}\n\n{joined}"
+    return f"{REDUCE_PROMPT}{joined}"
+
+
+def log_stats_text(parsed_logs) -> Optional[str]:
+    """
+    Computes the statistics block (counts, rates and bursts) for a prompt.
+
+    Args:
+        parsed_logs: A list of parsed log dictionaries, Events or an EventTable.
+
+    Returns:
+        Optional[str]: The block, or None if there are no logs.
+    """
+    from utils.log_stats import log_stats_block  # numpy/pandas load only when statistics are used
+    return log_stats_block(parsed_logs)
+
+
+def summarize_logs_mapreduce(parsed_logs,
+                             model: str = DEFAULT_MODEL,
+                             chunk_tokens: int = 3000,
+                             reduce_tokens: int = 6000,
+                             max_workers: int = 4,
+                             max_tokens: int = 500,
+                             cache=None,
+                             cluster: bool = False,
+                             stats: bool = False) -> str:
+    """
+    Summarizes large log sets by summarizing token-budgeted chunks, then combining them.
+
+    Chunks are summarized concurrently (map). The partial summaries are then
+    merged (reduce); if they don't fit in reduce_tokens together they are
+    merged in groups, level by level, until one report remains. Inputs that
+    fit in a single chunk take one request, like summarize_logs.
+
+    With a cache, chunk boundaries are content-defined and every request is
+    looked up first, so re-summarizing a mostly unchanged window only sends
+    the chunks that changed plus the final merge.
+
+    With cluster=True, repeated events are first grouped by provider, event
+    ID and message template (see cluster_logs), and only one example per
+    group is sent to the model. A single request shows each group's count
+    and time span; chunks leave them out, so a new event only changes the
+    chunk holding its group, and the final merge gets the counts of the
+    busiest groups instead.
+
+    With stats=True, counts per level, provider and event ID, the event rate
+    and any bursts are computed over all the logs (see utils.log_stats) and
+    added to the single request or the final merge, so the model sees exact
+    totals without reading every row.
+
+    Args:
+        parsed_logs: A list of parsed log dictionaries, Events or an EventTable.
+        model (str): The model name.
+        chunk_tokens (int): Estimated token budget of logs per map request.
+        reduce_tokens (int): Estimated token budget of summaries per reduce request.
+        max_workers (int): Maximum number of requests in flight.
+        max_tokens (int): Maximum tokens per reply.
+        cache (Optional[SummaryCache]): Cache for chunk, merge and final replies.
+        cluster (bool): Deduplicate repeated events before summarizing.
+        stats (bool): Add a statistics block to the prompt.
+
+    Returns:
+        str: The final summary, or an error message.
+    """
+    stats_text = log_stats_text(parsed_logs) if stats and parsed_logs else None
+    final_text = stats_text
+    if cluster:
+        parsed_logs = cluster_logs(parsed_logs)
+        format_chunk = format_clusters_for_gpt
+        format_part = partial(format_clusters_for_gpt, counts=False)
+        format_entry = partial(format_cluster, counts=False)
+        final_text = "\n\n".join(filter(None, [stats_text, format_cluster_counts(parsed_logs)])) or None
+    else:
+        format_chunk = format_part = format_logs_for_gpt
+        format_entry = None
+
+    chunks = chunk_logs(parsed_logs, chunk_tokens, content_defined=cache is not None,
+                        format_entry=format_entry)
+    if not chunks:
+        return "No logs provided for summarization."
+    if len(chunks) == 1:
+        text = format_chunk(chunks[0])
+        return summarize_logs(f"{stats_text}\n\n{text}" if stats_text else text, model=model, cache=cache,
+                              max_tokens=max_tokens)
+
+    def summarize_chunk(chunk) -> str:
+        return chat_completion(f"{CHUNK_PROMPT}{format_part(chunk)}",
+                               model=model, max_tokens=max_tokens, cache=cache)
+
+    def combine(group: list[str], stats_text: Optional[str] = None) -> str:
+        return chat_completion(reduce_prompt(group, stats_text), model=model,
+                               max_tokens=max_tokens, cache=cache)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            partials = list(pool.map(summarize_chunk, chunks))
+
+            # reduce level by level until everything fits in one request
+            groups = group_texts(partials, reduce_tokens)
+            while len(groups) > 1:
+                partials = list(pool.map(combine, groups))
+                groups = regroup(partials, len(groups), reduce_tokens)
+
+        return combine(groups[0], final_text)
 
     except Exception as e:
         return f"Error summarizing logs: {str(e)}"
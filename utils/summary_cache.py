@@ -0,0 +1,152 @@
+# utils/summary_cache.py
+import atexit  # close the shared cache on exit
+import hashlib  # content-addressed keys
+import json
+import sqlite3  # persistent on-disk store
+import threading
+import time
+from typing import Optional
+
+# default location of the cache database
+DEFAULT_CACHE_PATH = ".summary_cache.sqlite3"
+
+
+class SummaryCache:
+    """
+    Persistent cache of GPT replies keyed by a hash of everything that shaped them.
+
+    Keys cover the normalized prompt text (which includes the formatted event
+    batch), the model and the request parameters, so an unchanged chunk of
+    events maps to the same entry across runs. Entries older than max_age are
+    dropped, and once there are more than max_entries the least recently used
+    ones go first. Hit and miss counts are kept for the life of the object.
+
+    Args:
+        path (str): SQLite database file; ':memory:' for a throwaway cache.
+        max_entries (int): Maximum number of cached replies.
+        max_age (float): Maximum age of an entry in seconds.
+    """
+
+    def __init__(self,
+                 path: str = DEFAULT_CACHE_PATH,
+                 max_entries: int = 2000,
+                 max_age: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # summaries may be requested from worker threads
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries (accessed)")
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(prompt: str, model: str, **params) -> str:
+        """
+        Builds the cache key for a request.
+
+        Args:
+            prompt (str): The full user prompt, including the formatted events.
+            model (str): The model name.
+            **params: Other request parameters, e.g. max_tokens, temperature.
+
+        Returns:
+            str: SHA-256 hex digest.
+        """
+        # normalize whitespace so cosmetic differences don't miss the cache
+        normalized = "\n".join(line.strip() for line in prompt.strip().splitlines())
+        payload = json.dumps({"prompt": normalized, "model": model, "params": params},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the cached summary for key, or None.
+
+        Args:
+            key (str): A key from make_key.
+
+        Returns:
+            Optional[str]: The cached summary if present and not expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, created FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE summaries SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, summary: str):
+        """
+        Stores a summary and evicts old entries if the cache is over its limits.
+
+        Args:
+            key (str): A key from make_key.
+            summary (str): The reply to cache.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, summary, now, now))
+            self._conn.commit()
+        self.evict()
+
+    def evict(self):
+        """Drops expired entries, then the least recently used ones over max_entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM summaries WHERE created < ?",
+                               (time.time() - self.max_age,))
+            self._conn.execute(
+                "DELETE FROM summaries WHERE key IN ("
+                " SELECT key FROM summaries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and the current number of entries.
+
+        Returns:
+            dict: {"hits": int, "misses": int, "entries": int}
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# shared cache for the interactive program
+_default_cache: Optional[SummaryCache] = None
+
+
+def get_default_cache() -> SummaryCache:
+    """
+    Returns a process-wide cache at DEFAULT_CACHE_PATH, opening it on first use.
+
+    Returns:
+        SummaryCache: The shared cache. It is closed at exit.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SummaryCache()
+        atexit.register(_default_cache.close)
+    return _default_cache
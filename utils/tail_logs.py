@@ -0,0 +1,266 @@
+# utils/tail_logs.py
+import hashlib  # short names for filter sets
+import json
+import os
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Iterator, Optional, Union
+from colorama import init, Fore, Style
+
+from utils.fetch_logs import STRUCTURED_SELECT, quote_powershell, run_powershell
+from utils.parse_logs import DATETIME_FORMAT, parse_json_logs, record_timestamp
+
+# Initialize colorama for colored output
+init(autoreset=True)
+
+# default location of the per-channel bookmarks
+DEFAULT_STATE_FILE = ".event_bookmarks.json"
+
+
+def load_bookmarks(state_file: str = DEFAULT_STATE_FILE) -> dict:
+    """
+    Loads saved bookmarks from the state file.
+
+    Args:
+        state_file (str): Path to the JSON state file.
+
+    Returns:
+        dict: {bookmark key: {"RecordId": int, "TimeCreated": str}}, empty if
+            the file doesn't exist or can't be read.
+    """
+    try:
+        with open(state_file, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_bookmarks(bookmarks: dict, state_file: str = DEFAULT_STATE_FILE):
+    """
+    Writes bookmarks to the state file, replacing it atomically.
+
+    Args:
+        bookmarks (dict): {bookmark key: {"RecordId": int, "TimeCreated": str}}
+        state_file (str): Path to the JSON state file.
+    """
+    tmp_path = f"{state_file}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(bookmarks, f, indent=2)
+    os.replace(tmp_path, state_file)
+
+
+def bookmark_key(log_type: str,
+                 level: Optional[int] = None,
+                 provider_name: Optional[str] = None,
+                 event_ids: Optional[list[int]] = None) -> str:
+    """
+    Names the bookmark of a channel and filter set.
+
+    A bookmark only moves past events that passed its filters, so tails of
+    one channel with different filters each keep their own bookmark instead
+    of skipping each other's events.
+
+    Args:
+        log_type (str): The log name, e.g., 'System', 'Application'
+        level (Optional[int]): Event level (1-5)
+        provider_name (Optional[str]): Name of the event provider
+        event_ids (Optional[list[int]]): List of specific event IDs
+
+    Returns:
+        str: The channel name when unfiltered, else 'Channel#<filter hash>'.
+    """
+    if level is None and not provider_name and not event_ids:
+        return log_type
+    filters = {"level": level, "provider_name": provider_name or None,
+               "event_ids": sorted(event_ids) if event_ids else None}
+    digest = hashlib.sha1(json.dumps(filters, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return f"{log_type}#{digest}"
+
+
+def build_xpath_filter(after_record_id: Optional[int] = None,
+                       start_time: Optional[str] = None,
+                       level: Optional[int] = None,
+                       provider_name: Optional[str] = None,
+                       event_ids: Optional[list[int]] = None) -> str:
+    """
+    Builds an XPath query for Get-WinEvent -FilterXPath.
+
+    FilterHashtable can't filter on EventRecordID, so tail mode uses XPath.
+
+    Args:
+        after_record_id (Optional[int]): Only events with a higher record id
+        start_time (str): Start time in MM/DD/YYYY HH:MM:SS AM/PM format
+        level (Optional[int]): Event level (1-5)
+        provider_name (Optional[str]): Name of the event provider
+        event_ids (Optional[list[int]]): List of specific event IDs
+
+    Returns:
+        str: XPath query string.
+    """
+    conditions = []
+    if after_record_id is not None:
+        conditions.append(f"(EventRecordID > {int(after_record_id)})")
+    if start_time:
+        start_dt = datetime.strptime(start_time, DATETIME_FORMAT).astimezone(timezone.utc)
+        conditions.append(
+            f"TimeCreated[@SystemTime>='{start_dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')}']")
+    if level is not None:
+        conditions.append(f"(Level={int(level)})")
+    if provider_name:
+        # XPath literals have no escapes, so quote with whichever quote the name doesn't contain
+        if "'" in provider_name and '"' not in provider_name:
+            conditions.append(f'Provider[@Name="{provider_name}"]')
+        else:
+            provider_name = provider_name.replace("'", "&apos;")
+            conditions.append(f"Provider[@Name='{provider_name}']")
+    if event_ids:
+        conditions.append("(" + " or ".join(f"EventID={int(eid)}" for eid in event_ids) + ")")
+
+    if not conditions:
+        return "*"
+    return f"*[System[{' and '.join(conditions)}]]"
+
+
+def fetch_new_events(log_type: str = "System",
+                     state_file: str = DEFAULT_STATE_FILE,
+                     start_time: Optional[str] = None,
+                     max_events: int = 1000,
+                     level: Optional[int] = None,
+                     provider_name: Optional[str] = None,
+                     event_ids: Optional[list[int]] = None,
+                     runner: Optional[Callable[[str], str]] = None) -> list[dict]:
+    """
+    Fetches only the events added to a channel since its saved bookmark.
+
+    Events are read oldest first after the bookmarked RecordId, and the
+    bookmark is advanced to the last event returned, so a capped batch is
+    picked up where it left off on the next call. Without a bookmark, events
+    from start_time are returned; without either, the bookmark is set to the
+    newest existing event and nothing is returned. Each channel and filter
+    set has its own bookmark (see bookmark_key).
+
+    If the channel was cleared, its record ids start again below the
+    bookmark; this is detected when a poll finds nothing, and the whole
+    channel is read again from its oldest event.
+
+    Args:
+        log_type (str): The log name, e.g., 'System', 'Application'
+        state_file (str): Path to the JSON bookmark file
+        start_time (str): Where to begin when there is no bookmark yet
+        max_events (int): Maximum number of events per call
+        level (Optional[int]): Event level (1-5)
+        provider_name (Optional[str]): Name of the event provider to filter logs
+        event_ids (Optional[list[int]]): List of specific event IDs to filter logs
+        runner (Optional[Callable[[str], str]]): Takes a PowerShell command and
+            returns its stdout. Defaults to run_powershell.
+
+    Returns:
+        list[dict]: New event records, oldest first.
+    """
+    runner = runner or run_powershell
+    key = bookmark_key(log_type, level, provider_name, event_ids)
+    bookmarks = load_bookmarks(state_file)
+    bookmark = bookmarks.get(key)
+
+    if bookmark is None and not start_time:
+        # first run: remember where the log ends now and start from there
+        latest = _latest_event(runner, log_type)
+        if latest:
+            bookmarks[key] = _bookmark_for(latest)
+            save_bookmarks(bookmarks, state_file)
+        return []
+
+    def query(after_record_id: Optional[int], since: Optional[str]) -> list[dict]:
+        xpath = build_xpath_filter(
+            after_record_id=after_record_id,
+            start_time=since,
+            level=level,
+            provider_name=provider_name,
+            event_ids=event_ids)
+        command = (f"Get-WinEvent -LogName {quote_powershell(log_type)} "
+                   f"-FilterXPath {quote_powershell(xpath)} -Oldest -MaxEvents {max_events} | "
+                   f"Select-Object {STRUCTURED_SELECT} | ConvertTo-Json -Compress")
+        return _run_query(runner, command)
+
+    if bookmark:
+        events = query(bookmark["RecordId"], None)
+        if not events and _log_was_reset(_latest_event(runner, log_type), bookmark):
+            print(f"{Fore.LIGHTYELLOW_EX + Style.BRIGHT}⚠️ The {log_type} log was cleared since the last "
+                  "poll; reading it again from its oldest event.")
+            events = query(None, None)
+    else:
+        events = query(None, start_time)
+
+    if events:
+        bookmarks[key] = _bookmark_for(events[-1])
+        save_bookmarks(bookmarks, state_file)
+    return events
+
+
+def follow_events(log_types: Union[str, list[str]] = "System",
+                  interval: float = 60.0,
+                  polls: Optional[int] = None,
+                  state_file: str = DEFAULT_STATE_FILE,
+                  **filters) -> Iterator[tuple[str, list[dict]]]:
+    """
+    Polls channels for new events forever (or for a number of polls).
+
+    Args:
+        log_types (Union[str, list[str]]): One or more log names
+        interval (float): Seconds to wait between polls
+        polls (Optional[int]): Number of polls before stopping; None runs until interrupted
+        state_file (str): Path to the JSON bookmark file
+        **filters: Any other keyword accepted by fetch_new_events.
+
+    Yields:
+        tuple[str, list[dict]]: (log_type, new events oldest first) for every
+            poll that found something.
+    """
+    if isinstance(log_types, str):
+        log_types = [log_types]
+
+    count = 0
+    while polls is None or count < polls:
+        for log_type in log_types:
+            events = fetch_new_events(log_type, state_file=state_file, **filters)
+            if events:
+                yield log_type, events
+        count += 1
+        if polls is None or count < polls:
+            time.sleep(interval)
+
+
+def _run_query(runner: Callable[[str], str], command: str) -> list[dict]:
+    try:
+        return parse_json_logs(runner(command))
+    except subprocess.CalledProcessError:
+        return []  # Get-WinEvent errors when nothing matches
+    except subprocess.TimeoutExpired:
+        print(f"{Fore.RED + Style.BRIGHT}❌ Timed out polling for new logs.")
+        return []
+
+
+def _latest_event(runner: Callable[[str], str], log_type: str) -> Optional[dict]:
+    command = (f"Get-WinEvent -LogName {quote_powershell(log_type)} -MaxEvents 1 | "
+               f"Select-Object {STRUCTURED_SELECT} | ConvertTo-Json -Compress")
+    events = _run_query(runner, command)
+    return events[-1] if events else None
+
+
+def _log_was_reset(latest: Optional[dict], bookmark: dict) -> bool:
+    # the newest event is older than the bookmarked one, so the bookmarked one is gone
+    if latest is None or latest.get("RecordId") is None or bookmark.get("RecordId") is None:
+        return False
+    if latest["RecordId"] < bookmark["RecordId"]:
+        return True
+    try:
+        bookmarked = datetime.strptime(bookmark.get("TimeCreated") or "", DATETIME_FORMAT)
+    except ValueError:
+        return False
+    latest_time = record_timestamp(latest)
+    return latest_time != datetime.min and latest_time < bookmarked
+
+
+def _bookmark_for(event: dict) -> dict:
+    return {"RecordId": event.get("RecordId"), "TimeCreated": event.get("TimeCreated")}